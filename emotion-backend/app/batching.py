@@ -0,0 +1,202 @@
+import asyncio
+import contextvars
+import time
+from collections import Counter
+
+from .metrics import BATCH_SECONDS, BATCH_SIZE
+
+
+class BatchStats:
+    """Running counters for a batcher (batch-size distribution, run time)."""
+
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.sizes = Counter()
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.split_batches = 0  # failed as a whole and were re-run one item at a time
+
+    def record(self, size: int, seconds: float):
+        self.batches += 1
+        self.items += size
+        self.sizes[size] += 1
+        self.run_seconds += seconds
+        self.max_run_seconds = max(self.max_run_seconds, seconds)
+
+    def snapshot(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "batch_sizes": {str(k): v for k, v in sorted(self.sizes.items())},
+            "mean_run_ms": round(1000 * self.run_seconds / self.batches, 3) if self.batches else 0.0,
+            "max_run_ms": round(1000 * self.max_run_seconds, 3),
+            "split_batches": self.split_batches,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into one batched model call.
+
+    Callers ``await submit(item)``. The first queued item opens a batch that is
+    flushed once ``max_batch_size`` items are waiting or ``max_wait_ms`` has
+    passed, whichever comes first. ``batch_fn(items) -> results`` is a blocking
+    function run off the event loop (on ``executor`` if given, else the loop's
+    default pool); results are fanned back in input order. If a batch of
+    several items fails, each item is re-run on its own so one bad input only
+    fails its own caller.
+    """
+
+    def __init__(self, batch_fn, max_batch_size: int = 16, max_wait_ms: float = 5.0, name: str = "batcher",
+                 executor=None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self.executor = executor
+        self.stats = BatchStats()
+        self._queue = None
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            # Fresh context: the worker outlives the request that happened to start it
+            loop = asyncio.get_running_loop()
+            self._worker = contextvars.Context().run(loop.create_task, self._run())
+
+    async def submit(self, item):
+        self._ensure_worker()
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, fut))
+        return await fut
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Anything already queued joins for free; otherwise wait out the deadline.
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _execute(self, items):
+        if self.executor is not None:
+            return await self.executor.run(self.batch_fn, items)
+        return await asyncio.get_running_loop().run_in_executor(None, self.batch_fn, items)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [(item, fut) for item, fut in batch if not fut.cancelled()]
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await self._execute(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"{self.name}: expected {len(items)} results, got {len(results)}")
+            except Exception as e:
+                if len(batch) == 1:
+                    _settle(batch[0][1], error=e)
+                else:
+                    self.stats.split_batches += 1
+                    await self._run_each(batch)
+            else:
+                for (_, fut), res in zip(batch, results):
+                    _settle(fut, result=res)
+            elapsed = time.perf_counter() - started
+            self.stats.record(len(items), elapsed)
+            BATCH_SIZE.observe(len(items), batcher=self.name)
+            BATCH_SECONDS.observe(elapsed, batcher=self.name)
+
+    async def _run_each(self, batch):
+        for item, fut in batch:
+            if fut.done():
+                continue
+            try:
+                results = await self._execute([item])
+                if len(results) != 1:
+                    raise RuntimeError(f"{self.name}: expected 1 result, got {len(results)}")
+            except Exception as e:
+                _settle(fut, error=e)
+            else:
+                _settle(fut, result=results[0])
+
+
+def _settle(fut, result=None, error=None):
+    if fut.done():
+        return
+    if error is not None:
+        fut.set_exception(error)
+    else:
+        fut.set_result(result)
+
+
+class BucketedBatcher:
+    """Route items to per-length-bucket ``MicroBatcher`` queues.
+
+    Items are only batched with others of similar length so the padding added
+    to reach the longest item in a batch stays small. ``boundaries`` are upper
+    bounds on ``length_fn(item)``; anything longer lands in an overflow bucket
+    that runs one item at a time.
+    """
+
+    def __init__(self, batch_fn, boundaries, length_fn=len, max_batch_size: int = 8,
+                 max_wait_ms: float = 10.0, name: str = "bucketed", executor=None):
+        self.boundaries = sorted(float(b) for b in boundaries)
+        self.length_fn = length_fn
+        self.name = name
+        self.buckets = [
+            MicroBatcher(batch_fn, max_batch_size, max_wait_ms, name=f"{name}[<={b:g}]", executor=executor)
+            for b in self.boundaries
+        ]
+        self.buckets.append(MicroBatcher(batch_fn, 1, 0.0, name=f"{name}[overflow]", executor=executor))
+
+    def queue_depths(self):
+        return {b.name: b.queue_depth() for b in self.buckets}
+
+    def bucket_for(self, item) -> int:
+        length = self.length_fn(item)
+        for i, bound in enumerate(self.boundaries):
+            if length <= bound:
+                return i
+        return len(self.boundaries)
+
+    async def submit(self, item):
+        return await self.buckets[self.bucket_for(item)].submit(item)
+
+    async def close(self):
+        for b in self.buckets:
+            await b.close()
+
+    def snapshot(self):
+        return {b.name: b.stats.snapshot() for b in self.buckets if b.stats.batches}
+
+
+__all__ = ["BatchStats", "MicroBatcher", "BucketedBatcher"]
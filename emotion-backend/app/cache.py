@@ -0,0 +1,177 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form used for cache keys.
+
+    Case is kept: the text model's tokenizer is case-sensitive and scores
+    "HELLO" and "hello" differently.
+    """
+    return " ".join(text.split())
+
+
+def cache_key(model_id: str, text: str, backend: str = "") -> str:
+    """Key for ``text`` scored by ``model_id`` on inference ``backend``.
+
+    The backend is part of the key because torch, onnx and onnx-int8 give
+    slightly different scores, and a shared Redis outlives a backend switch.
+    """
+    return hashlib.sha256(f"{model_id}\0{backend}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expired = 0
+        self.errors = 0
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "errors": self.errors,
+        }
+
+
+class MemoryCache:
+    """In-process LRU cache bounded by entry count and approximate bytes, with optional TTL.
+
+    Values must be JSON-serializable; their encoded size is what counts
+    against ``max_bytes``. Each worker process has its own copy.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 16 * 1024 * 1024, ttl_s: float = 0.0):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl_s = float(ttl_s)
+        self.stats = CacheStats()
+        self._data = OrderedDict()  # key -> (expires_at | None, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    async def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._pop(key)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    async def set(self, key, value):
+        size = len(key) + len(json.dumps(value))
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s > 0 else None
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            self.stats.sets += 1
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+                self.stats.evictions += 1
+
+    def _pop(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def snapshot(self):
+        return {
+            "backend": self.backend,
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            **self.stats.snapshot(),
+        }
+
+
+class RedisCache:
+    """Shared cache for all workers behind a Redis (or Redis-compatible) server.
+
+    Needs the optional ``redis`` package. Size limits are left to the server's
+    ``maxmemory``/eviction policy; failures count as misses so the cache can
+    never take ``/predict-text`` down.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", ttl_s: float = 0.0, prefix: str = "emotion:text:"):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("TEXT_CACHE_BACKEND=redis needs the 'redis' package (pip install redis)") from e
+        self.url = url
+        self.ttl_s = float(ttl_s)
+        self.prefix = prefix
+        self.stats = CacheStats()
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key):
+        try:
+            raw = await self._client.get(self.prefix + key)
+        except Exception:
+            self.stats.errors += 1
+            raw = None
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key, value):
+        try:
+            # Milliseconds, so sub-second TTLs expire like they do in MemoryCache
+            ttl_ms = max(1, int(self.ttl_s * 1000)) if self.ttl_s > 0 else None
+            await self._client.set(self.prefix + key, json.dumps(value), px=ttl_ms)
+            self.stats.sets += 1
+        except Exception:
+            self.stats.errors += 1
+
+    def snapshot(self):
+        return {"backend": self.backend, "url": self.url, "ttl_s": self.ttl_s, **self.stats.snapshot()}
+
+
+# name -> factory(**options); register another store here to plug it in
+CACHE_BACKENDS = {
+    "memory": lambda max_entries, max_bytes, ttl_s, url: MemoryCache(max_entries, max_bytes, ttl_s),
+    "redis": lambda max_entries, max_bytes, ttl_s, url: RedisCache(url, ttl_s),
+}
+
+
+def build_cache(backend: str, max_entries: int, max_bytes: int, ttl_s: float, url: str = ""):
+    """Return a cache for ``backend`` or None when caching is off."""
+    backend = (backend or "off").lower()
+    if backend in ("off", "none", ""):
+        return None
+    factory = CACHE_BACKENDS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown cache backend '{backend}' (choose from {', '.join(CACHE_BACKENDS)} or off)")
+    return factory(max_entries=max_entries, max_bytes=max_bytes, ttl_s=ttl_s, url=url)
+
+
+__all__ = ["normalize_text", "cache_key", "CacheStats", "MemoryCache", "RedisCache", "CACHE_BACKENDS", "build_cache"]
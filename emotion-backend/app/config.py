@@ -6,4 +6,78 @@ SAMPLE_RATE = int(os.getenv("SAMPLE_RATE", "16000"))
 CORS_ALLOW_ORIGINS = os.getenv("CORS_ALLOW_ORIGINS", "*")  # comma-separated for prod
 DEVICE_PREFERENCE = os.getenv("DEVICE_PREFERENCE", "auto")  # 'auto' | 'cpu' | 'gpu'
 
-__all__ = ["MODEL_ID", "TEXT_MODEL_ID", "SAMPLE_RATE", "CORS_ALLOW_ORIGINS", "DEVICE_PREFERENCE"]
\ No newline at end of file
+# Micro-batching for /predict-text: concurrent requests are coalesced into one forward pass
+TEXT_BATCH_MAX_SIZE = int(os.getenv("TEXT_BATCH_MAX_SIZE", "16"))
+TEXT_BATCH_MAX_WAIT_MS = float(os.getenv("TEXT_BATCH_MAX_WAIT_MS", "5"))  # extra latency bound per request
+
+# Length-bucketed batching for /predict: waveforms are grouped by duration; only equal lengths share a forward pass
+AUDIO_BATCH_BUCKETS = [float(b) for b in os.getenv("AUDIO_BATCH_BUCKETS", "1,2,3,5,10").split(",") if b.strip()]  # seconds
+AUDIO_BATCH_MAX_SIZE = int(os.getenv("AUDIO_BATCH_MAX_SIZE", "8"))
+AUDIO_BATCH_MAX_DELAY_MS = float(os.getenv("AUDIO_BATCH_MAX_DELAY_MS", "10"))
+
+# Inference executor: model calls and audio decoding run on this pool, off the event loop
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "64"))  # beyond this, requests get 429
+TORCH_INTRA_OP_THREADS = int(os.getenv("TORCH_INTRA_OP_THREADS", "0"))  # 0 = torch default
+TORCH_INTER_OP_THREADS = int(os.getenv("TORCH_INTER_OP_THREADS", "0"))
+
+# Pre-fork serving (python -m app.prefork): workers share the master's model weights copy-on-write
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+
+# /ws/stream: server-side windowing of raw PCM frames (client may override per connection)
+STREAM_WINDOW_S = float(os.getenv("STREAM_WINDOW_S", "2.5"))
+STREAM_HOP_S = float(os.getenv("STREAM_HOP_S", "0.7"))
+STREAM_MAX_WINDOW_S = float(os.getenv("STREAM_MAX_WINDOW_S", "10"))
+STREAM_INCREMENTAL = os.getenv("STREAM_INCREMENTAL", "1") == "1"  # reuse cached CNN features across hops
+
+# Bulk routes (/predict-text/batch, /predict/batch): most items accepted per request
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "256"))
+
+# /predict/timeline: long recordings are read in blocks and classified window by window
+TIMELINE_WINDOW_S = float(os.getenv("TIMELINE_WINDOW_S", "3"))
+TIMELINE_HOP_S = float(os.getenv("TIMELINE_HOP_S", "3"))  # = window: back-to-back segments
+TIMELINE_BATCH_SIZE = int(os.getenv("TIMELINE_BATCH_SIZE", "8"))  # windows in flight per request (bounds memory)
+TIMELINE_BLOCK_S = float(os.getenv("TIMELINE_BLOCK_S", "10"))  # seconds of source audio read per block
+
+# Voice activity gate: audio windows without speech skip the model and get a fixed neutral result
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-50"))  # frame energy (dBFS) below this is silence
+VAD_ZCR_MAX = float(os.getenv("VAD_ZCR_MAX", "0.4"))  # zero-crossing rate above this is noise unless loud
+VAD_HANGOVER_MS = float(os.getenv("VAD_HANGOVER_MS", "200"))  # keep speech on this long after each speech frame
+VAD_MIN_SPEECH_MS = float(os.getenv("VAD_MIN_SPEECH_MS", "100"))  # less speech than this in a window = silence
+
+# Result cache for /predict-text keyed on normalized text + model id ('memory' | 'redis' | 'off')
+TEXT_CACHE_BACKEND = os.getenv("TEXT_CACHE_BACKEND", "memory")
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "10000"))
+TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+TEXT_CACHE_TTL_S = float(os.getenv("TEXT_CACHE_TTL_S", "0"))  # 0 = no expiry
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Inference backend: 'torch' (transformers pipelines), 'onnx' or 'onnx-int8' (ONNX Runtime, CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "emotion-backend", "onnx"))
+# Local model store (python -m app.model_store pin): offline, mmap-shared safetensors copies of both models
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "emotion-backend", "models"))
+MODEL_STORE_MMAP = os.getenv("MODEL_STORE_MMAP", "1") == "1"  # 0 = pinned copy, but regular from_pretrained
+
+# Observability: Prometheus text at /metrics; optional per-stage Server-Timing response header
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "0") == "1"
+
+# Startup: models load in the background after the port is bound; /ready flips once they are warm
+STARTUP_PARALLEL_LOAD = os.getenv("STARTUP_PARALLEL_LOAD", "1") == "1"  # load audio + text models concurrently
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "1") == "1"  # one synthetic inference per model before ready
+STARTUP_BLOCKING = os.getenv("STARTUP_BLOCKING", "0") == "1"  # 1 = don't accept connections until ready
+
+__all__ = ["MODEL_ID", "TEXT_MODEL_ID", "SAMPLE_RATE", "CORS_ALLOW_ORIGINS", "DEVICE_PREFERENCE",
+           "TEXT_BATCH_MAX_SIZE", "TEXT_BATCH_MAX_WAIT_MS",
+           "AUDIO_BATCH_BUCKETS", "AUDIO_BATCH_MAX_SIZE", "AUDIO_BATCH_MAX_DELAY_MS",
+           "INFERENCE_WORKERS", "INFERENCE_MAX_PENDING", "TORCH_INTRA_OP_THREADS", "TORCH_INTER_OP_THREADS",
+           "SERVE_WORKERS", "STREAM_WINDOW_S", "STREAM_HOP_S", "STREAM_MAX_WINDOW_S",
+           "STREAM_INCREMENTAL", "TEXT_CACHE_BACKEND", "TEXT_CACHE_MAX_ENTRIES", "TEXT_CACHE_MAX_BYTES",
+           "TEXT_CACHE_TTL_S", "REDIS_URL", "INFERENCE_BACKEND", "ONNX_CACHE_DIR",
+           "MODEL_STORE_DIR", "MODEL_STORE_MMAP",
+           "METRICS_ENABLED", "METRICS_SERVER_TIMING",
+           "STARTUP_PARALLEL_LOAD", "STARTUP_WARMUP", "STARTUP_BLOCKING", "BATCH_MAX_ITEMS",
+           "TIMELINE_WINDOW_S", "TIMELINE_HOP_S", "TIMELINE_BATCH_SIZE", "TIMELINE_BLOCK_S",
+           "VAD_ENABLED", "VAD_THRESHOLD_DB", "VAD_ZCR_MAX", "VAD_HANGOVER_MS", "VAD_MIN_SPEECH_MS"]
\ No newline at end of file
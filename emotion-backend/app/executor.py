@@ -0,0 +1,101 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the inference executor has no room for another request."""
+
+
+def configure_torch_threads(intra_op: int = 0, inter_op: int = 0):
+    """Apply torch thread settings; 0 keeps torch's default."""
+    import torch
+
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # Can only be set once, before any inter-op work has started
+            pass
+    return {"intra_op": torch.get_num_threads(), "inter_op": torch.get_num_interop_threads()}
+
+
+class InferenceExecutor:
+    """Bounded thread pool for model calls and audio decoding.
+
+    Blocking work is dispatched with ``await run(fn, *args)`` so the event loop
+    keeps serving other requests (``/health`` included). Requests enter through
+    ``slot()``, which rejects with ``QueueFullError`` once ``max_pending``
+    requests are already queued or running, instead of letting latency grow
+    without bound.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64):
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self.pending = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        # Only touched from the event loop thread, so a plain counter is enough.
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise QueueFullError(f"Inference queue full ({self.pending}/{self.max_pending} pending)")
+        self.pending += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry context variables (per-request stage timings) into the worker thread
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._pool, functools.partial(ctx.run, fn, *args, **kwargs))
+
+    def snapshot(self):
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+class QueueDepthMiddleware:
+    """Pure ASGI middleware adding ``X-Queue-Depth`` / ``X-Queue-Limit`` to every response.
+
+    Streaming clients use them to stretch their hop before the queue fills
+    and requests start coming back 429.
+    """
+
+    def __init__(self, app, executor: InferenceExecutor):
+        self.app = app
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-queue-depth", str(self.executor.pending).encode()),
+                    (b"x-queue-limit", str(self.executor.max_pending).encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+__all__ = ["QueueFullError", "InferenceExecutor", "QueueDepthMiddleware", "configure_torch_threads"]
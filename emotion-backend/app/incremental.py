@@ -0,0 +1,130 @@
+"""
+Incremental wav2vec2 inference for overlapping stream windows.
+
+With a 2.5 s window and 0.7 s hop every sample goes through the CNN feature
+encoder ~3.5 times. The CNN is local (400-sample receptive field, 320-sample
+stride) so its output frames for old audio never change: we keep the CNN
+frames for the current window and only run the CNN over newly arrived audio.
+The model's own forward pass then runs over the cached frames (a forward hook
+swaps them in for the CNN output), so projection, transformer, layer weighting
+and pooling head are exactly those of full-window inference.
+
+This is only exact when every CNN layer is local. It is not for
+wav2vec2-base (``feat_extract_norm="group"``): its first conv layer's
+GroupNorm takes statistics over the whole input, so chunk-wise features
+drift far from full-window ones. The same goes for the feature
+extractor's zero-mean/unit-variance normalization. ``supports_incremental``
+refuses both, and the stream falls back to full-window inference
+(``benchmarks/bench_incremental.py`` measures the difference).
+"""
+import threading
+
+import numpy as np
+
+_override = threading.local()
+_hook_lock = threading.Lock()
+
+
+def _feature_override_hook(module, inputs, output):
+    features = getattr(_override, "features", None)
+    return output if features is None else features
+
+
+def _install_hook(model):
+    # One permanent hook per model; it is a no-op unless the calling thread set an override
+    with _hook_lock:
+        if not getattr(model, "_incremental_hook_installed", False):
+            model.wav2vec2.feature_extractor.register_forward_hook(_feature_override_hook)
+            model._incremental_hook_installed = True
+
+
+def conv_geometry(config):
+    """(receptive_field, stride) of the wav2vec2 CNN feature encoder in samples."""
+    receptive, stride = 1, 1
+    for k, s in zip(config.conv_kernel, config.conv_stride):
+        receptive += (k - 1) * stride
+        stride *= s
+    return receptive, stride
+
+
+def supports_incremental(model, feature_extractor=None) -> bool:
+    """True when cached chunk-wise CNN features equal full-window ones for ``model``."""
+    if not (hasattr(model, "wav2vec2") and hasattr(model, "projector") and hasattr(model, "classifier")):
+        return False
+    if getattr(model.config, "feat_extract_norm", None) != "layer":
+        return False
+    return not getattr(feature_extractor, "do_normalize", False)
+
+
+class IncrementalWav2Vec2:
+    """Per-stream cache of CNN feature frames for a wav2vec2 sequence classifier.
+
+    ``push(new_samples)`` encodes only the new audio; ``classify()`` runs the
+    rest of the model over the cached window and returns pipeline-style
+    ``[{"label", "score"}, ...]`` sorted by score. Not thread-safe: one call at
+    a time per stream.
+    """
+
+    def __init__(self, model, feature_extractor, window_samples: int):
+        self.model = model
+        self.w2v = model.wav2vec2
+        self.config = model.config
+        self.receptive, self.stride = conv_geometry(self.config)
+        if window_samples < self.receptive:
+            raise ValueError(f"window of {window_samples} samples is shorter than the CNN receptive field")
+        self.window_frames = (window_samples - self.receptive) // self.stride + 1
+        self.normalize = bool(getattr(feature_extractor, "do_normalize", False))
+        self._dummy = np.zeros(self.receptive, dtype=np.float32)  # one-frame stand-in for the CNN input
+        _install_hook(model)
+        self.reset()
+
+    def reset(self):
+        self._raw = np.zeros(0, dtype=np.float32)  # samples not yet covered by a full frame
+        self._frames = None  # [1, conv_dim, T] CNN features, T <= window_frames
+
+    @property
+    def ready(self) -> bool:
+        return self._frames is not None and self._frames.shape[-1] >= self.window_frames
+
+    def push(self, x: np.ndarray) -> int:
+        """Encode newly arrived 16 kHz samples; returns the number of new frames."""
+        import torch
+
+        raw = np.concatenate([self._raw, np.asarray(x, dtype=np.float32)])
+        if len(raw) < self.receptive:
+            self._raw = raw
+            return 0
+        n_frames = (len(raw) - self.receptive) // self.stride + 1
+        chunk = raw[:self.stride * (n_frames - 1) + self.receptive]
+        if self.normalize:
+            chunk = (chunk - chunk.mean()) / np.sqrt(chunk.var() + 1e-7)
+
+        device = next(self.model.parameters()).device
+        with torch.inference_mode():
+            inp = torch.from_numpy(np.ascontiguousarray(chunk, dtype=np.float32))[None].to(device)
+            feats = self.w2v.feature_extractor(inp)
+        frames = feats if self._frames is None else torch.cat([self._frames, feats], dim=-1)
+        self._frames = frames[..., -self.window_frames:]
+        # Keep the tail the next frame will start from (frame i covers [i*stride, i*stride + receptive))
+        self._raw = raw[self.stride * n_frames:]
+        return n_frames
+
+    def classify(self):
+        import torch
+
+        if self._frames is None:
+            raise RuntimeError("No audio pushed yet")
+        device = self._frames.device
+        _override.features = self._frames
+        try:
+            with torch.inference_mode():
+                logits = self.model(torch.from_numpy(self._dummy)[None].to(device)).logits
+        finally:
+            _override.features = None
+        probs = torch.softmax(logits[0], dim=-1).cpu().numpy()
+        id2label = self.config.id2label
+        order = np.argsort(-probs)
+        return [{"label": id2label[int(i)], "score": float(probs[i])} for i in order]
+
+
+__all__ = ["conv_geometry", "supports_incremental", "IncrementalWav2Vec2"]
@@ -0,0 +1,262 @@
+"""
+Prometheus metrics without the client library.
+
+Histograms, counters and gauges are rendered in the Prometheus text format by
+``REGISTRY.render()`` (served at ``/metrics``). Observations take a lock and a
+bisect, so instrumentation can stay on in production. Under ``app.prefork``
+each worker keeps its own registry; scrape per worker or sum in Prometheus.
+
+``stage("decode")`` times a block into ``emotion_stage_seconds`` and, when the
+request runs inside ``ServerTimingMiddleware``, into its ``Server-Timing``
+header as well. The per-request timings live in a context variable, which
+``InferenceExecutor.run`` carries into its worker threads.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers ~1 ms text hits up to multi-second audio on CPU
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _num(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric(_Metric):
+    """Values read at scrape time from ``fn() -> {label_values_tuple: value}``."""
+
+    def __init__(self, name, help, fn, labelnames=(), kind="gauge"):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self):
+        try:
+            values = self.fn()
+        except Exception:
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _num(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, labelnames=(), kind="gauge"):
+        return self.register(CallbackMetric(name, help, fn, labelnames, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "emotion_stage_seconds", "Time spent per request stage (decode, resample, normalize, cache, inference, postprocess)",
+    ["stage"],
+)
+REQUEST_SECONDS = REGISTRY.histogram("emotion_request_seconds", "End-to-end HTTP request latency", ["route"])
+REQUESTS_TOTAL = REGISTRY.counter("emotion_requests_total", "HTTP requests by route and status code",
+                                  ["route", "status"])
+REQUESTS_IN_PROGRESS = REGISTRY.gauge("emotion_requests_in_progress", "HTTP requests currently being served",
+                                      ["route"])
+MODEL_LOAD_SECONDS = REGISTRY.gauge("emotion_model_load_seconds", "Time taken to load each model", ["model"])
+BATCH_SIZE = REGISTRY.histogram("emotion_batch_size", "Items per batched forward pass", ["batcher"],
+                                buckets=SIZE_BUCKETS)
+BATCH_SECONDS = REGISTRY.histogram("emotion_batch_seconds", "Run time of each batched forward pass", ["batcher"])
+VAD_WINDOWS = REGISTRY.counter("emotion_vad_windows_total", "Audio windows checked by the VAD gate",
+                               ["route", "result"])
+VAD_SKIPPED_AUDIO_SECONDS = REGISTRY.counter("emotion_vad_skipped_audio_seconds_total",
+                                             "Seconds of audio the VAD gate kept from the model", ["route"])
+VAD_SAVED_SECONDS = REGISTRY.counter("emotion_vad_saved_inference_seconds_total",
+                                     "Estimated model time saved by the VAD gate", ["route"])
+
+_timings = contextvars.ContextVar("emotion_server_timing", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as request stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing_header(timings: dict, total: float) -> str:
+    parts = [f"{name};dur={1000 * secs:.2f}" for name, secs in timings.items()]
+    parts.append(f"total;dur={1000 * total:.2f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware: request count/latency/in-progress metrics per route,
+    plus an optional ``Server-Timing`` header with the stages recorded by ``stage()``.
+    """
+
+    def __init__(self, app, server_timing: bool = False, exclude=("/metrics",)):
+        self.app = app
+        self.server_timing = server_timing
+        self.exclude = set(exclude)
+        self._routes = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        status = {"code": 500}
+        # Unmatched paths share one label so scanners can't blow up cardinality
+        if self._routes is None:
+            self._routes = {getattr(r, "path", None) for r in getattr(scope.get("app"), "routes", ())}
+        route = scope["path"] if scope["path"] in self._routes else "other"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.server_timing:
+                    header = server_timing_header(timings, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc(route=route)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec(route=route)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+            REQUESTS_TOTAL.inc(route=route, status=status["code"])
+            _timings.reset(token)
+
+
+__all__ = [
+    "Counter", "Gauge", "Histogram", "CallbackMetric", "Registry", "REGISTRY", "CONTENT_TYPE",
+    "STAGE_SECONDS", "REQUEST_SECONDS", "REQUESTS_TOTAL", "REQUESTS_IN_PROGRESS", "MODEL_LOAD_SECONDS",
+    "BATCH_SIZE", "BATCH_SECONDS", "VAD_WINDOWS", "VAD_SKIPPED_AUDIO_SECONDS", "VAD_SAVED_SECONDS",
+    "stage", "ServerTimingMiddleware",
+]
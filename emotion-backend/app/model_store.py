@@ -0,0 +1,216 @@
+"""
+Pinned local model store with memory-mapped safetensors weights.
+
+``pin`` resolves a model once (hub or HF cache), then writes config, processor
+files and a single ``model.safetensors`` into MODEL_STORE_DIR together with a
+manifest of file hashes. From then on ``load_pipeline`` builds the pipeline
+from that directory only, never touching the hub, so it works fully offline.
+
+Weights are not read into private memory: the safetensors file is mapped
+read-only and every parameter is a tensor view into the mapping
+(``load_state_dict(assign=True)`` on a model built without weight init). All
+processes serving the same model share one copy in the page cache, and
+startup is an mmap plus module construction instead of a full read and copy.
+
+Pin ahead of time (e.g. in the Docker build, with network access):
+    python -m app.model_store pin
+    python -m app.model_store verify
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import time
+import warnings
+
+from .config import MODEL_ID, TEXT_MODEL_ID, MODEL_STORE_DIR, MODEL_STORE_MMAP
+
+WEIGHTS_FILE = "model.safetensors"
+MANIFEST_FILE = "manifest.json"
+
+_ST_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8", "U8": "uint8", "BOOL": "bool",
+}
+_mappings = []  # keep weight mappings alive for the life of the process
+
+
+def store_dir(model_id: str) -> str:
+    return os.path.join(MODEL_STORE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "--", model_id.strip("/")))
+
+
+def is_pinned(model_id: str) -> bool:
+    d = store_dir(model_id)
+    return os.path.exists(os.path.join(d, MANIFEST_FILE)) and os.path.exists(os.path.join(d, WEIGHTS_FILE))
+
+
+def _model_class(task: str):
+    if task == "audio-classification":
+        from transformers import AutoModelForAudioClassification
+        return AutoModelForAudioClassification
+    from transformers import AutoModelForSequenceClassification
+    return AutoModelForSequenceClassification
+
+
+def _processor_class(task: str):
+    if task == "audio-classification":
+        from transformers import AutoFeatureExtractor
+        return AutoFeatureExtractor
+    from transformers import AutoTokenizer
+    return AutoTokenizer
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def pin(task: str, model_id: str, force: bool = False) -> str:
+    """Resolve ``model_id`` once and write a self-contained safetensors copy."""
+    from safetensors.torch import save_file
+
+    out = store_dir(model_id)
+    if is_pinned(model_id) and not force:
+        return out
+    os.makedirs(out, exist_ok=True)
+    model = _model_class(task).from_pretrained(model_id).eval()
+    _processor_class(task).from_pretrained(model_id).save_pretrained(out)
+    model.config.save_pretrained(out)
+
+    # Keys exactly as this transformers version names the modules; tied tensors
+    # are stored once and re-linked on load.
+    tensors, aliases, seen = {}, {}, {}
+    for name, t in model.state_dict().items():
+        key = (t.data_ptr(), t.dtype, tuple(t.shape))
+        if t.numel() and key in seen:
+            aliases[name] = seen[key]
+            continue
+        seen[key] = name
+        tensors[name] = t.detach().contiguous()
+    save_file(tensors, os.path.join(out, WEIGHTS_FILE), metadata={"format": "pt"})
+
+    import transformers
+
+    manifest = {
+        "model_id": model_id,
+        "task": task,
+        "pinned_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "transformers": transformers.__version__,
+        "aliases": aliases,
+        "files": {f: _sha256(os.path.join(out, f)) for f in sorted(os.listdir(out)) if f != MANIFEST_FILE},
+    }
+    with open(os.path.join(out, MANIFEST_FILE), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    return out
+
+
+def verify(model_id: str) -> list:
+    """Names of files whose hash no longer matches the manifest (empty when intact)."""
+    d = store_dir(model_id)
+    with open(os.path.join(d, MANIFEST_FILE)) as fh:
+        files = json.load(fh)["files"]
+    return [f for f, digest in files.items()
+            if not os.path.exists(os.path.join(d, f)) or _sha256(os.path.join(d, f)) != digest]
+
+
+def mmap_state_dict(path: str) -> dict:
+    """Tensors of a safetensors file as zero-copy views of a shared read-only mapping."""
+    import torch
+
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    _mappings.append(mm)
+    (header_len,) = struct.unpack("<Q", mm[:8])
+    header = json.loads(mm[8:8 + header_len])
+    base = 8 + header_len
+    out = {}
+    with warnings.catch_warnings():
+        # The mapping is read-only on purpose; weights are never written in inference
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = getattr(torch, _ST_DTYPES[info["dtype"]])
+            start, end = info["data_offsets"]
+            shape = info["shape"]
+            if end == start:
+                out[name] = torch.empty(shape, dtype=dtype)
+                continue
+            flat = torch.frombuffer(mm, dtype=dtype, count=(end - start) // dtype.itemsize, offset=base + start)
+            out[name] = flat.view(shape)
+    return out
+
+
+def _no_init_weights():
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:  # transformers >= 5
+        from transformers.initialization import no_init_weights
+    return no_init_weights()
+
+
+def load_model(task: str, model_id: str):
+    """Model from the pinned copy; parameters map the weights file when MODEL_STORE_MMAP is on."""
+    from transformers import AutoConfig
+
+    d = store_dir(model_id)
+    cls = _model_class(task)
+    if not MODEL_STORE_MMAP:
+        return cls.from_pretrained(d, local_files_only=True).eval()
+
+    with open(os.path.join(d, MANIFEST_FILE)) as fh:
+        aliases = json.load(fh).get("aliases", {})
+    config = AutoConfig.from_pretrained(d, local_files_only=True)
+    with _no_init_weights():
+        model = cls.from_config(config)
+    state = mmap_state_dict(os.path.join(d, WEIGHTS_FILE))
+    for alias, source in aliases.items():
+        state[alias] = state[source]
+    missing, unexpected = model.load_state_dict(state, strict=False, assign=True)
+    if missing or unexpected:
+        # Pinned with a transformers version that names modules differently
+        print(f"   ⚠️ {model_id}: pinned weights don't match this transformers version, loading without mmap")
+        return cls.from_pretrained(d, local_files_only=True).eval()
+    return model.eval()
+
+
+def load_pipeline(task: str, model_id: str, **pipeline_kwargs):
+    """``transformers.pipeline`` for the pinned copy of ``model_id``; no hub access."""
+    from transformers import pipeline
+
+    d = store_dir(model_id)
+    processor = _processor_class(task).from_pretrained(d, local_files_only=True)
+    key = "feature_extractor" if task == "audio-classification" else "tokenizer"
+    return pipeline(task=task, model=load_model(task, model_id), **{key: processor}, **pipeline_kwargs)
+
+
+__all__ = ["store_dir", "is_pinned", "pin", "verify", "mmap_state_dict", "load_model", "load_pipeline"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pin the emotion models into the local model store")
+    parser.add_argument("command", choices=["pin", "verify"])
+    parser.add_argument("--force", action="store_true", help="Re-pin even if a copy exists")
+    args = parser.parse_args()
+    failed = False
+    for task, model_id in (("audio-classification", MODEL_ID), ("text-classification", TEXT_MODEL_ID)):
+        if args.command == "pin":
+            print(f"✅ {model_id} -> {pin(task, model_id, force=args.force)}")
+        elif not is_pinned(model_id):
+            print(f"❌ {model_id} is not pinned")
+            failed = True
+        else:
+            bad = verify(model_id)
+            failed |= bool(bad)
+            print(f"❌ {model_id}: {', '.join(bad)} changed" if bad else f"✅ {model_id} intact")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
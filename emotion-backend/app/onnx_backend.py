@@ -0,0 +1,233 @@
+"""
+ONNX Runtime inference backend (INFERENCE_BACKEND=onnx | onnx-int8).
+
+Both HF models are exported to ONNX once into ONNX_CACHE_DIR and then served
+through onnxruntime on CPU. ``onnx-int8`` additionally applies dynamic INT8
+quantization to the exported graph. The classifiers below are drop-in
+replacements for the transformers pipelines used by ``app.server``: same call
+signature and the same ``[{"label", "score"}, ...]`` output, so routes and
+response schemas do not change.
+
+Needs the optional packages ``onnx`` and ``onnxruntime`` (pip install onnx onnxruntime).
+
+Export ahead of time (e.g. in the Docker build):
+    python -m app.onnx_backend --int8
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+from .config import MODEL_ID, TEXT_MODEL_ID, ONNX_CACHE_DIR, SAMPLE_RATE
+
+MODEL_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+# STARTUP_PARALLEL_LOAD runs the audio and text exports on two threads; torch's
+# exporter is not re-entrant, so exports run one at a time.
+_export_lock = threading.Lock()
+
+
+def export_dir(model_id: str) -> str:
+    return os.path.join(ONNX_CACHE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "--", model_id.strip("/")))
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    e = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _ranked(probs: np.ndarray, id2label: dict):
+    order = np.argsort(-probs)
+    return [{"label": id2label[int(i)], "score": float(probs[i])} for i in order]
+
+
+def _logits_wrappers():
+    import torch
+
+    class AudioLogits(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_values):
+            return self.inner(input_values=input_values).logits
+
+    class TextLogits(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    return AudioLogits, TextLogits
+
+
+def _publish(staging: str, out: str, name: str) -> None:
+    """Move ``name`` and its external-data sidecars from ``staging`` into ``out``.
+
+    ``name`` itself is replaced last, so its presence means the export finished.
+    """
+    for entry in sorted(os.listdir(staging), key=lambda e: e == name):
+        if entry.startswith(name):
+            os.replace(os.path.join(staging, entry), os.path.join(out, entry))
+
+
+def export(task: str, model_id: str, quantize: bool = False) -> str:
+    """Export ``model_id`` for ``task`` to ONNX (and INT8) unless already present.
+
+    Graphs are written to a staging directory and moved into place once complete,
+    so an interrupted export is redone on the next start instead of leaving a
+    truncated ``model.onnx`` behind.
+    """
+    with _export_lock:
+        out = export_dir(model_id)
+        os.makedirs(out, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".export-", dir=out)
+        try:
+            _export(task, model_id, quantize, out, staging)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return out
+
+
+def _export(task: str, model_id: str, quantize: bool, out: str, staging: str) -> None:
+    import torch
+    from transformers import AutoConfig
+
+    AudioLogits, TextLogits = _logits_wrappers()
+    onnx_path = os.path.join(out, MODEL_FILE)
+    if not os.path.exists(onnx_path):
+        if task == "audio-classification":
+            from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+            model = AudioLogits(AutoModelForAudioClassification.from_pretrained(model_id).eval())
+            AutoFeatureExtractor.from_pretrained(model_id).save_pretrained(out)
+            dummy = (torch.zeros(1, SAMPLE_RATE),)
+            names = ["input_values"]
+            axes = {"input_values": {0: "batch", 1: "samples"}, "logits": {0: "batch"}}
+        else:
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            model = TextLogits(AutoModelForSequenceClassification.from_pretrained(model_id).eval())
+            AutoTokenizer.from_pretrained(model_id).save_pretrained(out)
+            ids = torch.ones(1, 8, dtype=torch.long)
+            dummy = (ids, torch.ones_like(ids))
+            names = ["input_ids", "attention_mask"]
+            axes = {n: {0: "batch", 1: "tokens"} for n in names}
+            axes["logits"] = {0: "batch"}
+        AutoConfig.from_pretrained(model_id).save_pretrained(out)
+
+        print(f"   📦 Exporting {model_id} to ONNX...")
+        # Exported under its final file name so external-data references
+        # (model.onnx.data) stay valid after the move.
+        torch.onnx.export(
+            model, dummy, os.path.join(staging, MODEL_FILE),
+            input_names=names, output_names=["logits"], dynamic_axes=axes, opset_version=17,
+        )
+        _publish(staging, out, MODEL_FILE)
+    int8_path = os.path.join(out, INT8_FILE)
+    if quantize and not os.path.exists(int8_path):
+        import onnx
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"   🗜️ Quantizing {model_id} to INT8...")
+        # Newer torch exporters leave intermediate shape annotations that trip the
+        # quantizer's shape inference; it re-infers them anyway.
+        graph = onnx.load(onnx_path)
+        del graph.graph.value_info[:]
+        stripped = os.path.join(staging, "model.noshapes.onnx")
+        onnx.save(graph, stripped, save_as_external_data=True, location="model.noshapes.onnx.data")
+        quantize_dynamic(stripped, os.path.join(staging, INT8_FILE), weight_type=QuantType.QInt8)
+        _publish(staging, out, INT8_FILE)
+
+
+class _OnnxClassifier:
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        path = os.path.join(model_dir, INT8_FILE if quantized else MODEL_FILE)
+        self.session = ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        with open(os.path.join(model_dir, "config.json")) as fh:
+            self.id2label = {int(k): v for k, v in json.load(fh)["id2label"].items()}
+        self.model_dir = model_dir
+        self.quantized = quantized
+
+    def _logits(self, feeds: dict) -> np.ndarray:
+        return self.session.run(["logits"], {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+
+class OnnxAudioClassifier(_OnnxClassifier):
+    """Callable like ``pipeline("audio-classification", top_k=None)``."""
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0):
+        from transformers import AutoFeatureExtractor
+
+        super().__init__(model_dir, quantized, threads)
+        self.feature_extractor = AutoFeatureExtractor.from_pretrained(model_dir)
+
+    def __call__(self, inputs, batch_size=None, **kwargs):
+        single = isinstance(inputs, dict)
+        items = [inputs] if single else list(inputs)
+        feats = self.feature_extractor(
+            [np.asarray(x["array"], dtype=np.float32) for x in items],
+            sampling_rate=items[0]["sampling_rate"],
+            padding=True,
+            return_tensors="np",
+        )
+        probs = _softmax(self._logits({"input_values": feats["input_values"].astype(np.float32)}))
+        results = [_ranked(p, self.id2label) for p in probs]
+        return results[0] if single else results
+
+
+class OnnxTextClassifier(_OnnxClassifier):
+    """Callable like ``pipeline("text-classification", top_k=None, truncation=True)``."""
+
+    def __init__(self, model_dir: str, quantized: bool = False, threads: int = 0, max_length: int = 512):
+        from transformers import AutoTokenizer
+
+        super().__init__(model_dir, quantized, threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+
+    def __call__(self, texts, batch_size=None, **kwargs):
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        enc = self.tokenizer(items, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        probs = _softmax(self._logits({k: v.astype(np.int64) for k, v in enc.items()}))
+        results = [_ranked(p, self.id2label) for p in probs]
+        return [results[0]] if single else results
+
+
+def load_classifier(task: str, model_id: str, quantized: bool = False, threads: int = 0):
+    """Export on first use, then return an ONNX Runtime classifier for ``task``."""
+    model_dir = export(task, model_id, quantize=quantized)
+    if task == "audio-classification":
+        return OnnxAudioClassifier(model_dir, quantized, threads)
+    return OnnxTextClassifier(model_dir, quantized, threads)
+
+
+__all__ = ["export", "export_dir", "OnnxAudioClassifier", "OnnxTextClassifier", "load_classifier"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the emotion models to ONNX")
+    parser.add_argument("--int8", action="store_true", help="Also write dynamically quantized INT8 models")
+    args = parser.parse_args()
+    for task, model_id in (("audio-classification", MODEL_ID), ("text-classification", TEXT_MODEL_ID)):
+        print(f"✅ {model_id} -> {export(task, model_id, quantize=args.int8)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Pre-fork serving mode: load both models once, then fork workers that share them.
+
+``uvicorn --workers N`` spawns fresh interpreters, so every worker imports
+transformers and loads its own copy of wav2vec2 and DistilRoBERTa. Here the
+master loads the weights, freezes the GC heap and forks; the children inherit
+the tensors copy-on-write and only pay for their own private pages.
+
+Run:
+    python -m app.prefork --workers 4 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from .config import SERVE_WORKERS, TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS
+
+
+def _read_kb(path, fields):
+    out = {f: 0 for f in fields}
+    try:
+        with open(path) as fh:
+            for line in fh:
+                key, _, rest = line.partition(":")
+                if key in out:
+                    out[key] += int(rest.split()[0])
+    except (FileNotFoundError, ProcessLookupError, PermissionError):
+        pass
+    return out
+
+
+def process_memory(pid: int) -> dict:
+    """RSS/PSS/shared/private memory of ``pid`` in MiB (Linux ``/proc``)."""
+    fields = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+    kb = _read_kb(f"/proc/{pid}/smaps_rollup", fields)
+    if not kb["Rss"]:
+        kb["Rss"] = _read_kb(f"/proc/{pid}/status", ("VmRSS",))["VmRSS"]
+    mib = lambda v: round(v / 1024, 1)
+    return {
+        "pid": pid,
+        "rss_mib": mib(kb["Rss"]),
+        "pss_mib": mib(kb["Pss"]),
+        "shared_mib": mib(kb["Shared_Clean"] + kb["Shared_Dirty"]),
+        "private_mib": mib(kb["Private_Clean"] + kb["Private_Dirty"]),
+    }
+
+
+def memory_report(pids) -> dict:
+    """Per-process memory plus totals. PSS is the honest total for shared pages."""
+    procs = [process_memory(p) for p in pids]
+    return {
+        "processes": procs,
+        "total_rss_mib": round(sum(p["rss_mib"] for p in procs), 1),
+        "total_pss_mib": round(sum(p["pss_mib"] for p in procs), 1),
+    }
+
+
+def print_memory_report(master_pid, worker_pids):
+    report = memory_report([master_pid] + list(worker_pids))
+    print("📊 Memory per process (MiB):")
+    print(f"   {'role':<8} {'pid':>7} {'rss':>8} {'pss':>8} {'shared':>8} {'private':>8}")
+    for i, p in enumerate(report["processes"]):
+        role = "master" if i == 0 else f"worker{i}"
+        print(f"   {role:<8} {p['pid']:>7} {p['rss_mib']:>8} {p['pss_mib']:>8} "
+              f"{p['shared_mib']:>8} {p['private_mib']:>8}")
+    print(f"   total RSS {report['total_rss_mib']} MiB, total PSS {report['total_pss_mib']} MiB")
+    return report
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, log_level, torch_threads):
+    import uvicorn
+    from .executor import configure_torch_threads
+
+    # Each worker gets its own slice of cores instead of all of them
+    configure_torch_threads(torch_threads, TORCH_INTER_OP_THREADS)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _prepare_master(server):
+    """Load and warm up the models in the master, leaving it safe to fork."""
+    from .executor import configure_torch_threads
+
+    # GNU OpenMP does not survive fork(): once the master has run a parallel
+    # region on more than one thread, a child entering its own parallel region
+    # waits forever on threads that were not copied. Warm up single-threaded so
+    # the pool is only ever started in the workers.
+    server.TORCH_INTRA_OP_THREADS = 1
+    configure_torch_threads(1)
+    server.load_and_warm_up()
+
+    # Move everything allocated so far out of the GC's reach: collections in the
+    # children would otherwise touch object headers and un-share those pages.
+    gc.collect()
+    gc.freeze()
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info", report_after: float = 5.0):
+    if not hasattr(os, "fork"):
+        sys.exit("Pre-fork mode needs os.fork (Linux/macOS); use uvicorn --workers instead.")
+
+    from . import server
+
+    if server.get_device() != -1:
+        sys.exit("Pre-fork mode is CPU-only: CUDA contexts do not survive fork().")
+
+    print(f"🚀 Master {os.getpid()} loading models once for {workers} workers...")
+    started = time.perf_counter()
+    _prepare_master(server)
+    print(f"   ✅ Models loaded in {time.perf_counter() - started:.1f}s")
+
+    sock = _bind_socket(host, port)
+    cores = os.cpu_count() or 1
+    torch_threads = TORCH_INTRA_OP_THREADS or max(1, cores // workers)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(server.app, sock, log_level, torch_threads)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print(f"🍴 Forked workers {children} on http://{host}:{port} ({torch_threads} torch threads each)")
+
+    def forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+
+    if report_after > 0:
+        time.sleep(report_after)
+        print_memory_report(os.getpid(), children)
+
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the emotion backend with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report-after", type=float, default=5.0,
+                        help="Seconds after fork to print the per-worker memory report (0 = off)")
+    args = parser.parse_args()
+    serve(args.host, args.port, max(1, args.workers), args.log_level, args.report_after)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,43 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import asyncio
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from .startup import PROCESS_START, StartupState, print_timings, warm_start
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from transformers import pipeline
-import torch
 import numpy as np
 
-from .config import MODEL_ID, TEXT_MODEL_ID, SAMPLE_RATE, CORS_ALLOW_ORIGINS, DEVICE_PREFERENCE
+from .config import (
+    MODEL_ID, TEXT_MODEL_ID, SAMPLE_RATE, CORS_ALLOW_ORIGINS, DEVICE_PREFERENCE,
+    TEXT_BATCH_MAX_SIZE, TEXT_BATCH_MAX_WAIT_MS,
+    AUDIO_BATCH_BUCKETS, AUDIO_BATCH_MAX_SIZE, AUDIO_BATCH_MAX_DELAY_MS,
+    INFERENCE_WORKERS, INFERENCE_MAX_PENDING, TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS,
+    STREAM_WINDOW_S, STREAM_HOP_S, STREAM_MAX_WINDOW_S, STREAM_INCREMENTAL,
+    TEXT_CACHE_BACKEND, TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_MAX_BYTES, TEXT_CACHE_TTL_S, REDIS_URL,
+    INFERENCE_BACKEND, METRICS_ENABLED, METRICS_SERVER_TIMING,
+    STARTUP_BLOCKING, STARTUP_PARALLEL_LOAD, STARTUP_WARMUP, BATCH_MAX_ITEMS,
+    TIMELINE_WINDOW_S, TIMELINE_HOP_S, TIMELINE_BATCH_SIZE, TIMELINE_BLOCK_S,
+    VAD_ENABLED, VAD_THRESHOLD_DB, VAD_ZCR_MAX, VAD_HANGOVER_MS, VAD_MIN_SPEECH_MS,
+)
 from .responses import RESPONSES, TEXT_RESPONSES
-from .utils import read_audio_to_mono_float32, resample_if_needed, normalize_if_needed, to_prob_vector
+from .batching import MicroBatcher, BucketedBatcher
+from .cache import build_cache, cache_key
+from .executor import InferenceExecutor, QueueDepthMiddleware, QueueFullError, configure_torch_threads
+from . import metrics, model_store
+from .metrics import stage
+from .incremental import IncrementalWav2Vec2, supports_incremental
+from .streaming import StreamSession
+from .timeline import MIN_WINDOW_S, TimelineSummary, WindowSegmenter, encode_event, read_blocks
+from .vad import SpeechGate, VoiceActivityDetector
+from .utils import decode_audio, decode_pcm_audio, extract_audio_archive, is_archive, to_prob_vector
+
+startup = StartupState()
+startup.record("import_app", time.perf_counter() - PROCESS_START)
 
 # ---------- App ----------
 app = FastAPI(title="Emotion Backend", version="1.0.0")
@@ -20,45 +50,215 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "Retry-After", "X-Queue-Depth", "X-Queue-Limit", "X-Speech"],
 )
+if METRICS_ENABLED:
+    app.add_middleware(metrics.ServerTimingMiddleware, server_timing=METRICS_SERVER_TIMING)
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 # ---------- Model ----------
+# torch/transformers are imported on first use (see app.startup), not at import time
 def select_device():
+    if DEVICE_PREFERENCE == "cpu" or use_onnx():
+        return -1
+    import torch
+
     if DEVICE_PREFERENCE == "gpu" and torch.cuda.is_available():
         return 0
-    if DEVICE_PREFERENCE == "cpu":
-        return -1
     # auto
     return 0 if torch.cuda.is_available() else -1
 
-device_arg = select_device()
+device_arg = None
 clf = None
 text_clf = None
+_load_locks = {"audio": threading.Lock(), "text": threading.Lock()}
+
+def get_device():
+    global device_arg
+    if device_arg is None:
+        device_arg = select_device()
+    return device_arg
+
+def use_onnx():
+    if INFERENCE_BACKEND not in ("torch", "onnx", "onnx-int8"):
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{INFERENCE_BACKEND}' (torch | onnx | onnx-int8)")
+    return INFERENCE_BACKEND.startswith("onnx")
 
 def get_model():
     global clf
-    if clf is None:
-        clf = pipeline(
+    if clf is not None:
+        return clf
+    with _load_locks["audio"]:
+        if clf is None:
+            clf = _load_audio_model()
+    return clf
+
+def get_text_model():
+    global text_clf
+    if text_clf is not None:
+        return text_clf
+    with _load_locks["text"]:
+        if text_clf is None:
+            text_clf = _load_text_model()
+    return text_clf
+
+def _load_audio_model():
+    started = time.perf_counter()
+    if use_onnx():
+        from .onnx_backend import load_classifier
+        model = load_classifier("audio-classification", MODEL_ID, INFERENCE_BACKEND == "onnx-int8",
+                                TORCH_INTRA_OP_THREADS)
+    elif model_store.is_pinned(MODEL_ID):
+        model = model_store.load_pipeline("audio-classification", MODEL_ID, device=get_device(),
+                                          top_k=None, truncation=True)
+    else:
+        from transformers import pipeline
+        model = pipeline(
             task="audio-classification",
             model=MODEL_ID,
-            device=device_arg,
+            device=get_device(),
             top_k=None,
             truncation=True
         )
-    return clf
+    metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - started, model="audio")
+    return model
 
-def get_text_model():
-    global text_clf
-    if text_clf is None:
-        text_clf = pipeline(
+def _load_text_model():
+    started = time.perf_counter()
+    if use_onnx():
+        from .onnx_backend import load_classifier
+        model = load_classifier("text-classification", TEXT_MODEL_ID, INFERENCE_BACKEND == "onnx-int8",
+                                TORCH_INTRA_OP_THREADS)
+    elif model_store.is_pinned(TEXT_MODEL_ID):
+        model = model_store.load_pipeline("text-classification", TEXT_MODEL_ID, device=get_device(),
+                                          top_k=None, truncation=True, max_length=512)
+    else:
+        from transformers import pipeline
+        model = pipeline(
             task="text-classification",
             model=TEXT_MODEL_ID,
-            device=device_arg,
+            device=get_device(),
             top_k=None,
             truncation=True,
             max_length=512,
         )
-    return text_clf
+    metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - started, model="text")
+    return model
+
+# ---------- Executor / Batching ----------
+inference = InferenceExecutor(max_workers=INFERENCE_WORKERS, max_pending=INFERENCE_MAX_PENDING)
+# Queue depth on every response lets streaming clients back off before 429s
+app.add_middleware(QueueDepthMiddleware, executor=inference)
+
+def classify_texts(texts):
+    """Run one padded forward pass over ``texts``; returns one score list per text."""
+    model = get_text_model()
+    results = model(list(texts), batch_size=len(texts))
+    # text-classification with top_k=None returns [[{...}, ...], ...] for list input
+    return [r if isinstance(r, list) else [r] for r in results]
+
+def classify_waveforms(waves):
+    """Classify 16 kHz mono waveforms, one batched forward pass per distinct length.
+
+    wav2vec2-base gets no attention mask, so zero padding would leak into its
+    mean pooling and make a clip's result depend on what it was batched with.
+    Only equal-length waves share a pass; the length buckets just make that
+    likelier for streaming and timeline windows.
+    """
+    model = get_model()
+    by_length = {}
+    for i, w in enumerate(waves):
+        by_length.setdefault(len(w), []).append(i)
+    results = [None] * len(waves)
+    started = time.perf_counter()
+    for indices in by_length.values():
+        inputs = [{"array": waves[i], "sampling_rate": SAMPLE_RATE} for i in indices]
+        for i, r in zip(indices, model(inputs, batch_size=len(inputs))):
+            results[i] = r if isinstance(r, list) else [r]
+    speech_gate.observe_inference(sum(len(w) for w in waves) / SAMPLE_RATE, time.perf_counter() - started)
+    return results
+
+# Silent windows never reach the model (see app.vad)
+speech_gate = SpeechGate(
+    VoiceActivityDetector(SAMPLE_RATE, threshold_db=VAD_THRESHOLD_DB, zcr_max=VAD_ZCR_MAX,
+                          hangover_ms=VAD_HANGOVER_MS, min_speech_ms=VAD_MIN_SPEECH_MS),
+    enabled=VAD_ENABLED,
+)
+
+def gate_waves(waves, route, enabled=None):
+    """One bool per waveform: True if it has speech and should go to the model."""
+    with stage("vad"):
+        return speech_gate.check(waves, route, enabled)
+
+_no_speech = None
+
+def no_speech_result():
+    """Raw model-style result for a skipped window: all probability on the neutral label."""
+    global _no_speech
+    if _no_speech is None:
+        model = get_model()
+        id2label = getattr(model, "id2label", None) or model.model.config.id2label
+        labels = [id2label[i] for i in sorted(id2label)]
+        neutral = next((l for l in labels if l.lower().startswith("neu")), labels[0])
+        _no_speech = [{"label": l, "score": 1.0 if l == neutral else 0.0} for l in labels]
+    return _no_speech
+
+audio_batcher = BucketedBatcher(
+    classify_waveforms,
+    boundaries=AUDIO_BATCH_BUCKETS,
+    length_fn=lambda w: len(w) / SAMPLE_RATE,
+    max_batch_size=AUDIO_BATCH_MAX_SIZE,
+    max_wait_ms=AUDIO_BATCH_MAX_DELAY_MS,
+    name="audio",
+    executor=inference,
+)
+
+text_batcher = MicroBatcher(
+    classify_texts,
+    max_batch_size=TEXT_BATCH_MAX_SIZE,
+    max_wait_ms=TEXT_BATCH_MAX_WAIT_MS,
+    name="text",
+    executor=inference,
+)
+
+text_cache = build_cache(
+    TEXT_CACHE_BACKEND,
+    max_entries=TEXT_CACHE_MAX_ENTRIES,
+    max_bytes=TEXT_CACHE_MAX_BYTES,
+    ttl_s=TEXT_CACHE_TTL_S,
+    url=REDIS_URL,
+)
+
+# ---------- Metrics ----------
+def _cache_stat(field):
+    return lambda: text_cache.snapshot()[field] if text_cache is not None else 0
+
+metrics.REGISTRY.callback("emotion_startup_seconds", "Startup phase durations (imports, model loads, warm-up)",
+                          lambda: {(k,): v for k, v in startup.timings.items()}, ["phase"])
+metrics.REGISTRY.callback("emotion_ready", "1 once models are loaded and warm", lambda: int(startup.ready))
+metrics.REGISTRY.callback("emotion_inference_pending", "Requests queued or running on the inference pool",
+                          lambda: inference.pending)
+metrics.REGISTRY.callback("emotion_inference_max_pending", "Pending requests allowed before 429",
+                          lambda: inference.max_pending)
+metrics.REGISTRY.callback("emotion_inference_rejected_total", "Requests rejected with 429 (queue full)",
+                          lambda: inference.rejected, kind="counter")
+metrics.REGISTRY.callback(
+    "emotion_batch_queue_depth", "Items waiting for the next batched forward pass",
+    lambda: {(name,): depth for name, depth in
+             {text_batcher.name: text_batcher.queue_depth(), **audio_batcher.queue_depths()}.items()},
+    ["batcher"],
+)
+for _field in ("hits", "misses", "sets", "evictions", "expired", "errors"):
+    metrics.REGISTRY.callback(f"emotion_text_cache_{_field}_total", f"Text result cache {_field}",
+                              _cache_stat(_field), kind="counter")
+if TEXT_CACHE_BACKEND == "memory":
+    metrics.REGISTRY.callback("emotion_text_cache_entries", "Entries in the text result cache",
+                              _cache_stat("entries"))
+    metrics.REGISTRY.callback("emotion_text_cache_bytes", "Approximate size of the text result cache",
+                              _cache_stat("bytes"))
 
 # ---------- Schemas ----------
 class PredictOut(BaseModel):
@@ -76,55 +276,204 @@ class TextPredictOut(BaseModel):
     probs: dict
     response: str
 
+class TextBatchIn(BaseModel):
+    texts: List[str]
+
+class TextBatchItem(BaseModel):
+    index: int
+    result: Optional[TextPredictOut] = None
+    error: Optional[str] = None
+
+class TextBatchOut(BaseModel):
+    results: List[TextBatchItem]
+
+class AudioBatchItem(BaseModel):
+    index: int
+    name: Optional[str] = None
+    result: Optional[PredictOut] = None
+    error: Optional[str] = None
+
+class AudioBatchOut(BaseModel):
+    results: List[AudioBatchItem]
+
+def audio_result_to_out(result) -> PredictOut:
+    labels = [r["label"] for r in result]
+    raw_vals = [r.get("score", 0.0) for r in result]
+    probs_map = to_prob_vector(labels, raw_vals)
+
+    # Top-1
+    top_label = max(probs_map, key=probs_map.get)
+    top_score = probs_map[top_label]
+    response_text = RESPONSES.get(top_label, "Okay.")
+
+    return PredictOut(label=top_label, score=top_score, probs=probs_map, response=response_text)
+
+def text_result_to_out(result) -> TextPredictOut:
+    # Build probability map
+    probs_map = {r["label"]: round(r["score"], 4) for r in result}
+
+    # Top-1
+    top = max(result, key=lambda r: r["score"])
+    top_label = top["label"]
+    top_score = top["score"]
+    response_text = TEXT_RESPONSES.get(top_label, RESPONSES.get(top_label, "Okay."))
+
+    return TextPredictOut(
+        label=top_label,
+        score=round(top_score, 4),
+        probs=probs_map,
+        response=response_text,
+    )
+
+# ---------- Startup ----------
+def _prepare_backend():
+    threads = configure_torch_threads(TORCH_INTRA_OP_THREADS, TORCH_INTER_OP_THREADS)
+    print(f"🧵 Inference pool: {INFERENCE_WORKERS} workers, torch threads {threads}")
+    if not use_onnx():
+        # Resolve transformers' lazy pipeline module here, once, rather than in both loader threads
+        from transformers import pipeline  # noqa: F401
+    get_device()
+
+def _warmup_audio():
+    t = np.arange(2 * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    classify_waveforms([0.1 * np.sin(2 * np.pi * 220 * t) * (1 + np.sin(2 * np.pi * 3 * t))])
+
+def _warmup_text():
+    classify_texts(["Thanks for calling, how are you feeling today?"])
+
+def load_and_warm_up():
+    """Blocking warm start (also used by app.prefork before forking)."""
+    if startup.ready:
+        return
+    print("🚀 Loading emotion models" + (" in parallel..." if STARTUP_PARALLEL_LOAD else "..."))
+    warm_start(
+        startup,
+        _prepare_backend,
+        {"text": (get_text_model, _warmup_text), "audio": (get_model, _warmup_audio)},
+        warmup=STARTUP_WARMUP,
+        parallel=STARTUP_PARALLEL_LOAD,
+    )
+    print_timings(startup)
+    print("🎭 Emotion detection ready!")
+
+_loading = None
+
+async def _background_start():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, load_and_warm_up)
+    except Exception as e:
+        print(f"   ⚠️ Model pre-load failed: {e}")
+
+async def wait_ready():
+    """Hold requests that arrive while the models are still loading."""
+    if not startup.ready and _loading is not None:
+        await asyncio.shield(_loading)
+    if startup.status == "failed":
+        raise HTTPException(status_code=503, detail=f"Models failed to load: {startup.error}")
+
 # ---------- Routes ----------
 @app.on_event("startup")
 async def startup_event():
-    """Pre-load models on startup so first request is fast."""
-    print("🚀 Pre-loading emotion models...")
-    try:
-        print("   📦 Loading text emotion model...")
-        get_text_model()
-        print("   ✅ Text model loaded!")
-        print("   📦 Loading audio emotion model...")
-        get_model()
-        print("   ✅ Audio model loaded!")
-        print("🎭 Emotion detection ready!")
-    except Exception as e:
-        print(f"   ⚠️ Model pre-load warning: {e}")
+    """Start loading models in the background; /live answers right away, /ready once warm."""
+    global _loading
+    _loading = asyncio.create_task(_background_start())
+    if STARTUP_BLOCKING:
+        await _loading
+
+@app.get("/live")
+def live():
+    return {"status": "alive"}
+
+@app.get("/ready")
+def ready():
+    body = startup.snapshot()
+    return JSONResponse(status_code=200 if startup.ready else 503, content=body)
 
 @app.get("/health")
 def health():
     return {
-        "status": "ok",
+        "status": "ok" if startup.ready else startup.status,
         "audio_model": MODEL_ID,
         "text_model": TEXT_MODEL_ID,
-        "device": "gpu" if device_arg == 0 else "cpu",
+        "device": None if device_arg is None else ("gpu" if device_arg == 0 else "cpu"),
+        "backend": INFERENCE_BACKEND,
+        "startup": startup.snapshot(),
+        "batching": {"text": text_batcher.stats.snapshot(), "audio": audio_batcher.snapshot()},
+        "inference": inference.snapshot(),
+        "text_cache": text_cache.snapshot() if text_cache else None,
+        "vad": speech_gate.snapshot(),
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await text_batcher.close()
+    await audio_batcher.close()
+    inference.shutdown(wait=False)
+
+def pcm_params(request: Request):
+    """(sample_rate, sample_format, channels) for a raw PCM body, from X-* headers."""
+    h = request.headers
+    try:
+        sample_rate = int(h.get("x-sample-rate", SAMPLE_RATE))
+        channels = int(h.get("x-channels", 1))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="X-Sample-Rate and X-Channels must be integers")
+    if sample_rate <= 0 or channels <= 0:
+        raise HTTPException(status_code=400, detail="X-Sample-Rate and X-Channels must be positive")
+    return sample_rate, h.get("x-sample-format", "pcm16").lower(), channels
+
 @app.post("/predict", response_model=PredictOut)
-async def predict(file: UploadFile = File(...)):
+async def predict(request: Request, response: Response, file: UploadFile = File(None)):
+    """Audio emotion from a multipart file upload, or from a raw PCM body.
+
+    Raw PCM: ``Content-Type: application/octet-stream`` with little-endian
+    pcm16 or float32 samples, described by ``X-Sample-Rate`` (default
+    SAMPLE_RATE), ``X-Channels`` (interleaved, default 1) and
+    ``X-Sample-Format`` ('pcm16' | 'float32'). Skips multipart parsing and
+    WAV decoding entirely.
+
+    Clips without speech skip the model and get the neutral result, marked
+    with an ``X-Speech: 0`` response header.
+    """
     try:
-        data = await file.read()
+        raw = request.headers.get("content-type", "").startswith("application/octet-stream")
+        if raw:
+            data = await request.body()
+            params = pcm_params(request)
+        elif file is not None:
+            data = await file.read()
+        else:
+            raise HTTPException(status_code=400, detail="Send a multipart 'file' or an application/octet-stream body")
         if not data:
             raise HTTPException(status_code=400, detail="Empty file")
-        wav, sr = read_audio_to_mono_float32(data)
-        wav, sr = resample_if_needed(wav, sr, SAMPLE_RATE)
-        wav = normalize_if_needed(wav)
-
-        # Inference
-        model = get_model()
-        result = model({"array": wav, "sampling_rate": sr})
-        labels = [r["label"] for r in result]
-        raw_vals = [r.get("score", 0.0) for r in result]
-        probs_map = to_prob_vector(labels, raw_vals)
-
-        # Top-1
-        top_label = max(probs_map, key=probs_map.get)
-        top_score = probs_map[top_label]
-        response_text = RESPONSES.get(top_label, "Okay.")
+        await wait_ready()
+        async with inference.slot():
+            if raw:
+                try:
+                    wav = await inference.run(decode_pcm_audio, data, *params, SAMPLE_RATE)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            else:
+                wav = await inference.run(decode_audio, data, SAMPLE_RATE)
 
-        return PredictOut(label=top_label, score=top_score, probs=probs_map, response=response_text)
+            if (await inference.run(gate_waves, [wav], "predict"))[0]:
+                # Inference (batched with concurrent clips of similar length)
+                with stage("inference"):
+                    result = await audio_batcher.submit(wav)
+            else:
+                result = no_speech_result()
+                response.headers["X-Speech"] = "0"
+        with stage("postprocess"):
+            return audio_result_to_out(result)
 
+    except (HTTPException, QueueFullError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Inference error: {str(e)}")
 
@@ -137,30 +486,367 @@ async def predict_text(body: TextPredictIn):
         if not text:
             raise HTTPException(status_code=400, detail="Empty text")
 
-        model = get_text_model()
-        result = model(text)
+        # Short phrases repeat a lot in chat and call transcripts
+        key = cache_key(TEXT_MODEL_ID, text, INFERENCE_BACKEND)
+        if text_cache is not None:
+            with stage("cache"):
+                cached = await text_cache.get(key)
+            if cached is not None:
+                return TextPredictOut(**cached)
+
+        # Coalesced with concurrent requests into a single batched forward pass
+        await wait_ready()
+        async with inference.slot():
+            with stage("inference"):
+                result = await text_batcher.submit(text)
+
+        with stage("postprocess"):
+            out = text_result_to_out(result)
+        if text_cache is not None:
+            await text_cache.set(key, out.dict())
+        return out
 
-        # text-classification with top_k=None returns [[{...}, ...]]
-        if isinstance(result, list) and len(result) > 0 and isinstance(result[0], list):
-            result = result[0]
+    except (HTTPException, QueueFullError):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Text inference error: {str(e)}")
 
-        # Build probability map
-        probs_map = {r["label"]: round(r["score"], 4) for r in result}
 
-        # Top-1
-        top = max(result, key=lambda r: r["score"])
-        top_label = top["label"]
-        top_score = top["score"]
-        response_text = TEXT_RESPONSES.get(top_label, RESPONSES.get(top_label, "Okay."))
+def chunks(items, size: int):
+    """Consecutive slices of at most ``size`` items."""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
-        return TextPredictOut(
-            label=top_label,
-            score=round(top_score, 4),
-            probs=probs_map,
-            response=response_text,
-        )
+def check_batch_size(n: int):
+    if n == 0:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if n > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch of {n} items exceeds BATCH_MAX_ITEMS={BATCH_MAX_ITEMS}")
+
+@app.post("/predict-text/batch", response_model=TextBatchOut)
+async def predict_text_batch(body: TextBatchIn):
+    """Emotion for many texts in one round trip; results in input order, errors per item.
 
-    except HTTPException:
+    Cache hits are answered directly; repeated texts are classified once; the
+    rest go through the text micro-batcher a TEXT_BATCH_MAX_SIZE chunk at a
+    time, each chunk taking its own inference slot, so a bulk request shares
+    the pool with other traffic instead of flooding it.
+    """
+    check_batch_size(len(body.texts))
+    items = [TextBatchItem(index=i) for i in range(len(body.texts))]
+    by_key = {}  # cache key -> (text, [indexes]); identical texts share one result
+    for i, raw in enumerate(body.texts):
+        text = raw.strip()
+        if not text:
+            items[i].error = "Empty text"
+            continue
+        by_key.setdefault(cache_key(TEXT_MODEL_ID, text, INFERENCE_BACKEND), (text, []))[1].append(i)
+
+    def fill(key, out):
+        for i in by_key[key][1]:
+            items[i].result = out
+
+    try:
+        misses = list(by_key)
+        if text_cache is not None and misses:
+            with stage("cache"):
+                cached = await asyncio.gather(*(text_cache.get(k) for k in misses))
+            for key, hit in zip(misses, cached):
+                if hit is not None:
+                    fill(key, TextPredictOut(**hit))
+            misses = [k for k, hit in zip(misses, cached) if hit is None]
+
+        if misses:
+            await wait_ready()
+        for chunk in chunks(misses, TEXT_BATCH_MAX_SIZE):
+            async with inference.slot():
+                with stage("inference"):
+                    results = await asyncio.gather(*(text_batcher.submit(by_key[k][0]) for k in chunk),
+                                                   return_exceptions=True)
+            with stage("postprocess"):
+                for key, result in zip(chunk, results):
+                    if isinstance(result, Exception):
+                        for i in by_key[key][1]:
+                            items[i].error = f"Text inference error: {result}"
+                        continue
+                    out = text_result_to_out(result)
+                    fill(key, out)
+                    if text_cache is not None:
+                        await text_cache.set(key, out.dict())
+        return TextBatchOut(results=items)
+
+    except (HTTPException, QueueFullError):
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Text inference error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Text inference error: {str(e)}")
+
+
+@app.post("/predict/batch", response_model=AudioBatchOut)
+async def predict_batch(files: List[UploadFile] = File(...)):
+    """Emotion for many clips in one round trip; results in input order, errors per item.
+
+    Send several multipart ``files`` parts, or one (or more) .zip/.tar(.gz)
+    archives of audio files. Clips are decoded on the inference pool and go
+    through the length-bucketed audio batcher an AUDIO_BATCH_MAX_SIZE chunk
+    at a time, each chunk taking its own inference slot.
+    """
+    parts = []  # (name, bytes or error message)
+    for f in files:
+        data = await f.read()
+        if is_archive(f.filename, f.content_type):
+            try:
+                parts.extend(await inference.run(extract_audio_archive, data, BATCH_MAX_ITEMS + 1))
+            except ValueError as e:
+                parts.append((f.filename, e))
+        else:
+            parts.append((f.filename, data))
+        if len(parts) > BATCH_MAX_ITEMS:
+            check_batch_size(len(parts))  # stop reading further parts early
+    check_batch_size(len(parts))
+
+    async def one(index, name, data):
+        try:
+            if isinstance(data, Exception):
+                raise data
+            if not data:
+                raise ValueError("Empty file")
+            wav = await inference.run(decode_audio, data, SAMPLE_RATE)
+            if (await inference.run(gate_waves, [wav], "batch"))[0]:
+                result = await audio_batcher.submit(wav)
+            else:
+                result = no_speech_result()
+            return AudioBatchItem(index=index, name=name, result=audio_result_to_out(result))
+        except Exception as e:
+            return AudioBatchItem(index=index, name=name, error=f"{type(e).__name__}: {e}")
+
+    await wait_ready()
+    items = []
+    for chunk in chunks(list(enumerate(parts)), AUDIO_BATCH_MAX_SIZE):
+        async with inference.slot():
+            with stage("inference"):
+                items.extend(await asyncio.gather(*(one(i, name, data) for i, (name, data) in chunk)))
+    return AudioBatchOut(results=items)
+
+
+async def spool_body(request: Request, max_memory: int = 1024 * 1024):
+    """Copy the request body into a temp file that moves to disk past ``max_memory`` bytes."""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    return spool
+
+async def file_blocks(blocks):
+    """Async view of a ``read_blocks`` generator; each read runs on the inference pool."""
+    while True:
+        block = await inference.run(next, blocks, None)
+        if block is None:
+            return
+        yield block
+
+async def timeline_events(blocks, segmenter: WindowSegmenter, vad: Optional[bool], batch_size: int):
+    summary = TimelineSummary()
+
+    async def classify(segments):
+        keep = await inference.run(gate_waves, [s.wave for s in segments], "timeline", vad)
+        speech = [s for s, k in zip(segments, keep) if k]
+        with stage("inference"):
+            results = await asyncio.gather(*(audio_batcher.submit(s.wave) for s in speech))
+        labelled = {s.index: audio_result_to_out(r) for s, r in zip(speech, results)}
+        events = []
+        for s in segments:
+            s.wave = None
+            out = labelled.get(s.index)
+            summary.add(s, out.label if out is not None else None)
+            events.append(s.event("segment", **out.dict()) if out is not None else s.event("silence"))
+        return events
+
+    try:
+        await wait_ready()
+        async with inference.slot():
+            # Pull more audio only while less than a batch of windows is waiting
+            async for block in blocks:
+                await inference.run(segmenter.push, block)
+                while len(segmenter.ready) >= batch_size:
+                    for event in await classify(segmenter.take(batch_size)):
+                        yield event
+            await inference.run(segmenter.finish)
+            while segmenter.ready:
+                for event in await classify(segmenter.take(batch_size)):
+                    yield event
+        yield summary.event(segmenter.seconds)
+    except HTTPException as e:
+        yield {"type": "error", "detail": e.detail}
+    except Exception as e:
+        # Headers are long gone; report in-band and end the stream
+        yield {"type": "error", "detail": f"{type(e).__name__}: {e}"}
+
+@app.post("/predict/timeline")
+async def predict_timeline(request: Request, format: str = "ndjson", window: float = TIMELINE_WINDOW_S,
+                           hop: Optional[float] = None, vad: Optional[bool] = None):
+    """Per-window emotion timeline for a long recording, streamed while it is processed.
+
+    Takes the same inputs as ``/predict`` (multipart ``file`` or a raw PCM
+    body with X-* headers). The audio is read a block at a time, cut into
+    ``window``-second windows every ``hop`` seconds (default TIMELINE_HOP_S)
+    and classified a batch of windows at a time. Windows without speech skip
+    the model (``vad`` overrides VAD_ENABLED). Each window becomes a
+    ``segment`` (or ``silence``) event, followed by one ``summary``;
+    ``format`` is 'ndjson' (one JSON object per line) or 'sse'
+    (text/event-stream).
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    hop = TIMELINE_HOP_S if hop is None else hop
+    if not MIN_WINDOW_S <= window <= STREAM_MAX_WINDOW_S or hop <= 0:
+        raise HTTPException(status_code=400,
+                            detail=f"window must be in [{MIN_WINDOW_S:g}, {STREAM_MAX_WINDOW_S:g}] s and hop positive")
+
+    # Both kinds of body are spooled (to disk past 1 MiB) and read back block by
+    # block. Parsed here rather than by a File() parameter, which would read a
+    # raw body into memory before the handler runs.
+    form, spool, raw = None, None, None
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/octet-stream"):
+        raw = pcm_params(request)
+        spool = fileobj = await spool_body(request)
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        fileobj = getattr(form.get("file"), "file", None)
+    else:
+        raise HTTPException(status_code=400, detail="Send a multipart 'file' or an application/octet-stream body")
+
+    async def close():
+        if spool is not None:
+            spool.close()
+        if form is not None:
+            await form.close()
+
+    try:
+        if fileobj is None:
+            raise ValueError("no 'file' part")
+        sample_rate, source = await inference.run(read_blocks, fileobj, TIMELINE_BLOCK_S, raw)
+    except Exception as e:
+        await close()
+        raise HTTPException(status_code=400, detail=f"Unreadable audio: {e}")
+    blocks = file_blocks(source)
+    segmenter = WindowSegmenter(sample_rate, SAMPLE_RATE, window, hop)
+    sse = format == "sse"
+
+    async def body():
+        try:
+            async for event in timeline_events(blocks, segmenter, vad, max(1, TIMELINE_BATCH_SIZE)):
+                yield encode_event(event, sse)
+        finally:
+            await close()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/stream")
+async def ws_stream(websocket: WebSocket):
+    """Persistent audio stream: binary frames of raw PCM in, emotion JSON out.
+
+    Query params: sample_rate (default SAMPLE_RATE), format ('pcm16' | 'float32'),
+    channels, window and hop (seconds). The server keeps the last window per
+    connection and classifies it every hop, so clients send each sample once.
+    """
+    await websocket.accept()
+    q = websocket.query_params
+    try:
+        window_s = float(q.get("window", STREAM_WINDOW_S))
+        if not MIN_WINDOW_S <= window_s <= STREAM_MAX_WINDOW_S:
+            raise ValueError(f"window must be in [{MIN_WINDOW_S:g}, {STREAM_MAX_WINDOW_S:g}] s")
+        session = StreamSession(
+            sample_rate=int(q.get("sample_rate", SAMPLE_RATE)),
+            window_s=window_s,
+            hop_s=float(q.get("hop", STREAM_HOP_S)),
+            sample_format=q.get("format", "pcm16"),
+            channels=int(q.get("channels", 1)),
+            target_rate=SAMPLE_RATE,
+        )
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1003)
+        return
+
+    try:
+        await wait_ready()
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1011)
+        return
+
+    ready = asyncio.Event()
+    encoder = None
+    if STREAM_INCREMENTAL:
+        # Only new audio goes through the CNN each hop; needs the raw torch model
+        # (exact only for LayerNorm CNNs without input normalization; others use full windows)
+        model = await inference.run(get_model)
+        if supports_incremental(getattr(model, "model", None), getattr(model, "feature_extractor", None)):
+            try:
+                encoder = IncrementalWav2Vec2(model.model, model.feature_extractor, session.window_samples)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                await websocket.close(code=1003)
+                return
+
+    def classify_incremental(new, contiguous, speech):
+        # New audio always goes through the CNN so the cache stays contiguous
+        if not contiguous:
+            encoder.reset()
+        encoder.push(new)
+        if not encoder.ready:
+            return None
+        return encoder.classify() if speech else no_speech_result()
+
+    async def infer_loop():
+        # One window in flight per connection; newer windows replace stale ones.
+        while True:
+            await ready.wait()
+            ready.clear()
+            t = session.seconds
+            try:
+                async with inference.slot():
+                    with stage("stream_inference"):
+                        wave = session.window()
+                        speech = (await inference.run(gate_waves, [wave], "stream"))[0]
+                        if encoder is not None:
+                            result = await inference.run(classify_incremental, *session.take_new(), speech)
+                            if result is None:
+                                continue
+                        elif speech:
+                            result = await audio_batcher.submit(wave)
+                        else:
+                            result = no_speech_result()
+                out = audio_result_to_out(result)
+                await websocket.send_json({"type": "emotion", "t": round(t, 3), "speech": speech, **out.dict()})
+            except QueueFullError as e:
+                await websocket.send_json({"type": "busy", "t": round(t, 3), "detail": str(e)})
+            except Exception as e:
+                await websocket.send_json({"type": "error", "t": round(t, 3), "detail": f"Inference error: {e}"})
+
+    worker = asyncio.create_task(infer_loop())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            payload = message.get("bytes")
+            if payload is None:
+                await websocket.send_json({"type": "error", "detail": "Send audio as binary frames"})
+                continue
+            try:
+                due = session.feed(payload)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            if due:
+                ready.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker.cancel()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Startup subsystem: readiness state, timing breakdown and parallel warm start.
+
+``app.server`` no longer imports torch/transformers at import time, so the
+process can bind its port and answer ``/live`` within a fraction of a second.
+``warm_start`` then imports the inference backend once, loads the models
+concurrently and runs one warm-up inference per model on synthetic input,
+recording how long each phase took. ``/ready`` turns 200 only once that has
+succeeded, which is what autoscalers and rolling deploys should wait on.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+PROCESS_START = time.perf_counter()  # first import of the app package
+
+
+class StartupState:
+    """Readiness (``starting`` | ``ready`` | ``failed``) plus per-phase timings in seconds."""
+
+    def __init__(self):
+        self.status = "starting"
+        self.error = None
+        self.timings = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def record(self, phase: str, seconds: float):
+        self.timings[phase] = round(seconds, 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self):
+        self.status = "ready"
+        self.record("ready_after_start", time.perf_counter() - PROCESS_START)
+
+    def mark_failed(self, error: Exception):
+        self.status = "failed"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def snapshot(self):
+        return {"status": self.status, "error": self.error, "timings_s": dict(self.timings)}
+
+
+def warm_start(state: StartupState, prepare, models: dict, warmup: bool = True, parallel: bool = True):
+    """Blocking: run ``prepare()``, then load (and warm up) every model in ``models``.
+
+    ``models`` maps a name to ``(load_fn, warmup_fn)``. With ``parallel`` each
+    model loads and warms up on its own short-lived thread, so the slower model
+    sets the pace instead of the sum of both. The pool is shut down before
+    returning so nothing lingers across a later ``fork()``.
+    """
+
+    def bring_up(name, load, warm):
+        with state.phase(f"load_{name}"):
+            load()
+        if warmup:
+            with state.phase(f"warmup_{name}"):
+                warm()
+
+    try:
+        with state.phase("total"):
+            # Heavy imports happen once here, not concurrently in the loaders
+            with state.phase("import_backend"):
+                prepare()
+            if parallel and len(models) > 1:
+                with ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="startup") as pool:
+                    futures = [pool.submit(bring_up, name, *fns) for name, fns in models.items()]
+                    for f in futures:
+                        f.result()
+            else:
+                for name, fns in models.items():
+                    bring_up(name, *fns)
+    except Exception as e:
+        state.mark_failed(e)
+        raise
+    state.mark_ready()
+
+
+def print_timings(state: StartupState):
+    parts = ", ".join(f"{k} {v:.2f}s" for k, v in state.timings.items())
+    print(f"⏱️ Startup: {parts}")
+
+
+__all__ = ["PROCESS_START", "StartupState", "warm_start", "print_timings"]
@@ -0,0 +1,135 @@
+import numpy as np
+
+from .resample import StreamingResampler
+
+SAMPLE_FORMATS = {"pcm16": np.int16, "float32": np.float32}
+
+
+def decode_pcm(payload: bytes, sample_format: str = "pcm16", channels: int = 1) -> np.ndarray:
+    """Raw little-endian PCM bytes -> mono float32 in [-1, 1]."""
+    dtype = SAMPLE_FORMATS.get(sample_format)
+    if dtype is None:
+        raise ValueError(f"Unsupported sample format '{sample_format}' (use pcm16 or float32)")
+    frame_bytes = np.dtype(dtype).itemsize * channels
+    if len(payload) % frame_bytes:
+        raise ValueError(f"Payload of {len(payload)} bytes is not a whole number of {channels}-channel frames")
+    x = np.frombuffer(payload, dtype=np.dtype(dtype).newbyteorder("<"))
+    if dtype is np.int16:
+        x = x.astype(np.float32) / 32768.0
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return x
+
+
+class AudioRingBuffer:
+    """Fixed-capacity float32 ring buffer holding the most recent samples.
+
+    Every sample is written twice (at ``i`` and ``i + capacity``) so the last
+    ``n`` samples are always one contiguous slice and ``latest`` needs no
+    concatenation.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._buf = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._pos = 0
+        self.total = 0  # samples ever written
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def write(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) >= self.capacity:
+            self.total += len(x)  # every sample counts, including the ones dropped here
+            x = x[-self.capacity:]
+            self._buf[:self.capacity] = x
+            self._buf[self.capacity:] = x
+            self._pos = 0
+            return
+        end = self._pos + len(x)
+        if end <= self.capacity:
+            self._buf[self._pos:end] = x
+            self._buf[self._pos + self.capacity:end + self.capacity] = x
+        else:
+            split = self.capacity - self._pos
+            self._buf[self._pos:self.capacity] = x[:split]
+            self._buf[self._pos + self.capacity:] = x[:split]
+            self._buf[:end - self.capacity] = x[split:]
+            self._buf[self.capacity:end] = x[split:]
+        self._pos = end % self.capacity
+        self.total += len(x)
+
+    def latest(self, n: int) -> np.ndarray:
+        """Read-only view of the last ``n`` samples (valid until the next write)."""
+        n = min(int(n), len(self))
+        start = self._pos + self.capacity - n
+        view = self._buf[start:start + n]
+        view.flags.writeable = False
+        return view
+
+
+class StreamSession:
+    """Per-connection state for ``/ws/stream``.
+
+    Incoming PCM frames are appended to a ring buffer; ``feed`` reports when a
+    full window is buffered and at least one hop of new audio has arrived
+    since the last report. If several hops arrive at once only the newest
+    window matters, so callers read it with ``window()`` when they get to it.
+
+    With ``target_rate`` set, frames are resampled on arrival (filter state
+    carried across frames) and the buffer, window and hop are at that rate.
+    """
+
+    def __init__(self, sample_rate: int, window_s: float, hop_s: float,
+                 sample_format: str = "pcm16", channels: int = 1, target_rate: int = None):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format '{sample_format}' (use pcm16 or float32)")
+        if window_s <= 0 or hop_s <= 0:
+            raise ValueError("window and hop must be positive")
+        if int(sample_rate) <= 0:
+            raise ValueError("sample_rate must be positive")
+        self.sample_rate = int(sample_rate)
+        self.sample_format = sample_format
+        self.channels = max(1, int(channels))
+        self.rate = int(target_rate or sample_rate)  # rate of buffered samples
+        self.resampler = StreamingResampler(self.sample_rate, self.rate) if self.rate != self.sample_rate else None
+        self.window_samples = int(round(window_s * self.rate))
+        self.hop = int(round(hop_s * self.rate))
+        self.ring = AudioRingBuffer(self.window_samples)
+        self._since_emit = 0
+        self._taken = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.ring.total / self.rate
+
+    def feed(self, payload: bytes) -> bool:
+        """Append one binary frame; True when a new window is due."""
+        x = decode_pcm(payload, self.sample_format, self.channels)
+        if self.resampler is not None:
+            x = self.resampler.process(x)
+        self.ring.write(x)
+        self._since_emit += len(x)
+        if len(self.ring) < self.window_samples or self._since_emit < self.hop:
+            return False
+        self._since_emit = 0
+        return True
+
+    def window(self) -> np.ndarray:
+        """Copy of the latest full window."""
+        return self.ring.latest(self.window_samples).copy()
+
+    def take_new(self):
+        """Samples that arrived since the previous call, as ``(samples, contiguous)``.
+
+        ``contiguous`` is False when more than a window arrived in between, so
+        earlier audio was overwritten and any per-stream cache must restart.
+        """
+        new = self.ring.total - self._taken
+        self._taken = self.ring.total
+        contiguous = new <= self.window_samples
+        return self.ring.latest(min(new, self.window_samples)).copy(), contiguous
+
+
+__all__ = ["SAMPLE_FORMATS", "decode_pcm", "AudioRingBuffer", "StreamSession"]
@@ -0,0 +1,176 @@
+"""
+Emotion timelines for long recordings.
+
+``/predict`` decodes the whole upload into one array and classifies it as a
+single clip. For call recordings that is both unbounded memory and a
+meaningless answer, so ``/predict/timeline`` works on windows instead:
+
+    spooled upload -> soundfile blocks
+        -> mono -> StreamingResampler -> WindowSegmenter -> [gate] -> batches
+
+``WindowSegmenter`` keeps only the samples the next window still needs, and
+the route pulls blocks only while fewer than a batch of windows is waiting,
+so memory is a few blocks plus one batch of windows however long the
+recording is. Events are plain dicts; ``encode_event`` renders them as NDJSON
+lines or server-sent events.
+"""
+import json
+
+import numpy as np
+import soundfile as sf
+
+from .resample import StreamingResampler
+
+MIN_TAIL_S = 0.5     # a final partial window shorter than this is dropped (unless it is the only one)
+MIN_WINDOW_S = 0.05  # below this there is nothing to classify (and wav2vec2's CNN can't run)
+RAW_SUBTYPES = {"pcm16": "PCM_16", "float32": "FLOAT"}
+
+
+class Segment:
+    """One window of the timeline; ``wave`` is None once it has been classified or skipped."""
+
+    __slots__ = ("index", "start", "end", "wave")
+
+    def __init__(self, index: int, start: float, end: float, wave: np.ndarray):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.wave = wave
+
+    def event(self, kind: str, **fields):
+        return {"type": kind, "index": self.index, "start": round(self.start, 3), "end": round(self.end, 3),
+                **fields}
+
+
+class WindowSegmenter:
+    """Cut a mono stream into ``window_s`` windows every ``hop_s`` at ``target_sr``.
+
+    ``push`` takes blocks at ``sample_rate`` in any size; completed windows
+    collect in ``ready`` until the caller ``take``s them. ``finish`` flushes
+    the resampler and emits the trailing partial window.
+    """
+
+    def __init__(self, sample_rate: int, target_sr: int, window_s: float, hop_s: float):
+        if window_s <= 0 or hop_s <= 0:
+            raise ValueError("window and hop must be positive")
+        if int(sample_rate) <= 0:
+            raise ValueError("sample rate must be positive")
+        self.sample_rate = int(sample_rate)
+        self.target_sr = int(target_sr)
+        self.window = int(round(window_s * self.target_sr))
+        self.hop = int(round(hop_s * self.target_sr))
+        self.resampler = StreamingResampler(self.sample_rate, self.target_sr)
+        self.ready = []
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._start = 0  # target-rate index of _buf[0]
+        self._next = 0   # start of the next window
+        self._count = 0
+
+    @property
+    def seconds(self) -> float:
+        """Duration of the input pushed so far."""
+        return self.resampler.samples_in / self.sample_rate
+
+    def _append(self, y: np.ndarray):
+        if len(y):
+            self._buf = np.concatenate([self._buf, y])
+        while self._next + self.window <= self._start + len(self._buf):
+            self._emit(self.window)
+        # Drop samples no future window starts before
+        drop = min(len(self._buf), self._next - self._start)
+        if drop > 0:
+            self._buf = self._buf[drop:]
+            self._start += drop
+
+    def _emit(self, length: int):
+        i = self._next - self._start
+        wave = self._buf[i:i + length].copy()
+        start = self._next / self.target_sr
+        self.ready.append(Segment(self._count, start, start + len(wave) / self.target_sr, wave))
+        self._count += 1
+        self._next += self.hop
+
+    def push(self, block: np.ndarray):
+        self._append(self.resampler.process(np.asarray(block, dtype=np.float32)))
+
+    def finish(self):
+        self._append(self.resampler.flush())
+        end = self._start + len(self._buf)
+        covered = self._next - self.hop + self.window if self._count else 0
+        # A short recording is one short window; otherwise only a tail worth classifying
+        min_tail = MIN_WINDOW_S if self._count == 0 else MIN_TAIL_S
+        if end - self._next >= MIN_WINDOW_S * self.target_sr and end - covered >= min_tail * self.target_sr:
+            self._emit(end - self._next)
+
+    def take(self, n: int):
+        out, self.ready = self.ready[:n], self.ready[n:]
+        return out
+
+
+def read_blocks(fileobj, block_s: float, raw=None):
+    """(sample_rate, generator of mono float32 blocks) for any file libsndfile can read.
+
+    ``raw`` = (sample_rate, sample_format, channels) reads headerless
+    little-endian PCM instead. Opening happens here so unreadable files fail
+    before any response is sent; the generator then reads ``block_s``
+    seconds at a time.
+    """
+    fileobj.seek(0)
+    if raw is None:
+        f = sf.SoundFile(fileobj)
+    else:
+        sample_rate, sample_format, channels = raw
+        if sample_format not in RAW_SUBTYPES:
+            raise ValueError(f"Unsupported sample format '{sample_format}' (use pcm16 or float32)")
+        f = sf.SoundFile(fileobj, format="RAW", samplerate=sample_rate, channels=channels,
+                         subtype=RAW_SUBTYPES[sample_format], endian="LITTLE")
+    if f.frames == 0:
+        f.close()
+        raise ValueError("Empty audio")
+    frames = max(1, int(block_s * f.samplerate))
+
+    def blocks():
+        with f:
+            for block in f.blocks(blocksize=frames, dtype="float32", always_2d=True):
+                yield block.mean(axis=1, dtype=np.float32) if block.shape[1] > 1 else block[:, 0]
+
+    return f.samplerate, blocks()
+
+
+def encode_event(event: dict, sse: bool) -> bytes:
+    data = json.dumps(event, separators=(",", ":"))
+    if sse:
+        return f"event: {event['type']}\ndata: {data}\n\n".encode()
+    return (data + "\n").encode()
+
+
+class TimelineSummary:
+    """Running totals for the closing ``summary`` event."""
+
+    def __init__(self):
+        self.segments = 0
+        self.skipped = 0
+        self.seconds_by_label = {}
+
+    def add(self, segment: Segment, label: str = None):
+        self.segments += 1
+        if label is None:
+            self.skipped += 1
+            return
+        self.seconds_by_label[label] = self.seconds_by_label.get(label, 0.0) + segment.end - segment.start
+
+    def event(self, duration: float):
+        total = sum(self.seconds_by_label.values())
+        shares = {k: round(v / total, 4) for k, v in sorted(self.seconds_by_label.items(), key=lambda kv: -kv[1])}
+        return {
+            "type": "summary",
+            "duration": round(duration, 3),
+            "segments": self.segments,
+            "skipped": self.skipped,
+            "label": next(iter(shares), None),
+            "label_share": shares,
+        }
+
+
+__all__ = ["MIN_TAIL_S", "MIN_WINDOW_S", "RAW_SUBTYPES", "Segment", "WindowSegmenter", "read_blocks", "encode_event",
+           "TimelineSummary"]
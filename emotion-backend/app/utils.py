@@ -1,7 +1,13 @@
 ﻿import io
+import os
+import tarfile
+import zipfile
 import numpy as np
 import soundfile as sf
-import librosa
+
+from .metrics import stage
+from .resample import resample
+from .streaming import decode_pcm
 
 def read_audio_to_mono_float32(file_bytes: bytes):
     """Return (waveform_float32_mono, sample_rate)."""
@@ -13,8 +19,8 @@ def read_audio_to_mono_float32(file_bytes: bytes):
 def resample_if_needed(wav: np.ndarray, sr: int, target_sr: int):
     if sr == target_sr:
         return wav, sr
-    y = librosa.resample(wav, orig_sr=sr, target_sr=target_sr)
-    return y.astype(np.float32), target_sr
+    # Polyphase filter is designed once per rate pair and cached
+    return resample(wav, sr, target_sr), target_sr
 
 def normalize_if_needed(y: np.ndarray):
     # Optional, avoid clipping if badly recorded
@@ -23,6 +29,69 @@ def normalize_if_needed(y: np.ndarray):
         y = y / m
     return y
 
+def decode_audio(file_bytes: bytes, target_sr: int):
+    """Decode an uploaded file into a normalized mono float32 waveform at ``target_sr``."""
+    with stage("decode"):
+        wav, sr = read_audio_to_mono_float32(file_bytes)
+    with stage("resample"):
+        wav, sr = resample_if_needed(wav, sr, target_sr)
+    with stage("normalize"):
+        return normalize_if_needed(wav)
+
+def decode_pcm_audio(payload: bytes, sample_rate: int, sample_format: str, channels: int, target_sr: int):
+    """Raw PCM body -> normalized mono float32 at ``target_sr``; no container to parse.
+
+    float32 mono input is a read-only view of ``payload`` until resampling or
+    normalization needs a new array.
+    """
+    with stage("decode"):
+        wav = decode_pcm(payload, sample_format, channels)
+    with stage("resample"):
+        wav, _ = resample_if_needed(wav, sample_rate, target_sr)
+    with stage("normalize"):
+        return normalize_if_needed(wav)
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+ARCHIVE_TYPES = ("application/zip", "application/x-zip-compressed", "application/x-tar", "application/gzip",
+                 "application/x-gzip")
+AUDIO_SUFFIXES = (".wav", ".flac", ".ogg", ".oga", ".aiff", ".aif", ".mp3")
+
+def is_archive(filename: str, content_type: str = None) -> bool:
+    name = (filename or "").lower()
+    return name.endswith(ARCHIVE_SUFFIXES) or (content_type or "").lower() in ARCHIVE_TYPES
+
+def extract_audio_archive(data: bytes, max_items: int):
+    """[(name, bytes)] for the audio files in a zip or tar(.gz) archive, in archive order.
+
+    Stops after ``max_items`` members; raises ValueError for anything that is
+    not a readable archive.
+    """
+    def wanted(name):
+        base = os.path.basename(name)
+        return base and not base.startswith(".") and "__MACOSX" not in name and name.lower().endswith(AUDIO_SUFFIXES)
+
+    out = []
+    buf = io.BytesIO(data)
+    if zipfile.is_zipfile(buf):
+        with zipfile.ZipFile(buf) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    out.append((info.filename, zf.read(info)))
+                    if len(out) >= max_items:
+                        break
+        return out
+    buf.seek(0)
+    try:
+        with tarfile.open(fileobj=buf, mode="r:*") as tf:
+            for member in tf:
+                if member.isfile() and wanted(member.name):
+                    out.append((member.name, tf.extractfile(member).read()))
+                    if len(out) >= max_items:
+                        break
+    except tarfile.TarError as e:
+        raise ValueError(f"Unreadable archive: {e}")
+    return out
+
 def to_prob_vector(labels, values):
     """Ensure values are probabilities; if not, apply softmax."""
     vals = np.array(values, dtype=np.float32)
@@ -31,4 +100,5 @@ def to_prob_vector(labels, values):
         vals = exp / (exp.sum() + 1e-9)
     return {label: float(v) for label, v in zip(labels, vals)}
 
-__all__ = ["read_audio_to_mono_float32", "resample_if_needed", "normalize_if_needed", "to_prob_vector"]
\ No newline at end of file
+__all__ = ["read_audio_to_mono_float32", "resample_if_needed", "normalize_if_needed", "decode_audio", "decode_pcm_audio",
+           "is_archive", "extract_audio_archive", "to_prob_vector"]
\ No newline at end of file
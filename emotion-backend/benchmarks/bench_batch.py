@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Throughput of the bulk endpoints vs. one request per item.
+
+Sends the same --items texts and audio clips through the app in-process:
+    single  one /predict-text or /predict request per item, --concurrency in flight
+    batch   /predict-text/batch or /predict/batch with --batch items per request
+and reports items/s and per-request latency for each. Every text gets a
+per-mode suffix so the text cache never answers for the model.
+
+Run from emotion-backend/:
+    python benchmarks/bench_batch.py --items 256 --batch 32
+    python benchmarks/bench_batch.py --kinds text --concurrency 16 --out batch.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import corpus  # noqa: E402
+from benchmarks.loadtest import wav_bytes  # noqa: E402
+
+
+async def timed(requests, concurrency):
+    """Run ``requests`` (coroutine factories) with bounded concurrency; latency per request in ms."""
+    latencies, pending = [], iter(requests)
+
+    async def worker():
+        for make in pending:
+            t0 = time.perf_counter()
+            r = await make()
+            r.raise_for_status()
+            latencies.append(1000 * (time.perf_counter() - t0))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return time.perf_counter() - t0, latencies
+
+
+def report(items, wall, latencies):
+    lat = np.asarray(latencies)
+    return {
+        "requests": len(latencies),
+        "wall_s": round(wall, 3),
+        "items_per_s": round(items / wall, 2),
+        "p50_ms": round(float(np.percentile(lat, 50)), 2),
+        "p99_ms": round(float(np.percentile(lat, 99)), 2),
+    }
+
+
+async def run(args):
+    import httpx
+    from app.server import app
+
+    texts = corpus.texts(args.items)
+    clips = [wav_bytes(y) for y in corpus.audio_clips(args.items, args.min_s, args.max_s)]
+    chunks = [range(i, min(i + args.batch, args.items)) for i in range(0, args.items, args.batch)]
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://asgi", timeout=600) as c:
+            if "text" in args.kinds:
+                await c.post("/predict-text/batch", json={"texts": ["warm up"]})
+                single = [lambda t=t: c.post("/predict-text", json={"text": f"{t} [single]"}) for t in texts]
+                batch = [lambda ix=ix: c.post("/predict-text/batch",
+                                              json={"texts": [f"{texts[i]} [batch]" for i in ix]})
+                         for ix in chunks]
+                results["text"] = {
+                    "single": report(args.items, *await timed(single, args.concurrency)),
+                    "batch": report(args.items, *await timed(batch, max(1, args.concurrency // args.batch))),
+                }
+            if "audio" in args.kinds:
+                await c.post("/predict/batch", files=[("files", ("w.wav", clips[0], "audio/wav"))])
+                single = [lambda d=d: c.post("/predict", files={"file": ("clip.wav", d, "audio/wav")})
+                          for d in clips]
+                batch = [lambda ix=ix: c.post("/predict/batch",
+                                              files=[("files", (f"{i}.wav", clips[i], "audio/wav")) for i in ix])
+                         for ix in chunks]
+                results["audio"] = {
+                    "single": report(args.items, *await timed(single, args.concurrency)),
+                    "batch": report(args.items, *await timed(batch, max(1, args.concurrency // args.batch))),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kinds", nargs="+", default=["text", "audio"], choices=["text", "audio"])
+    parser.add_argument("--items", type=int, default=128)
+    parser.add_argument("--batch", type=int, default=32, help="Items per bulk request")
+    parser.add_argument("--concurrency", type=int, default=8, help="Single-item requests in flight")
+    parser.add_argument("--min-s", type=float, default=1.0)
+    parser.add_argument("--max-s", type=float, default=3.0)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for kind, r in results.items():
+        s, b = r["single"], r["batch"]
+        print(f"▶ {kind}: single {s['items_per_s']} items/s, batch {b['items_per_s']} items/s "
+              f"({b['items_per_s'] / s['items_per_s']:.2f}x)")
+
+    text = json.dumps({"items": args.items, "batch": args.batch, "concurrency": args.concurrency,
+                       "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+Live-stream client transports: how fresh are the results?
+
+Replays a synthetic microphone (a --window s window every --hop s for
+--seconds) against a running server with four clients:
+    naive      requests.post per window, blocking the capture loop (the old scripts)
+    pooled     EmotionClient (keep-alive pool, raw PCM), still blocking
+    pipelined  EmotionClient + Pipeline, --in-flight requests, capture never waits
+    async      AsyncEmotionClient + AsyncPipeline
+A blocking client that falls behind misses the windows that came due while
+it waited. Reported: windows answered, request latency, and result age (from
+the end of the window's audio to the result arriving).
+
+Run from emotion-backend/:
+    python benchmarks/bench_client.py                      # spawns uvicorn on --port
+    python benchmarks/bench_client.py --url http://localhost:8000 --hop 0.25 --out client.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import corpus  # noqa: E402
+from benchmarks.loadtest import wait_ready, wav_bytes  # noqa: E402
+from emotion_client import AsyncEmotionClient, AsyncPipeline, EmotionClient, Pipeline  # noqa: E402
+
+
+class Recorder:
+    def __init__(self, windows):
+        self.windows = windows
+        self.latencies, self.ages = [], []
+        self.lock = threading.Lock()
+
+    def done(self, sent_at, due_at):
+        now = time.perf_counter()
+        with self.lock:
+            self.latencies.append(1000 * (now - sent_at))
+            self.ages.append(1000 * (now - due_at))
+
+    def report(self):
+        lat, age = np.asarray(self.latencies or [0.0]), np.asarray(self.ages or [0.0])
+        return {
+            "windows": self.windows,
+            "answered": len(self.latencies),
+            "p50_latency_ms": round(float(np.percentile(lat, 50)), 1),
+            "p99_latency_ms": round(float(np.percentile(lat, 99)), 1),
+            "p50_age_ms": round(float(np.percentile(age, 50)), 1),
+            "max_age_ms": round(float(age.max()), 1),
+        }
+
+
+def schedule(args):
+    """(due time offset, window) for each hop of the replayed stream."""
+    stream = corpus.synthetic_speechlike(args.seconds + args.window, args.sr, seed=0)
+    size, hop = int(args.window * args.sr), int(args.hop * args.sr)
+    return [(i * args.hop, stream[i * hop:i * hop + size]) for i in range(int(args.seconds / args.hop))]
+
+
+def run_blocking(send, windows):
+    """Capture loop that calls ``send`` inline: windows due while it waits are missed."""
+    rec, t0 = Recorder(len(windows)), time.perf_counter()
+    for i, (due, y) in enumerate(windows):
+        now = time.perf_counter() - t0
+        if i + 1 < len(windows) and now >= windows[i + 1][0]:
+            continue  # a newer window is already due; a real capture loop only sees that one
+        time.sleep(max(0.0, due - now))
+        sent = time.perf_counter()
+        send(y)
+        rec.done(sent, t0 + due)
+    return rec.report()
+
+
+def run_pipelined(client, windows, in_flight):
+    rec, t0 = Recorder(len(windows)), time.perf_counter()
+    pipeline = Pipeline(client.predict, max_in_flight=in_flight, on_result=lambda r, meta: rec.done(*meta))
+    for due, y in windows:
+        time.sleep(max(0.0, t0 + due - time.perf_counter()))
+        pipeline.submit(y, 16000, meta=(time.perf_counter(), t0 + due))
+    pipeline.close()
+    return {**rec.report(), **pipeline.stats.snapshot()}
+
+
+async def run_async(url, windows, in_flight):
+    async with AsyncEmotionClient(url, pool_size=in_flight) as client:
+        await client.predict(windows[0][1])  # open the pool
+        rec, t0 = Recorder(len(windows)), time.perf_counter()
+        pipeline = AsyncPipeline(client.predict, max_in_flight=in_flight, on_result=lambda r, meta: rec.done(*meta))
+        for due, y in windows:
+            await asyncio.sleep(max(0.0, t0 + due - time.perf_counter()))
+            pipeline.submit(y, 16000, meta=(time.perf_counter(), t0 + due))
+        await pipeline.drain()
+        return {**rec.report(), **pipeline.stats.snapshot()}
+
+
+def run(args, url):
+    import requests
+
+    windows = schedule(args)
+    results = {}
+    if "naive" in args.modes:
+        def naive(y):
+            r = requests.post(url + "/predict", files={"file": ("w.wav", wav_bytes(y), "audio/wav")}, timeout=30)
+            r.raise_for_status()
+        naive(windows[0][1])
+        results["naive"] = run_blocking(naive, windows)
+    with EmotionClient(url, timeout=30, pool_size=args.in_flight) as client:
+        client.predict(windows[0][1])
+        if "pooled" in args.modes:
+            results["pooled"] = run_blocking(client.predict, windows)
+        if "pipelined" in args.modes:
+            results["pipelined"] = run_pipelined(client, windows, args.in_flight)
+    if "async" in args.modes:
+        results["async"] = asyncio.run(run_async(url, windows, args.in_flight))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", type=str, default="", help="Use a running server instead of spawning uvicorn")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--modes", nargs="+", default=["naive", "pooled", "pipelined", "async"],
+                        choices=["naive", "pooled", "pipelined", "async"])
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of the replayed stream")
+    parser.add_argument("--window", type=float, default=2.5)
+    parser.add_argument("--hop", type=float, default=0.5)
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--in-flight", type=int, default=2)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    proc, url = None, args.url
+    if not url:
+        url = f"http://127.0.0.1:{args.port}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.server:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        if not wait_ready(url, args.startup_timeout):
+            proc.kill()
+            raise SystemExit("uvicorn did not become ready")
+    try:
+        results = run(args, url)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    for mode, r in results.items():
+        print(f"▶ {mode}: {r['answered']}/{r['windows']} windows, latency p50 {r['p50_latency_ms']} ms, "
+              f"result age p50 {r['p50_age_ms']} ms (max {r['max_age_ms']} ms)")
+
+    text = json.dumps({"seconds": args.seconds, "window": args.window, "hop": args.hop,
+                       "in_flight": args.in_flight, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Incremental vs. full-window wav2vec2 inference on a simulated stream.
+
+Streams audio hop by hop, classifies every window both ways and reports
+per-hop latency plus how closely the incremental path tracks full-window
+inference (top-label agreement and max probability difference). Exits
+non-zero when agreement falls below --min-agreement.
+
+Run from emotion-backend/:
+    python benchmarks/bench_incremental.py --seconds 30
+    python benchmarks/bench_incremental.py --wav call.wav --window 2.5 --hop 0.7
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import SAMPLE_RATE  # noqa: E402
+from app.incremental import IncrementalWav2Vec2  # noqa: E402
+from app.utils import read_audio_to_mono_float32, resample_if_needed  # noqa: E402
+from benchmarks.corpus import synthetic_speechlike  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wav", type=str, default="", help="Audio file to stream (default: synthetic)")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Length of synthetic audio")
+    parser.add_argument("--window", type=float, default=2.5)
+    parser.add_argument("--hop", type=float, default=0.7)
+    parser.add_argument("--min-agreement", type=float, default=0.9, help="Required top-label agreement")
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    from app.server import get_model
+
+    if args.wav:
+        with open(args.wav, "rb") as fh:
+            y, sr = read_audio_to_mono_float32(fh.read())
+        y, _ = resample_if_needed(y, sr, SAMPLE_RATE)
+    else:
+        y = synthetic_speechlike(args.seconds, SAMPLE_RATE)
+
+    clf = get_model()
+    window = int(args.window * SAMPLE_RATE)
+    hop = int(args.hop * SAMPLE_RATE)
+    enc = IncrementalWav2Vec2(clf.model, clf.feature_extractor, window)
+
+    full_ms, inc_ms, agree, max_diff = [], [], [], []
+    pushed = 0
+    for end in range(window, len(y) + 1, hop):
+        t0 = time.perf_counter()
+        enc.push(y[pushed:end])
+        inc = enc.classify()
+        inc_ms.append(1000 * (time.perf_counter() - t0))
+        pushed = end
+
+        t0 = time.perf_counter()
+        full = clf({"array": y[end - window:end], "sampling_rate": SAMPLE_RATE})
+        full_ms.append(1000 * (time.perf_counter() - t0))
+
+        full_p = {r["label"]: r["score"] for r in full}
+        inc_p = {r["label"]: r["score"] for r in inc}
+        agree.append(full[0]["label"] == inc[0]["label"])
+        max_diff.append(max(abs(full_p[k] - inc_p.get(k, 0.0)) for k in full_p))
+
+    # The first hop encodes a whole window either way; steady state starts after it
+    steady = slice(1, None) if len(inc_ms) > 1 else slice(None)
+    summary = {
+        "windows": len(agree),
+        "window_s": args.window,
+        "hop_s": args.hop,
+        "label_agreement": round(float(np.mean(agree)), 4),
+        "max_prob_diff": round(float(np.max(max_diff)), 4),
+        "mean_prob_diff": round(float(np.mean(max_diff)), 4),
+        "full_ms_p50": round(float(np.median(full_ms[steady])), 2),
+        "incremental_ms_p50": round(float(np.median(inc_ms[steady])), 2),
+    }
+    summary["speedup"] = round(summary["full_ms_p50"] / max(summary["incremental_ms_p50"], 1e-6), 2)
+
+    text = json.dumps(summary, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+    if summary["label_agreement"] < args.min_agreement:
+        print(f"❌ Label agreement {summary['label_agreement']} below {args.min_agreement}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
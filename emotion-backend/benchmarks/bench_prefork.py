@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Memory benchmark: pre-fork shared-weight workers vs. `uvicorn --workers N`.
+
+Starts each layout on its own port, waits until every worker reports
+/ready (models loaded and warm), then sums RSS and PSS over the whole process tree. PSS splits shared pages between
+the processes mapping them, so it is the number to compare.
+
+Run from emotion-backend/:
+    python benchmarks/bench_prefork.py --workers 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.prefork import memory_report  # noqa: E402
+
+
+def process_tree(pid):
+    pids = [pid]
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children") as fh:
+                for child in fh.read().split():
+                    pids.extend(process_tree(int(child)))
+        except FileNotFoundError:
+            pass
+    return pids
+
+
+def wait_ready(port, timeout, streak):
+    """Poll /ready until ``streak`` requests in a row answer 200.
+
+    Each request opens a new connection, which the kernel hands to any
+    worker, so a long enough run of 200s means no worker is still loading
+    (one that is answers 503 and resets the count).
+    """
+    deadline = time.time() + timeout
+    ok = 0
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=2) as r:
+                ok = ok + 1 if r.status == 200 else 0
+        except Exception:
+            ok = 0
+        if ok >= streak:
+            return True
+        time.sleep(0.05 if ok else 0.5)
+    return False
+
+
+def measure(name, cmd, port, workers, timeout):
+    print(f"▶ {name}: {' '.join(cmd)}")
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + timeout
+        while len(process_tree(proc.pid)) < workers + 1 and time.time() < deadline:
+            time.sleep(0.5)
+        if not wait_ready(port, max(1.0, deadline - time.time()), streak=8 * workers):
+            raise RuntimeError(f"{name} did not become ready within {timeout}s")
+        ready_s = time.perf_counter() - started
+        report = memory_report(process_tree(proc.pid))
+        report.update({"layout": name, "workers": workers, "ready_s": round(ready_s, 1)})
+        print(f"  total RSS {report['total_rss_mib']} MiB, total PSS {report['total_pss_mib']} MiB")
+        return report
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    py = sys.executable
+    layouts = [
+        ("prefork", [py, "-m", "app.prefork", "--workers", str(args.workers),
+                     "--port", str(args.port), "--host", "127.0.0.1", "--report-after", "0"], args.port),
+        ("uvicorn", [py, "-m", "uvicorn", "app.server:app", "--workers", str(args.workers),
+                     "--port", str(args.port + 1), "--host", "127.0.0.1"], args.port + 1),
+    ]
+    results = [measure(name, cmd, port, args.workers, args.timeout)
+               for name, cmd, port in layouts]
+
+    saved = results[1]["total_pss_mib"] - results[0]["total_pss_mib"]
+    print(f"\nPre-fork saves {saved:.1f} MiB PSS across {args.workers} workers")
+    out = {"workers": args.workers, "results": results, "pss_saved_mib": round(saved, 1)}
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(out, fh, indent=2)
+    else:
+        print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
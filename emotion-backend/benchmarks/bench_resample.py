@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Cached polyphase resampler (app.resample) vs. librosa.resample.
+
+For each rate pair it reports per-call latency for a one-shot clip, a batch
+of clips and a stream fed in small chunks, plus accuracy: SNR of a resampled
+in-band tone against the ideal tone at the target rate, attenuation of a tone
+above the target Nyquist (aliasing), and the difference from librosa's output.
+
+Run from emotion-backend/:
+    python benchmarks/bench_resample.py
+    python benchmarks/bench_resample.py --rates 8000 44100 48000 --seconds 5 --out resample.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import SAMPLE_RATE  # noqa: E402
+from app.resample import StreamingResampler, plan, resample  # noqa: E402
+from benchmarks.corpus import synthetic_speechlike  # noqa: E402
+
+
+def best_ms(fn, repeat):
+    fn()  # warm-up (filter design, librosa/soxr init)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(1000 * (time.perf_counter() - t0))
+    return round(float(np.median(times)), 3)
+
+
+def tone(freq, sr, seconds):
+    t = np.arange(int(seconds * sr)) / sr
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+
+def snr_db(y, ref, edge):
+    n = min(len(y), len(ref))
+    err = y[edge:n - edge] - ref[edge:n - edge]
+    return round(float(10 * np.log10(np.sum(ref[edge:n - edge] ** 2) / max(np.sum(err ** 2), 1e-20))), 1)
+
+
+def accuracy(fn, orig_sr, target_sr):
+    edge = target_sr // 10  # ignore filter start-up at both ends
+    low = min(orig_sr, target_sr)
+    in_band = fn(tone(0.2 * low, orig_sr, 1.0))
+    out = {"tone_snr_db": snr_db(in_band, tone(0.2 * low, target_sr, 1.0), edge)}
+    if orig_sr > target_sr:
+        alias = fn(tone(0.6 * orig_sr / 2 + 0.4 * target_sr / 2, orig_sr, 1.0))
+        out["alias_rejection_db"] = round(float(-20 * np.log10(np.sqrt(2) * np.std(alias[edge:-edge]) + 1e-12)), 1)
+    return out
+
+
+def stream(fn_factory, x, chunk):
+    r = fn_factory()
+    parts = [r(x[i:i + chunk]) for i in range(0, len(x), chunk)]
+    return np.concatenate(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rates", nargs="+", type=int, default=[8000, 22050, 44100, 48000])
+    parser.add_argument("--target", type=int, default=SAMPLE_RATE)
+    parser.add_argument("--seconds", type=float, default=3.0, help="One-shot clip length")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--chunk-ms", type=float, default=20.0, help="Stream chunk size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    import librosa
+
+    def lib(x, o, t):
+        return librosa.resample(x, orig_sr=o, target_sr=t)
+
+    results = {}
+    for sr in args.rates:
+        if sr == args.target:
+            continue
+        x = synthetic_speechlike(args.seconds, sr)
+        xb = np.stack([synthetic_speechlike(args.seconds, sr, seed=i) for i in range(args.batch)])
+        chunk = int(sr * args.chunk_ms / 1000)
+        t0 = time.perf_counter()
+        plan.cache_clear()
+        plan(sr, args.target)
+        design_ms = 1000 * (time.perf_counter() - t0)
+
+        def polyphase_stream():
+            s = StreamingResampler(sr, args.target)
+            return stream(lambda: s.process, x, chunk)
+
+        def librosa_stream():
+            # librosa has no streaming state: each chunk is resampled on its own
+            return stream(lambda: (lambda c: lib(c, sr, args.target)), x, chunk)
+
+        ours, theirs = resample(x, sr, args.target), lib(x, sr, args.target)
+        n = min(len(ours), len(theirs))
+        edge = args.target // 10
+        entry = {
+            "filter_design_ms": round(design_ms, 3),
+            "taps_per_phase": plan(sr, args.target).taps,
+            "polyphase": {
+                "oneshot_ms": best_ms(lambda: resample(x, sr, args.target), args.repeat),
+                "batch_ms": best_ms(lambda: resample(xb, sr, args.target), args.repeat),
+                "stream_ms": best_ms(polyphase_stream, max(1, args.repeat // 4)),
+                **accuracy(lambda y: resample(y, sr, args.target), sr, args.target),
+            },
+            "librosa": {
+                "oneshot_ms": best_ms(lambda: lib(x, sr, args.target), args.repeat),
+                "batch_ms": best_ms(lambda: lib(xb, sr, args.target), args.repeat),
+                "stream_ms": best_ms(librosa_stream, max(1, args.repeat // 4)),
+                **accuracy(lambda y: lib(y, sr, args.target), sr, args.target),
+            },
+            "vs_librosa_snr_db": snr_db(ours[:n], theirs[:n], edge),
+        }
+        results[f"{sr}->{args.target}"] = entry
+        p, lb = entry["polyphase"], entry["librosa"]
+        print(f"▶ {sr} -> {args.target}: one-shot {p['oneshot_ms']} vs {lb['oneshot_ms']} ms, "
+              f"batch {p['batch_ms']} vs {lb['batch_ms']} ms, stream {p['stream_ms']} vs {lb['stream_ms']} ms, "
+              f"tone SNR {p['tone_snr_db']} vs {lb['tone_snr_db']} dB")
+
+    text = json.dumps({"seconds": args.seconds, "batch": args.batch, "chunk_ms": args.chunk_ms,
+                       "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Capture buffers: the old per-script buffers vs. SampleRingBuffer.
+
+Feeds --seconds of audio in --block-s blocks and takes a --window-s window
+every --hop-s, the way the capture scripts did:
+    deque     deque(maxlen).extend(block); np.array(list(deque)) per window
+    list      list.extend(block.tolist()); np.array(list[-window:]) per window
+    concat    np.concatenate + trim per block; .copy() per window
+    ring      SampleRingBuffer.write per block; WindowCursor view per window
+    ring+copy the same, copying each window (what WindowedCapture hands out)
+Reports microseconds per second of audio and the peak memory tracemalloc sees.
+
+Run from emotion-backend/:
+    python benchmarks/bench_ringbuffer.py
+    python benchmarks/bench_ringbuffer.py --block-s 0.01 --hop-s 0.1 --out ring.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_client.ringbuffer import SampleRingBuffer, WindowCursor  # noqa: E402
+
+
+def run_deque(blocks, window, hop):
+    buf, since, out = deque(maxlen=window), 0, 0
+    for b in blocks:
+        buf.extend(b)
+        since += len(b)
+        if len(buf) >= window and since >= hop:
+            since = 0
+            out += len(np.array(list(buf), dtype=np.float32))
+    return out
+
+
+def run_list(blocks, window, hop):
+    buf, since, out = [], 0, 0
+    for b in blocks:
+        buf.extend(b.tolist())
+        since += len(b)
+        if len(buf) >= window and since >= hop:
+            since = 0
+            out += len(np.array(buf[-window:], dtype=np.float32))
+            del buf[:-window]
+    return out
+
+
+def run_concat(blocks, window, hop):
+    buf, since, out = np.zeros(0, dtype=np.float32), 0, 0
+    for b in blocks:
+        buf = np.concatenate([buf, b])
+        if len(buf) > window:
+            buf = buf[-window:]
+        since += len(b)
+        if len(buf) >= window and since >= hop:
+            since = 0
+            out += len(buf.copy())
+    return out
+
+
+def run_ring(blocks, window, hop, copy=False):
+    ring = SampleRingBuffer(window + max(len(blocks[0]), hop))
+    cursor = WindowCursor(ring, window, hop)
+    out = 0
+    for b in blocks:
+        ring.write(b)
+        w = cursor.next(newest=True)
+        if w is not None:
+            out += len(w[1].copy() if copy else w[1])
+    return out
+
+
+MODES = {
+    "deque": run_deque,
+    "list": run_list,
+    "concat": run_concat,
+    "ring": run_ring,
+    "ring+copy": lambda blocks, window, hop: run_ring(blocks, window, hop, copy=True),
+}
+
+
+def measure(fn, blocks, window, hop, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(blocks, window, hop)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(blocks, window, hop)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--block-s", type=float, default=0.05, help="Audio callback block")
+    parser.add_argument("--window-s", type=float, default=2.5)
+    parser.add_argument("--hop-s", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    block = int(args.block_s * args.sr)
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal(int(args.seconds * args.sr))).astype(np.float32)
+    blocks = [audio[i:i + block] for i in range(0, len(audio) - block + 1, block)]
+    window, hop = int(args.window_s * args.sr), int(args.hop_s * args.sr)
+
+    results = {}
+    for mode in args.modes:
+        wall, peak = measure(MODES[mode], blocks, window, hop, args.repeat)
+        results[mode] = {
+            "us_per_audio_s": round(1e6 * wall / args.seconds, 1),
+            "us_per_block": round(1e6 * wall / len(blocks), 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+        print(f"▶ {mode}: {results[mode]['us_per_audio_s']} µs per audio second, "
+              f"{results[mode]['us_per_block']} µs per block, peak {results[mode]['peak_kib']} KiB")
+
+    text = json.dumps({"seconds": args.seconds, "block_s": args.block_s, "window_s": args.window_s,
+                       "hop_s": args.hop_s, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Model load time and memory: hub pipeline loading vs. the pinned mmap model store.
+
+For each mode, starts --procs fresh Python processes that each load both
+models and run one inference. While all of them are still alive it records
+their load time and memory. Modes:
+    pipeline    transformers.pipeline(model=MODEL_ID), as before the store existed
+    store       app.model_store with memory-mapped safetensors weights
+    store-copy  app.model_store with MODEL_STORE_MMAP=0 (regular from_pretrained)
+
+With mmap, weight pages are shared page cache, so they show up as shared
+rather than private memory and the total PSS grows slowly with --procs.
+Run the store modes after `python -m app.model_store pin`.
+
+Run from emotion-backend/:
+    python benchmarks/bench_startup.py --procs 4
+    python benchmarks/bench_startup.py --modes pipeline store --out startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.prefork import memory_report  # noqa: E402
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import numpy as np
+from app.config import MODEL_ID, TEXT_MODEL_ID, SAMPLE_RATE
+from transformers import pipeline
+mode = sys.argv[1]
+t_import = time.perf_counter()
+if mode == "pipeline":
+    audio = pipeline("audio-classification", model=MODEL_ID, device=-1, top_k=None)
+    text = pipeline("text-classification", model=TEXT_MODEL_ID, device=-1, top_k=None, truncation=True)
+else:
+    from app import model_store
+    audio = model_store.load_pipeline("audio-classification", MODEL_ID, device=-1, top_k=None)
+    text = model_store.load_pipeline("text-classification", TEXT_MODEL_ID, device=-1, top_k=None, truncation=True)
+t_load = time.perf_counter()
+audio({"array": np.zeros(SAMPLE_RATE, dtype=np.float32), "sampling_rate": SAMPLE_RATE})
+text("warm up")
+t_infer = time.perf_counter()
+print(json.dumps({"import_s": t_import - t0, "load_s": t_load - t_import, "first_inference_s": t_infer - t_load}),
+      flush=True)
+sys.stdin.read()  # stay alive until the parent has measured memory
+"""
+
+
+def run_mode(mode, procs):
+    env = dict(os.environ)
+    if mode == "store-copy":
+        env["MODEL_STORE_MMAP"] = "0"
+    children = [
+        subprocess.Popen([sys.executable, "-c", CHILD, "pipeline" if mode == "pipeline" else "store"],
+                         cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(procs)
+    ]
+    started = time.perf_counter()
+    timings = []
+    for child in children:
+        line = child.stdout.readline()
+        if not line:
+            raise SystemExit(f"{mode}: child {child.pid} failed")
+        timings.append(json.loads(line))
+    wall = time.perf_counter() - started
+    mem = memory_report([c.pid for c in children])
+    for child in children:
+        child.stdin.close()
+        child.wait()
+
+    def mean(key):
+        return round(sum(t[key] for t in timings) / len(timings), 3)
+
+    return {
+        "procs": procs,
+        "all_ready_s": round(wall, 3),
+        "import_s": mean("import_s"),
+        "load_s": mean("load_s"),
+        "first_inference_s": mean("first_inference_s"),
+        "total_rss_mib": mem["total_rss_mib"],
+        "total_pss_mib": mem["total_pss_mib"],
+        "private_mib_per_proc": round(sum(p["private_mib"] for p in mem["processes"]) / procs, 1),
+        "shared_mib_per_proc": round(sum(p["shared_mib"] for p in mem["processes"]) / procs, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["pipeline", "store", "store-copy"],
+                        choices=["pipeline", "store", "store-copy"])
+    parser.add_argument("--procs", type=int, default=2, help="Concurrent processes per mode")
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        print(f"▶ {mode}: {args.procs} processes...")
+        results[mode] = r = run_mode(mode, args.procs)
+        print(f"  load {r['load_s']}s, all ready {r['all_ready_s']}s, "
+              f"private {r['private_mib_per_proc']} MiB/proc, total PSS {r['total_pss_mib']} MiB")
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Memory and speed of the /predict/timeline data path vs. whole-file decoding.
+
+For each recording length, writes a 44.1 kHz stereo WAV to a temp file and
+measures the traced peak memory (tracemalloc, which sees numpy buffers) of
+    whole     app.utils.decode_audio on the full file, as /predict does
+    timeline  app.timeline.read_blocks + WindowSegmenter, taking each batch of
+              windows as it fills, as /predict/timeline does
+Model inference is left out; it is the same per window either way.
+
+Run from emotion-backend/:
+    python benchmarks/bench_timeline.py
+    python benchmarks/bench_timeline.py --minutes 1 10 30 --out timeline.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import SAMPLE_RATE, TIMELINE_BATCH_SIZE, TIMELINE_BLOCK_S, TIMELINE_WINDOW_S  # noqa: E402
+from app.timeline import WindowSegmenter, read_blocks  # noqa: E402
+from app.utils import decode_audio  # noqa: E402
+from benchmarks.corpus import synthetic_speechlike  # noqa: E402
+
+SOURCE_SR = 44100
+
+
+def write_recording(path, minutes):
+    import soundfile as sf
+
+    chunk = synthetic_speechlike(60.0, SOURCE_SR)
+    with sf.SoundFile(path, "w", samplerate=SOURCE_SR, channels=2, subtype="PCM_16") as f:
+        for _ in range(int(np.ceil(minutes))):
+            f.write(np.stack([chunk, chunk], axis=1))
+
+
+def traced(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, {"seconds": round(elapsed, 3), "peak_mib": round(peak / 2 ** 20, 1)}
+
+
+def whole(path):
+    with open(path, "rb") as fh:
+        return len(decode_audio(fh.read(), SAMPLE_RATE))
+
+
+def timeline(path):
+    windows = 0
+    with open(path, "rb") as fh:
+        sample_rate, blocks = read_blocks(fh, TIMELINE_BLOCK_S)
+        seg = WindowSegmenter(sample_rate, SAMPLE_RATE, TIMELINE_WINDOW_S, TIMELINE_WINDOW_S)
+        for block in blocks:
+            seg.push(block)
+            while len(seg.ready) >= TIMELINE_BATCH_SIZE:
+                windows += len(seg.take(TIMELINE_BATCH_SIZE))
+        seg.finish()
+        windows += len(seg.take(len(seg.ready)))
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", nargs="+", type=float, default=[1, 5, 10])
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            path = os.path.join(tmp, f"{minutes:g}min.wav")
+            write_recording(path, minutes)
+            _, w = traced(lambda: whole(path))
+            windows, t = traced(lambda: timeline(path))
+            results[f"{minutes:g}min"] = {"file_mib": round(os.path.getsize(path) / 2 ** 20, 1), "windows": windows,
+                                          "whole": w, "timeline": t}
+            print(f"▶ {minutes:g} min: whole {w['peak_mib']} MiB in {w['seconds']}s, "
+                  f"timeline {t['peak_mib']} MiB in {t['seconds']}s ({windows} windows)")
+
+    text = json.dumps({"source_sr": SOURCE_SR, "window_s": TIMELINE_WINDOW_S, "block_s": TIMELINE_BLOCK_S,
+                       "batch": TIMELINE_BATCH_SIZE, "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
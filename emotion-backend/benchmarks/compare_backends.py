@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Accuracy/latency comparison of the inference backends (torch vs. onnx vs. onnx-int8).
+
+Runs the same synthetic audio clips and texts through every backend and
+reports per-call latency percentiles, plus top-label agreement and maximum
+probability difference against the torch pipelines as reference.
+
+Run from emotion-backend/:
+    python benchmarks/compare_backends.py --audio 50 --texts 200
+    python benchmarks/compare_backends.py --backends torch onnx-int8 --out backends.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import MODEL_ID, TEXT_MODEL_ID, SAMPLE_RATE  # noqa: E402
+from benchmarks import corpus  # noqa: E402
+
+
+def load(backend: str):
+    if backend == "torch":
+        from transformers import pipeline
+
+        audio = pipeline("audio-classification", model=MODEL_ID, device=-1, top_k=None)
+        text = pipeline("text-classification", model=TEXT_MODEL_ID, device=-1, top_k=None,
+                        truncation=True, max_length=512)
+        return audio, text
+    from app.onnx_backend import load_classifier
+
+    quantized = backend == "onnx-int8"
+    return (load_classifier("audio-classification", MODEL_ID, quantized),
+            load_classifier("text-classification", TEXT_MODEL_ID, quantized))
+
+
+def percentiles(ms):
+    return {f"p{p}": round(float(np.percentile(ms, p)), 2) for p in (50, 95, 99)}
+
+
+def run(fn, inputs, warmup: int = 2):
+    for x in inputs[:warmup]:
+        fn(x)
+    outputs, ms = [], []
+    for x in inputs:
+        t0 = time.perf_counter()
+        out = fn(x)
+        ms.append(1000 * (time.perf_counter() - t0))
+        # Single-text pipelines may wrap the score list once more
+        outputs.append(out[0] if out and isinstance(out[0], list) else out)
+    return outputs, ms
+
+
+def agreement(reference, outputs):
+    agree = [r[0]["label"] == o[0]["label"] for r, o in zip(reference, outputs)]
+    diffs = []
+    for r, o in zip(reference, outputs):
+        op = {x["label"]: x["score"] for x in o}
+        diffs.append(max(abs(x["score"] - op.get(x["label"], 0.0)) for x in r))
+    return {"label_agreement": round(float(np.mean(agree)), 4), "max_prob_diff": round(float(np.max(diffs)), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--audio", type=int, default=30, help="Number of synthetic audio clips")
+    parser.add_argument("--texts", type=int, default=100, help="Number of texts")
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    clips = [{"array": y, "sampling_rate": SAMPLE_RATE} for y in corpus.audio_clips(args.audio)]
+    texts = corpus.texts(args.texts)
+
+    results, reference = {}, None
+    for backend in args.backends:
+        print(f"▶ {backend}: loading...")
+        t0 = time.perf_counter()
+        audio_clf, text_clf = load(backend)
+        load_s = time.perf_counter() - t0
+        audio_out, audio_ms = run(audio_clf, clips)
+        text_out, text_ms = run(text_clf, texts)
+        entry = {
+            "load_s": round(load_s, 2),
+            "audio_ms": percentiles(audio_ms),
+            "text_ms": percentiles(text_ms),
+        }
+        if reference is None:
+            reference = (backend, audio_out, text_out)
+        else:
+            entry["vs"] = reference[0]
+            entry["audio"] = agreement(reference[1], audio_out)
+            entry["text"] = agreement(reference[2], text_out)
+        results[backend] = entry
+        print(f"  audio p50 {entry['audio_ms']['p50']} ms, text p50 {entry['text_ms']['p50']} ms")
+
+    text = json.dumps({"audio_clips": args.audio, "texts": args.texts, "backends": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Deterministic synthetic inputs for the benchmarks (no datasets or network needed)."""
+import numpy as np
+
+TEXT_TEMPLATES = [
+    "I am so angry right now!",
+    "This is the best day of my life!",
+    "I feel really sad and lonely",
+    "Can you tell me the weather?",
+    "This is absolutely disgusting",
+    "Oh wow I didn't expect that!",
+    "I'm scared about what might happen",
+    "ok",
+    "thanks",
+    "I'm fine",
+    "I don't know, I guess it has been a long week at work and I'm tired",
+    "Could you remind me to call my daughter tomorrow afternoon?",
+]
+
+
+def synthetic_speechlike(seconds: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """Amplitude-modulated harmonic bursts with pauses; stable, non-trivial input."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 120 + 60 * np.sin(2 * np.pi * (0.3 + 0.05 * rng.random()) * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * (3.0 + rng.random()) * t) > -0.2).astype(np.float32)
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.6).astype(np.float32)
+    y = 0.3 * voiced * syllables * pauses + 0.01 * rng.standard_normal(len(t))
+    return y.astype(np.float32)
+
+
+def audio_clips(n: int, min_s: float = 2.0, max_s: float = 2.5, sr: int = 16000, seed: int = 0):
+    """``n`` clips with durations spread uniformly over [min_s, max_s]."""
+    rng = np.random.default_rng(seed)
+    return [synthetic_speechlike(rng.uniform(min_s, max_s), sr, seed=seed + i) for i in range(n)]
+
+
+def texts(n: int, seed: int = 0):
+    """``n`` utterances: template phrases, some repeated verbatim, some with a unique suffix."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        base = TEXT_TEMPLATES[int(rng.integers(len(TEXT_TEMPLATES)))]
+        out.append(base if rng.random() < 0.5 else f"{base} ({i})")
+    return out
+
+
+__all__ = ["TEXT_TEMPLATES", "synthetic_speechlike", "audio_clips", "texts"]
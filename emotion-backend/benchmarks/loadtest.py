@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+"""
+Load test for the emotion backend.
+
+Drives /predict (WAV upload or raw PCM), /predict-text and /ws/stream with synthetic audio/text at a
+fixed concurrency and reports throughput, latency percentiles, CPU and RSS as
+JSON, so runs from different commits can be diffed with --compare.
+
+Targets:
+    asgi     in-process app via httpx.ASGITransport (no network, no uvicorn)
+    uvicorn  spawns `uvicorn app.server:app` and measures that process
+    url      an already running server (--url); CPU/RSS only with --pid
+
+Run from emotion-backend/:
+    python benchmarks/loadtest.py --target asgi --scenario predict-text --concurrency 32 --requests 500
+    python benchmarks/loadtest.py --target uvicorn --scenario predict ws-stream --out results/HEAD.json
+    python benchmarks/loadtest.py --compare results/base.json results/HEAD.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import STREAM_HOP_S, STREAM_WINDOW_S  # noqa: E402
+from benchmarks import corpus  # noqa: E402
+
+SR = 16000
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# ---------- Process metrics ----------
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK  # utime + stime
+
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class ProcessSampler:
+    """Samples RSS of ``pid`` while a scenario runs; CPU from /proc tick counters."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.available = pid is not None and os.path.exists(f"/proc/{pid}/stat")
+        self.rss = []
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            self.rss.append(rss_mib(self.pid))
+            await asyncio.sleep(0.25)
+
+    def start(self):
+        if self.available:
+            self._cpu0, self._t0 = cpu_seconds(self.pid), time.perf_counter()
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if not self.available:
+            return {}
+        self._task.cancel()
+        wall = time.perf_counter() - self._t0
+        cpu = cpu_seconds(self.pid) - self._cpu0
+        self.rss.append(rss_mib(self.pid))
+        return {
+            "cpu_seconds": round(cpu, 3),
+            "cpu_util": round(cpu / wall, 3) if wall else 0.0,  # 1.0 = one core busy
+            "rss_mib_max": round(max(self.rss), 1),
+            "rss_mib_end": round(self.rss[-1], 1),
+        }
+
+
+# ---------- Payloads ----------
+def wav_bytes(y: np.ndarray) -> bytes:
+    import soundfile as sf
+
+    buf = io.BytesIO()
+    sf.write(buf, y, SR, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+def summarize(name, latencies_ms, errors, statuses, wall_s):
+    ok = len(latencies_ms)
+    out = {
+        "scenario": name,
+        "requests": ok + errors,
+        "errors": errors,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(ok / wall_s, 2) if wall_s else 0.0,
+    }
+    if ok:
+        lat = np.asarray(latencies_ms)
+        out.update({f"p{p}_ms": round(float(np.percentile(lat, p)), 2) for p in (50, 95, 99)})
+        out["mean_ms"] = round(float(lat.mean()), 2)
+        out["max_ms"] = round(float(lat.max()), 2)
+    return out
+
+
+async def run_http(client, name, make_request, n_requests, concurrency):
+    latencies, statuses, errors = [], {}, 0
+    counter = iter(range(n_requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                r = await make_request(client, i)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+                if r.status_code == 200:
+                    latencies.append(1000 * (time.perf_counter() - t0))
+                else:
+                    errors += 1
+            except Exception:
+                statuses["exception"] = statuses.get("exception", 0) + 1
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(name, latencies, errors, statuses, time.perf_counter() - t0)
+
+
+async def run_ws(base_url, n_streams, seconds, hop_s, window_s, concurrency, recv_timeout):
+    """Each stream sends ``seconds`` of PCM16 in real-time-sized hops, as fast as possible.
+
+    A reply that does not arrive within ``recv_timeout`` counts as an error and
+    the stream moves on to its next hop.
+    """
+    import websockets
+
+    ws_url = (base_url.replace("http", "ws", 1)
+              + f"/ws/stream?sample_rate={SR}&format=pcm16&hop={hop_s}&window={window_s}")
+    hop, window = int(hop_s * SR), int(window_s * SR)
+    latencies, statuses, errors = [], {}, 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def stream(i):
+        nonlocal errors
+        y = (np.clip(corpus.synthetic_speechlike(seconds, SR, seed=i), -1, 1) * 32767).astype(np.int16)
+        async with sem:
+            try:
+                async with websockets.connect(ws_url, max_size=None) as ws:
+                    for start in range(0, len(y) - hop + 1, hop):
+                        t0 = time.perf_counter()
+                        await ws.send(y[start:start + hop].tobytes())
+                        if start + hop < window:
+                            continue  # window not full yet, no reply expected
+                        try:
+                            msg = json.loads(await asyncio.wait_for(ws.recv(), recv_timeout))
+                        except asyncio.TimeoutError:
+                            statuses["timeout"] = statuses.get("timeout", 0) + 1
+                            errors += 1
+                            continue
+                        statuses[msg["type"]] = statuses.get(msg["type"], 0) + 1
+                        if msg["type"] == "emotion":
+                            latencies.append(1000 * (time.perf_counter() - t0))
+                        else:
+                            errors += 1
+            except Exception:
+                statuses["exception"] = statuses.get("exception", 0) + 1
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[stream(i) for i in range(n_streams)])
+    return summarize("ws-stream", latencies, errors, statuses, time.perf_counter() - t0)
+
+
+# ---------- Targets ----------
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def wait_ready(url, timeout):
+    """Wait for /ready (models loaded and warm); /health answers before that."""
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/ready", timeout=2).status_code == 200:
+                return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+async def run_scenarios(args, client, base_url, pid):
+    import httpx
+
+    waves = corpus.audio_clips(min(args.requests, 64), args.min_s, args.max_s)
+    clips = [wav_bytes(y) for y in waves]
+    pcm = [(np.clip(y, -1, 1) * 32767).astype("<i2").tobytes() for y in waves]
+    pcm_headers = {"Content-Type": "application/octet-stream", "X-Sample-Rate": str(SR)}
+    texts = corpus.texts(args.requests)
+
+    async def predict(c, i):
+        return await c.post("/predict", files={"file": ("clip.wav", clips[i % len(clips)], "audio/wav")})
+
+    async def predict_raw(c, i):
+        return await c.post("/predict", content=pcm[i % len(pcm)], headers=pcm_headers)
+
+    async def predict_text(c, i):
+        return await c.post("/predict-text", json={"text": texts[i]})
+
+    results = []
+    for scenario in args.scenario:
+        # Warm up so model loading and first-call overhead are not measured
+        http = {"predict": predict, "predict-raw": predict_raw, "predict-text": predict_text}
+        if scenario in http:
+            await http[scenario](client, 0)
+        sampler = ProcessSampler(pid)
+        sampler.start()
+        if scenario in http:
+            res = await run_http(client, scenario, http[scenario], args.requests, args.concurrency)
+        elif scenario == "ws-stream":
+            if base_url is None:
+                print("⚠️ ws-stream needs a network target (--target uvicorn or url); skipped")
+                continue
+            res = await run_ws(base_url, args.streams, args.stream_seconds, args.hop, args.window,
+                               args.concurrency, args.recv_timeout)
+        else:
+            raise ValueError(f"Unknown scenario {scenario}")
+        res.update(await sampler.stop())
+        res["concurrency"] = args.concurrency
+        print(f"  {scenario}: {res['throughput_rps']} req/s, p50 {res.get('p50_ms')} ms, "
+              f"p99 {res.get('p99_ms')} ms, errors {res['errors']}")
+        results.append(res)
+    return results
+
+
+async def main_async(args):
+    import httpx
+
+    timeout = httpx.Timeout(args.timeout)
+    if args.target == "asgi":
+        from app.server import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://asgi", timeout=timeout) as client:
+                return await run_scenarios(args, client, None, os.getpid())
+
+    proc = None
+    url, pid = args.url, args.pid
+    if args.target == "uvicorn":
+        url = f"http://127.0.0.1:{args.port}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.server:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        pid = proc.pid
+        if not wait_ready(url, args.startup_timeout):
+            proc.kill()
+            raise SystemExit("uvicorn target did not become ready")
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            return await run_scenarios(args, client, url, pid)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+def compare(base_path, new_path, threshold):
+    with open(base_path) as fh:
+        base = {r["scenario"]: r for r in json.load(fh)["results"]}
+    with open(new_path) as fh:
+        new = json.load(fh)
+    regressions = 0
+    print(f"{'scenario':<14} {'metric':<16} {'base':>10} {'new':>10} {'change':>8}")
+    for r in new["results"]:
+        b = base.get(r["scenario"])
+        if not b:
+            continue
+        for metric, higher_is_better in (("throughput_rps", True), ("p50_ms", False), ("p95_ms", False),
+                                         ("p99_ms", False), ("cpu_seconds", False), ("rss_mib_max", False)):
+            if metric not in r or metric not in b or not b[metric]:
+                continue
+            change = (r[metric] - b[metric]) / b[metric]
+            worse = -change if higher_is_better else change
+            flag = " ❌" if worse > threshold else ""
+            regressions += bool(flag)
+            print(f"{r['scenario']:<14} {metric:<16} {b[metric]:>10} {r[metric]:>10} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn", "url"], default="asgi")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server for --target url")
+    parser.add_argument("--pid", type=int, default=None, help="Server pid to sample CPU/RSS for --target url")
+    parser.add_argument("--port", type=int, default=8123, help="Port for --target uvicorn")
+    parser.add_argument("--scenario", nargs="+", default=["predict-text", "predict"],
+                        choices=["predict", "predict-raw", "predict-text", "ws-stream"])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per HTTP scenario")
+    parser.add_argument("--min-s", type=float, default=2.0, help="Shortest synthetic clip (s)")
+    parser.add_argument("--max-s", type=float, default=2.5, help="Longest synthetic clip (s)")
+    parser.add_argument("--streams", type=int, default=8, help="WebSocket streams for ws-stream")
+    parser.add_argument("--stream-seconds", type=float, default=10.0)
+    parser.add_argument("--hop", type=float, default=STREAM_HOP_S, help="ws-stream hop (s)")
+    parser.add_argument("--window", type=float, default=STREAM_WINDOW_S, help="ws-stream window (s)")
+    parser.add_argument("--recv-timeout", type=float, default=10.0,
+                        help="Seconds to wait for each ws-stream reply before counting an error")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--out", default="", help="Write JSON results to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Diff two result files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change flagged as regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    print(f"▶ target={args.target} scenarios={args.scenario} concurrency={args.concurrency}")
+    results = asyncio.run(main_async(args))
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "target": args.target,
+        "host": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "env": {k: v for k, v in os.environ.items()
+                if k.startswith(("TEXT_", "AUDIO_", "INFERENCE_", "TORCH_", "STREAM_", "MODEL_ID"))},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as fh:
+            fh.write(text)
+        print(f"✅ Results written to {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
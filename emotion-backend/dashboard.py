@@ -3,16 +3,14 @@
 WebSocket-based emotion display server
 Connects microphone capture to web dashboard
 """
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-import sounddevice as sd
-import numpy as np
-import requests
-import json
 from datetime import datetime
 
+from emotion_client import AdaptiveScheduler, AsyncEmotionClient, EmotionHub
+
 app = FastAPI(title="Emotion Display Dashboard")
 
 # Add CORS
@@ -26,81 +24,56 @@ app.add_middleware(
 
 BACKEND_URL = "http://localhost:8000/predict"
 SAMPLE_RATE = 16000
-CHANNELS = 1
 BUFFER_DURATION = 2
-BUFFER_SIZE = int(SAMPLE_RATE * BUFFER_DURATION)
+HOP_DURATION = 0.5
 CHUNK_DURATION = 0.5
+MAX_IN_FLIGHT = 2
 
-class EmotionCapture:
-    def __init__(self):
-        self.audio_buffer = np.array([], dtype=np.float32)
-        self.is_recording = False
-        self.latest_emotion = None
-        
-    async def capture_and_process(self, websocket):
-        """Capture audio and send emotions to websocket"""
-        
-        def audio_callback(indata, frames, time_info, status):
-            if status:
-                print(f"Audio status: {status}")
-            audio_data = indata[:, 0].astype(np.float32)
-            self.audio_buffer = np.concatenate([self.audio_buffer, audio_data])
-            
-            # Process when buffer is full
-            if len(self.audio_buffer) >= BUFFER_SIZE:
-                chunk = self.audio_buffer[:BUFFER_SIZE]
-                self.audio_buffer = self.audio_buffer[BUFFER_SIZE:]
-                
-                # Send to backend
-                asyncio.create_task(self.process_emotion(chunk, websocket))
-        
-        try:
-            with sd.InputStream(
-                channels=CHANNELS,
-                samplerate=SAMPLE_RATE,
-                callback=audio_callback,
-                blocksize=int(SAMPLE_RATE * CHUNK_DURATION)
-            ):
-                while True:
-                    await asyncio.sleep(0.1)
-        except Exception as e:
-            print(f"Error in capture: {e}")
-    
-    async def process_emotion(self, audio_chunk, websocket):
-        """Send audio to backend and get emotion"""
-        try:
-            import io
-            import soundfile as sf
-            
-            buffer = io.BytesIO()
-            sf.write(buffer, audio_chunk, SAMPLE_RATE, format='WAV')
-            buffer.seek(0)
-            
-            files = {'file': ('audio.wav', buffer, 'audio/wav')}
-            response = requests.post(BACKEND_URL, files=files, timeout=10)
-            
-            if response.status_code == 200:
-                result = response.json()
-                self.latest_emotion = result
-                
-                # Send to websocket
-                await websocket.send_json({
-                    "type": "emotion",
-                    "timestamp": datetime.now().isoformat(),
-                    "data": result
-                })
-        except Exception as e:
-            print(f"Error processing emotion: {e}")
+def emotion_message(result):
+    return {
+        "type": "emotion",
+        "timestamp": datetime.now().isoformat(),
+        "data": result
+    }
+
+# One microphone and one inference loop, shared by every open dashboard; requests are
+# spaced by the scheduler's hop, which stretches when the backend slows down
+scheduler = AdaptiveScheduler(HOP_DURATION, max_in_flight=MAX_IN_FLIGHT)
+hub = EmotionHub(AsyncEmotionClient(BACKEND_URL, pool_size=MAX_IN_FLIGHT, observer=scheduler),
+                 to_message=emotion_message, sample_rate=SAMPLE_RATE, window_s=BUFFER_DURATION,
+                 hop_s=HOP_DURATION, block_s=CHUNK_DURATION, max_in_flight=MAX_IN_FLIGHT, scheduler=scheduler,
+                 on_status=lambda s: print(f"Audio status: {s}"))
 
-emotion_capture = EmotionCapture()
+async def send_updates(websocket, box):
+    # Each subscriber only ever gets the newest result; a slow browser skips the rest
+    while True:
+        await websocket.send_json(await box.get())
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     try:
-        await emotion_capture.capture_and_process(websocket)
+        box = await hub.subscribe()
+    except Exception as e:
+        print(f"Error in capture: {e}")
+        await websocket.send_json({"type": "error", "detail": f"Microphone unavailable: {e}"})
+        await websocket.close(code=1011)
+        return
+    sender = asyncio.create_task(send_updates(websocket, box))
+    try:
+        while True:
+            await websocket.receive_text()  # only to notice the disconnect
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        sender.cancel()
+        await hub.unsubscribe(box)
+
+@app.get("/stats")
+async def get_stats():
+    return hub.snapshot()
 
 @app.get("/", response_class=HTMLResponse)
 async def get_dashboard():
@@ -0,0 +1,27 @@
+"""
+Client library for the emotion backend, shared by the capture scripts.
+
+    from emotion_client import EmotionClient, Pipeline, WindowedCapture
+
+    client = EmotionClient("http://localhost:8000")
+    pipeline = Pipeline(client.predict, max_in_flight=2, on_result=lambda r, meta: print(r["label"]))
+    with WindowedCapture(pipeline.submit, window_s=2.5, hop_s=0.7):
+        ...
+
+``AsyncEmotionClient`` and ``AsyncPipeline`` are the asyncio equivalents.
+"""
+from .capture import WindowedCapture, list_input_devices
+from .hub import Broadcaster, EmotionHub, LatestValue
+from .labels import EMOTION_EMOJI, EMOTION_NAMES, emotion_emoji, emotion_name
+from .pipeline import AsyncPipeline, Pipeline, PipelineStats
+from .ringbuffer import SampleRingBuffer, WindowCursor
+from .scheduler import AdaptiveScheduler, parse_retry_after
+from .transport import DEFAULT_URL, AsyncEmotionClient, EmotionClient, base_url, encode_wav, float_to_int16
+
+__all__ = [
+    "EmotionClient", "AsyncEmotionClient", "DEFAULT_URL", "base_url", "encode_wav", "float_to_int16",
+    "Pipeline", "AsyncPipeline", "PipelineStats", "AdaptiveScheduler", "parse_retry_after",
+    "WindowedCapture", "list_input_devices", "SampleRingBuffer", "WindowCursor",
+    "EmotionHub", "Broadcaster", "LatestValue",
+    "EMOTION_NAMES", "EMOTION_EMOJI", "emotion_name", "emotion_emoji",
+]
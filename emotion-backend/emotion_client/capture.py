@@ -0,0 +1,160 @@
+"""
+Microphone capture that hands out fixed-length windows every hop.
+
+The audio callback only copies the block it was given into a preallocated
+``SampleRingBuffer`` and wakes the dispatcher thread. The dispatcher takes
+the newest complete window on the hop grid and calls ``on_window(window)``,
+which should return quickly (e.g. ``Pipeline.submit``), so neither capture
+nor windowing ever waits on the network. Nothing is allocated per block.
+
+Backends: ``sounddevice`` (default) and ``pyaudio``; both deliver mono
+float32 at ``sample_rate``.
+"""
+import threading
+
+import numpy as np
+
+from .ringbuffer import SampleRingBuffer, WindowCursor
+
+
+def list_input_devices(backend: str = "sounddevice"):
+    """[(index, name, input_channels, is_default)] for every capture device."""
+    if backend == "pyaudio":
+        import pyaudio
+
+        p = pyaudio.PyAudio()
+        try:
+            default = p.get_default_input_device_info()["index"] if p.get_device_count() else None
+            infos = [p.get_device_info_by_index(i) for i in range(p.get_device_count())]
+        finally:
+            p.terminate()
+        return [(i, d["name"], d["max_input_channels"], i == default)
+                for i, d in enumerate(infos) if d["max_input_channels"] > 0]
+    import sounddevice as sd
+
+    return [(i, d["name"], d["max_input_channels"], i == sd.default.device[0])
+            for i, d in enumerate(sd.query_devices()) if d["max_input_channels"] > 0]
+
+
+class WindowedCapture:
+    """Capture from the microphone and emit ``window_s`` of audio every ``hop_s``.
+
+    ``hop_s`` defaults to ``window_s`` (back-to-back windows). Use as a
+    context manager or call ``start``/``stop``.
+
+    ``on_window`` gets its own copy of each window. With ``copy=False`` it
+    gets a read-only view into the ring instead, which stays valid for
+    ``slack_s`` of further capture; copy it before handing it to another
+    thread (e.g. only after a local VAD check passes).
+    """
+
+    def __init__(self, on_window, sample_rate: int = 16000, window_s: float = 2.0, hop_s: float = None,
+                 block_s: float = 0.1, backend: str = "sounddevice", device=None, on_status=None,
+                 copy: bool = True, slack_s: float = 1.0):
+        self.on_window = on_window
+        self.sample_rate = int(sample_rate)
+        self.window = int(round(window_s * self.sample_rate))
+        self.hop = int(round((hop_s or window_s) * self.sample_rate))
+        self.block = max(1, int(round(block_s * self.sample_rate)))
+        self.backend = backend
+        self.device = device
+        self.on_status = on_status
+        self.copy = copy
+        self.ring = SampleRingBuffer(self.window + max(self.block, int(slack_s * self.sample_rate)))
+        self.cursor = WindowCursor(self.ring, self.window, self.hop)
+        self._wake = threading.Event()
+        self._stream = None
+        self._pyaudio = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def buffered(self) -> int:
+        """Samples towards the current window (at most one window)."""
+        return min(len(self.ring), self.window)
+
+    @property
+    def windows(self) -> int:
+        return self.cursor.windows
+
+    @property
+    def skipped(self) -> int:
+        """Windows passed over because the dispatcher fell behind."""
+        return self.cursor.skipped
+
+    # ---------- Audio thread ----------
+    def _sd_callback(self, indata, frames, time_info, status):
+        if status and self.on_status:
+            self.on_status(status)
+        self.ring.write(indata[:, 0])
+        self._wake.set()
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        import pyaudio
+
+        if status and self.on_status:
+            self.on_status(status)
+        self.ring.write(np.frombuffer(in_data, dtype=np.float32))
+        self._wake.set()
+        return None, pyaudio.paContinue
+
+    # ---------- Dispatcher ----------
+    def feed(self, block: np.ndarray):
+        """Append samples and emit the newest window if one is due (also usable without a microphone)."""
+        self.ring.write(block)
+        self._emit()
+
+    def _emit(self):
+        due = self.cursor.next(newest=True)
+        if due is not None:
+            window = due[1]
+            self.on_window(window.copy() if self.copy else window)
+
+    def _dispatch(self):
+        while self._running:
+            if self._wake.wait(timeout=0.1):
+                self._wake.clear()
+                self._emit()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._dispatch, name="capture-dispatch", daemon=True)
+        self._thread.start()
+        if self.backend == "pyaudio":
+            import pyaudio
+
+            self._pyaudio = pyaudio.PyAudio()
+            self._stream = self._pyaudio.open(format=pyaudio.paFloat32, channels=1, rate=self.sample_rate,
+                                              input=True, input_device_index=self.device,
+                                              frames_per_buffer=self.block, stream_callback=self._pa_callback)
+            self._stream.start_stream()
+        else:
+            import sounddevice as sd
+
+            self._stream = sd.InputStream(channels=1, samplerate=self.sample_rate, dtype="float32",
+                                          blocksize=self.block, device=self.device, callback=self._sd_callback)
+            self._stream.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            if self.backend == "pyaudio":
+                self._stream.stop_stream()
+                self._stream.close()
+                self._pyaudio.terminate()
+            else:
+                self._stream.stop()
+                self._stream.close()
+            self._stream = None
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+__all__ = ["list_input_devices", "WindowedCapture"]
@@ -0,0 +1,183 @@
+"""
+One microphone, one inference loop, any number of subscribers.
+
+    capture thread --call_soon_threadsafe--> LatestValue (newest window)
+        -> inference workers (AsyncEmotionClient, ``max_in_flight``)
+        -> Broadcaster -> one LatestValue mailbox per subscriber
+
+Every hand-off is a single-slot mailbox: a value nobody has read yet is
+replaced by the newer one. A slow model skips superseded windows and a slow
+subscriber skips superseded results, so neither can back-pressure capture
+or each other. With a ``scheduler`` (``AdaptiveScheduler``) the workers
+also space their requests by its hop, which stretches when the backend slows
+down. Capture starts with the first subscriber and stops with the last.
+"""
+import asyncio
+import logging
+
+from .capture import WindowedCapture
+
+logger = logging.getLogger("emotion_client")
+
+
+class LatestValue:
+    """Single-slot async mailbox: ``put`` never blocks and overwrites an unread value.
+
+    Not thread-safe; from other threads use ``loop.call_soon_threadsafe(box.put, value)``.
+    """
+
+    def __init__(self):
+        self._value = None
+        self._full = False
+        self._event = asyncio.Event()
+        self.put_count = 0
+        self.replaced = 0   # values overwritten before anyone read them
+
+    def put(self, value):
+        if self._full:
+            self.replaced += 1
+        self._value = value
+        self._full = True
+        self.put_count += 1
+        self._event.set()
+
+    async def get(self):
+        while not self._full:
+            self._event.clear()
+            await self._event.wait()
+        value, self._value, self._full = self._value, None, False
+        return value
+
+
+class Broadcaster:
+    """Latest-value fan-out; a new subscriber immediately gets the last message."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.last = None
+
+    def subscribe(self) -> LatestValue:
+        box = LatestValue()
+        if self.last is not None:
+            box.put(self.last)
+        self.subscribers.add(box)
+        return box
+
+    def unsubscribe(self, box: LatestValue):
+        self.subscribers.discard(box)
+
+    def publish(self, message):
+        self.last = message
+        for box in self.subscribers:
+            box.put(message)
+
+
+class EmotionHub:
+    """Share one ``WindowedCapture`` and one inference loop between subscribers.
+
+    ``client`` is an ``AsyncEmotionClient``; ``to_message(result)`` turns a
+    prediction into what subscribers receive. Extra keyword arguments go to
+    ``WindowedCapture``.
+    """
+
+    def __init__(self, client, to_message=None, sample_rate: int = 16000, window_s: float = 2.0,
+                 hop_s: float = None, max_in_flight: int = 1, scheduler=None, **capture_kwargs):
+        self.client = client
+        self.to_message = to_message or (lambda result: result)
+        self.sample_rate = sample_rate
+        self.window_s = window_s
+        self.hop_s = hop_s
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.scheduler = scheduler
+        self.capture_kwargs = capture_kwargs
+        self.broadcaster = Broadcaster()
+        self.capture = None
+        self.results = 0
+        self.stale = 0
+        self.errors = 0
+        self._windows = None
+        self._workers = []
+        self._seq = 0
+        self._published = -1
+        self._lock = None  # created on the serving loop (the hub may be built at import time)
+
+    @property
+    def running(self) -> bool:
+        return self.capture is not None
+
+    def _guard(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def subscribe(self) -> LatestValue:
+        async with self._guard():
+            if not self.running:
+                await self._start()
+            return self.broadcaster.subscribe()
+
+    async def unsubscribe(self, box: LatestValue):
+        async with self._guard():
+            self.broadcaster.unsubscribe(box)
+            if not self.broadcaster.subscribers and self.running:
+                await self._stop()
+
+    async def _start(self):
+        loop = asyncio.get_running_loop()
+        windows = self._windows = LatestValue()
+
+        def on_window(window):
+            # Capture thread: the only thing it does is hand the window to the loop
+            self._seq += 1
+            loop.call_soon_threadsafe(windows.put, (self._seq, window))
+
+        capture = WindowedCapture(on_window, sample_rate=self.sample_rate, window_s=self.window_s,
+                                  hop_s=self.hop_s, **self.capture_kwargs)
+        await asyncio.to_thread(capture.start)
+        self.capture = capture
+        self._workers = [loop.create_task(self._infer(windows)) for _ in range(self.max_in_flight)]
+
+    async def _stop(self):
+        capture, self.capture = self.capture, None
+        await asyncio.to_thread(capture.stop)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _infer(self, windows: LatestValue):
+        while True:
+            if self.scheduler is not None:
+                await asyncio.sleep(self.scheduler.reserve())
+            seq, window = await windows.get()
+            try:
+                result = await self.client.predict(window, self.sample_rate)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Error processing emotion: {e}")
+                continue
+            if seq < self._published:
+                self.stale += 1  # a newer window already answered
+                continue
+            self._published = seq
+            self.results += 1
+            self.broadcaster.publish(self.to_message(result))
+
+    def snapshot(self):
+        subscribers = self.broadcaster.subscribers
+        return {
+            "running": self.running,
+            "subscribers": len(subscribers),
+            "windows": self._windows.put_count if self._windows else 0,
+            "windows_superseded": self._windows.replaced if self._windows else 0,
+            "results": self.results,
+            "stale_results": self.stale,
+            "errors": self.errors,
+            "results_skipped_by_subscribers": sum(box.replaced for box in subscribers),
+            "scheduler": self.scheduler.snapshot() if self.scheduler is not None else None,
+        }
+
+
+__all__ = ["LatestValue", "Broadcaster", "EmotionHub"]
@@ -0,0 +1,22 @@
+"""Display names and emoji for the audio model's labels (short SUPERB codes) and the text model's."""
+
+EMOTION_NAMES = {
+    "ang": "ANGRY", "hap": "HAPPY", "sad": "SAD", "neu": "NEUTRAL",
+    "fear": "FEAR", "dis": "DISGUST", "sur": "SURPRISE",
+}
+
+EMOTION_EMOJI = {
+    "ang": "😠", "hap": "😊", "sad": "😢", "neu": "😐",
+    "fear": "😨", "dis": "🤢", "sur": "😲",
+}
+
+
+def emotion_name(label: str) -> str:
+    return EMOTION_NAMES.get(label, label.upper())
+
+
+def emotion_emoji(label: str, default: str = "🎤") -> str:
+    return EMOTION_EMOJI.get(label, default)
+
+
+__all__ = ["EMOTION_NAMES", "EMOTION_EMOJI", "emotion_name", "emotion_emoji"]
@@ -0,0 +1,243 @@
+"""
+Bounded in-flight request pipelines.
+
+A capture loop should never wait on the network. ``Pipeline.submit`` hands a
+window to a worker and returns at once; at most ``max_in_flight`` requests
+run concurrently. A window that arrives while all of them are busy waits in
+a single pending slot, where a newer window replaces it (counted as
+superseded), and goes out as soon as a request finishes, so the next
+request always carries the newest audio. Results arrive through callbacks.
+With ``drop_stale`` a result that finishes after a newer one has already
+been delivered is discarded, so displays never step backwards in time.
+
+With a ``scheduler`` (``AdaptiveScheduler``) windows that arrive sooner than
+its current hop are throttled, which stretches the effective hop when the
+server is slow or asks clients to back off.
+
+``AsyncPipeline`` is the same for asyncio code; callbacks may be coroutines.
+A callback that raises is logged and counted; it never stalls the pipeline.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("emotion_client")
+
+
+class PipelineStats:
+    def __init__(self):
+        self.submitted = 0
+        self.superseded = 0  # waited for a slot and was replaced by a newer window
+        self.throttled = 0   # arrived before the scheduler's hop was up
+        self.completed = 0
+        self.failed = 0
+        self.stale = 0       # finished after a newer result and discarded
+        self.callback_errors = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.superseded + self.throttled
+
+    def snapshot(self):
+        return {**vars(self), "dropped": self.dropped}
+
+
+class Pipeline:
+    """Thread-based pipeline around a blocking ``fn`` (e.g. ``EmotionClient.predict``).
+
+    Callbacks run on the worker thread that finished the request:
+    ``on_result(result, meta)`` and ``on_error(exc, meta)``.
+    """
+
+    def __init__(self, fn, max_in_flight: int = 2, on_result=None, on_error=None, drop_stale: bool = True,
+                 scheduler=None):
+        self.fn = fn
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.on_result = on_result
+        self.on_error = on_error
+        self.drop_stale = drop_stale
+        self.scheduler = scheduler
+        self.stats = PipelineStats()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="emotion-client")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._pending = None  # (args, meta) waiting for a slot
+        self._seq = 0
+        self._delivered = -1
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def submit(self, *args, meta=None) -> bool:
+        """Send ``fn(*args)`` now if a slot is free, else park it as the pending window.
+
+        Returns False if the scheduler throttled it; parked windows count as
+        accepted (a newer one may still supersede them).
+        """
+        if self.scheduler is not None and not self.scheduler.admit():
+            with self._lock:
+                self.stats.throttled += 1
+            return False
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                if self._pending is not None:
+                    self.stats.superseded += 1
+                self._pending = (args, meta)
+                return True
+            seq = self._start()
+        self._pool.submit(self._call, seq, args, meta)
+        return True
+
+    def _start(self):
+        # Caller holds the lock
+        seq = self._seq
+        self._seq += 1
+        self._in_flight += 1
+        self.stats.submitted += 1
+        return seq
+
+    def _call(self, seq, args, meta):
+        while True:
+            try:
+                result, error = self.fn(*args), None
+            except Exception as e:
+                result, error = None, e
+            with self._lock:
+                stale = False
+                if error is not None:
+                    self.stats.failed += 1
+                else:
+                    stale = self.drop_stale and seq < self._delivered
+                    if stale:
+                        self.stats.stale += 1
+                    else:
+                        self.stats.completed += 1
+                        self._delivered = seq
+                self._in_flight -= 1
+                # Hand the freed slot straight to the newest waiting window
+                following, self._pending = self._pending, None
+                if following is not None:
+                    next_seq = self._start()
+            try:
+                if error is not None:
+                    if self.on_error is not None:
+                        self.on_error(error, meta)
+                elif not stale and self.on_result is not None:
+                    self.on_result(result, meta)
+            except Exception:
+                # The next window already holds a slot; it must still run
+                with self._lock:
+                    self.stats.callback_errors += 1
+                logger.exception("Pipeline callback failed")
+            if following is None:
+                return
+            seq, (args, meta) = next_seq, following
+
+    def close(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncPipeline:
+    """asyncio pipeline around a coroutine function (e.g. ``AsyncEmotionClient.predict``).
+
+    ``submit`` must be called from the event loop; use
+    ``loop.call_soon_threadsafe(pipeline.submit, ...)`` from capture threads.
+    """
+
+    def __init__(self, fn, max_in_flight: int = 2, on_result=None, on_error=None, drop_stale: bool = True,
+                 scheduler=None):
+        self.fn = fn
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.on_result = on_result
+        self.on_error = on_error
+        self.drop_stale = drop_stale
+        self.scheduler = scheduler
+        self.stats = PipelineStats()
+        self._tasks = set()
+        self._pending = None
+        self._seq = 0
+        self._delivered = -1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, *args, meta=None) -> bool:
+        if self.scheduler is not None and not self.scheduler.admit():
+            self.stats.throttled += 1
+            return False
+        if len(self._tasks) >= self.max_in_flight:
+            if self._pending is not None:
+                self.stats.superseded += 1
+            self._pending = (args, meta)
+            return True
+        self._launch(args, meta)
+        return True
+
+    def _launch(self, args, meta):
+        seq = self._seq
+        self._seq += 1
+        self.stats.submitted += 1
+        task = asyncio.get_running_loop().create_task(self._call(seq, args, meta))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        if self._pending is not None and not task.cancelled():
+            following, self._pending = self._pending, None
+            self._launch(*following)
+
+    async def _call(self, seq, args, meta):
+        try:
+            result = await self.fn(*args)
+        except Exception as e:
+            self.stats.failed += 1
+            await self._callback(self.on_error, e, meta)
+            return
+        if self.drop_stale and seq < self._delivered:
+            self.stats.stale += 1
+            return
+        self.stats.completed += 1
+        self._delivered = seq
+        await self._callback(self.on_result, result, meta)
+
+    async def _callback(self, callback, *args):
+        try:
+            await _maybe_await(callback, *args)
+        except Exception:
+            self.stats.callback_errors += 1
+            logger.exception("Pipeline callback failed")
+
+    async def drain(self):
+        """Wait for every request in flight (and any pending window) to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def aclose(self, cancel: bool = False):
+        if cancel:
+            self._pending = None
+            for task in list(self._tasks):
+                task.cancel()
+        await self.drain()
+
+
+async def _maybe_await(callback, *args):
+    if callback is None:
+        return
+    out = callback(*args)
+    if inspect.isawaitable(out):
+        await out
+
+
+__all__ = ["PipelineStats", "Pipeline", "AsyncPipeline"]
@@ -0,0 +1,130 @@
+"""
+Preallocated float32 ring buffer for capture paths.
+
+One thread (the audio callback) writes, one thread reads windows. Memory is
+fixed at construction: every sample is stored twice, at ``i`` and
+``i + capacity``, so any run of up to ``capacity`` recent samples is one
+contiguous slice and windows come out as views with no concatenation or
+copy.
+
+Single-producer/single-consumer without a lock: the producer announces how
+far it is about to write (``_reserved``), writes, then publishes
+``written``. The consumer only reads samples below ``written`` and, after
+using a view, can ask ``intact(start)`` whether the producer has since
+reached into it. Positions are absolute sample counts, so the consumer's
+state (``WindowCursor``) never aliases after a wrap.
+"""
+import numpy as np
+
+
+class SampleRingBuffer:
+    """Fixed-capacity float32 ring holding the most recent ``capacity`` samples."""
+
+    def __init__(self, capacity: int):
+        if int(capacity) <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._buf = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._reserved = 0  # producer: end of the write in progress
+        self.written = 0    # producer: samples ever written (published)
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.written - self.capacity)
+
+    # ---------- Producer ----------
+    def write(self, x) -> int:
+        """Append samples (any float array; mono). Returns how many were written."""
+        x = np.asarray(x, dtype=np.float32).reshape(-1)
+        n = len(x)
+        if n == 0:
+            return 0
+        start = self.written
+        if n > self.capacity:
+            # Only the newest capacity samples can be kept
+            start += n - self.capacity
+            x = x[-self.capacity:]
+        end = start + len(x)
+        self._reserved = end
+        buf, cap, pos = self._buf, self.capacity, start % self.capacity
+        first = min(len(x), cap - pos)
+        buf[pos:pos + first] = x[:first]
+        buf[cap + pos:cap + pos + first] = x[:first]
+        if first < len(x):
+            buf[:len(x) - first] = x[first:]
+            buf[cap:cap + len(x) - first] = x[first:]
+        self.written = end
+        return n
+
+    # ---------- Consumer ----------
+    def view(self, start: int, n: int) -> np.ndarray:
+        """Read-only view of samples ``[start, start + n)``; they must be written and still held."""
+        start, n = int(start), int(n)
+        if n > self.capacity or start < self.oldest or start + n > self.written:
+            raise IndexError(f"samples [{start}, {start + n}) not in buffer [{self.oldest}, {self.written})")
+        pos = start % self.capacity
+        view = self._buf[pos:pos + n]
+        view.flags.writeable = False
+        return view
+
+    def latest(self, n: int) -> np.ndarray:
+        """View of the last ``n`` samples (fewer if less has been written)."""
+        n = min(int(n), len(self))
+        return self.view(self.written - n, n)
+
+    def intact(self, start: int) -> bool:
+        """True if a view taken from ``start`` has not been overwritten (check after using it)."""
+        return self._reserved <= int(start) + self.capacity
+
+
+class WindowCursor:
+    """Consumer-side position for ``window``-sample windows every ``hop`` samples.
+
+    ``next()`` returns ``(start, view)`` for the next window on the hop grid,
+    or None while it isn't complete. With ``newest=True`` it jumps to the most
+    recent complete window instead, counting the ones passed over in
+    ``skipped``; windows the producer already overwrote are always skipped.
+    """
+
+    def __init__(self, ring: SampleRingBuffer, window: int, hop: int):
+        if window <= 0 or hop <= 0:
+            raise ValueError("window and hop must be positive")
+        if window > ring.capacity:
+            raise ValueError(f"window of {window} samples exceeds ring capacity {ring.capacity}")
+        self.ring = ring
+        self.window = int(window)
+        self.hop = int(hop)
+        self.start = 0      # absolute start of the next window
+        self.windows = 0    # windows returned
+        self.skipped = 0    # windows passed over (overwritten, or superseded with newest=True)
+
+    @property
+    def due(self) -> int:
+        """Complete windows waiting (including any already overwritten)."""
+        complete = self.ring.written - self.window - self.start
+        return complete // self.hop + 1 if complete >= 0 else 0
+
+    def next(self, newest: bool = False):
+        due = self.due
+        if due == 0:
+            return None
+        skip = due - 1 if newest else 0
+        oldest = self.ring.oldest
+        if self.start + skip * self.hop < oldest:
+            # Producer lapped us: first window still fully held
+            skip = -(-(oldest - self.start) // self.hop)
+        self.start += skip * self.hop
+        self.skipped += skip
+        if self.start + self.window > self.ring.written:
+            return None  # lapped by more than capacity - window; wait for the next one on the grid
+        start = self.start
+        self.start += self.hop
+        self.windows += 1
+        return start, self.ring.view(start, self.window)
+
+
+__all__ = ["SampleRingBuffer", "WindowCursor"]
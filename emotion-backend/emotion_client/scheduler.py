@@ -0,0 +1,121 @@
+"""
+Client-side pacing for live streams.
+
+Capture produces a window every ``base_hop_s``. Sending all of them is only
+right while the server keeps up. ``AdaptiveScheduler`` stretches the hop
+instead of letting requests queue up:
+
+- round-trip time: with ``max_in_flight`` requests open, sending every
+  ``rtt / (max_in_flight * target_utilization)`` seconds keeps the
+  requests from piling up;
+- ``X-Queue-Depth`` / ``X-Queue-Limit`` response headers: the hop grows
+  with the server's queue, up to 4x when it is full;
+- 429 / 503 with ``Retry-After``: nothing is sent until it has passed;
+  those and transport errors also double a backoff factor that decays
+  again on success.
+
+The hop never drops below ``base_hop_s`` or exceeds ``max_hop_s``.
+Clients report every response through ``observe``; pipelines ask
+``admit`` (sync) or ``reserve`` (async workers) before sending.
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date); None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class AdaptiveScheduler:
+    def __init__(self, base_hop_s: float, max_in_flight: int = 2, max_hop_s: float = 5.0,
+                 target_utilization: float = 0.8, alpha: float = 0.3, max_backoff: float = 8.0):
+        self.base_hop_s = base_hop_s
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_hop_s = max(base_hop_s, max_hop_s)
+        self.target_utilization = target_utilization
+        self.alpha = alpha
+        self.max_backoff = max_backoff
+        self.rtt_s = None
+        self.queue_pressure = 0.0  # server queue depth / limit, from the last response
+        self.backoff = 1.0
+        self.pause_until = 0.0
+        self.last_sent = 0.0
+        self.throttled = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def hop_s(self) -> float:
+        hop = self.base_hop_s
+        if self.rtt_s is not None:
+            hop = max(hop, self.rtt_s / (self.max_in_flight * self.target_utilization))
+        hop *= (1 + 3 * self.queue_pressure) * self.backoff
+        return min(hop, self.max_hop_s)
+
+    # ---------- Feedback ----------
+    def observe(self, elapsed_s: float, status=None, headers=None):
+        """Report one response (``status`` None for a transport error or timeout)."""
+        headers = headers or {}
+        with self._lock:
+            depth, limit = headers.get("x-queue-depth"), headers.get("x-queue-limit")
+            if depth is not None and limit:
+                try:
+                    self.queue_pressure = min(1.0, max(0.0, float(depth) / float(limit)))
+                except ValueError:
+                    pass
+            if status is not None and status < 400:
+                self.rtt_s = elapsed_s if self.rtt_s is None else (
+                    (1 - self.alpha) * self.rtt_s + self.alpha * elapsed_s)
+                self.backoff = max(1.0, self.backoff * 0.8)
+                return
+            if status is None or status in (429, 503):
+                self.rejected += 1
+                self.backoff = min(self.max_backoff, self.backoff * 2)
+                retry_after = parse_retry_after(headers.get("retry-after"))
+                if retry_after is not None:
+                    self.pause_until = max(self.pause_until, time.monotonic() + retry_after)
+
+    # ---------- Pacing ----------
+    def admit(self, now: float = None) -> bool:
+        """True if a window may be sent now; records the send. False windows count as throttled."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # A quarter of a base hop of slack absorbs capture jitter
+            if now < self.pause_until or now - self.last_sent < self.hop_s - 0.25 * self.base_hop_s:
+                self.throttled += 1
+                return False
+            self.last_sent = now
+            return True
+
+    def reserve(self, now: float = None) -> float:
+        """Book the next send slot; returns how long to wait for it."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            at = max(now, self.pause_until, self.last_sent + self.hop_s)
+            self.last_sent = at
+            return at - now
+
+    def snapshot(self):
+        return {
+            "hop_s": round(self.hop_s, 3),
+            "rtt_ms": round(1000 * self.rtt_s, 1) if self.rtt_s is not None else None,
+            "queue_pressure": round(self.queue_pressure, 3),
+            "backoff": round(self.backoff, 2),
+            "paused_s": round(max(0.0, self.pause_until - time.monotonic()), 2),
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+        }
+
+
+__all__ = ["parse_retry_after", "AdaptiveScheduler"]
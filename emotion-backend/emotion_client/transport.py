@@ -0,0 +1,183 @@
+"""
+HTTP transport for the emotion backend.
+
+Both clients hold one connection pool for their lifetime, so a stream of
+windows pays TCP (and TLS) setup once instead of on every ``requests.post``.
+Audio goes up as raw PCM16 (``application/octet-stream`` with X-* headers)
+unless ``wav=True``, which sends a multipart WAV upload for servers that
+predate raw PCM support.
+
+With an ``observer`` (e.g. ``AdaptiveScheduler``) every response's round
+trip, status and headers are reported to ``observer.observe`` before any
+error is raised, so pacing sees 429s and timeouts too.
+"""
+import io
+import time
+import wave
+
+import numpy as np
+
+DEFAULT_URL = "http://localhost:8000"
+ROUTES = ("/predict-text/batch", "/predict-text", "/predict/batch", "/predict", "/health")
+
+
+def base_url(url: str) -> str:
+    """Server root for ``url``, which may also be a full route such as http://host:8000/predict."""
+    url = url.rstrip("/")
+    for route in ROUTES:
+        if url.endswith(route):
+            return url[: -len(route)]
+    return url
+
+
+def float_to_int16(x: np.ndarray) -> np.ndarray:
+    return (np.clip(np.asarray(x, dtype=np.float32), -1.0, 1.0) * 32767.0).astype("<i2")
+
+
+def encode_wav(x: np.ndarray, sample_rate: int) -> bytes:
+    """Mono 16-bit WAV in memory (stdlib only)."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(int(sample_rate))
+        w.writeframes(float_to_int16(x).tobytes())
+    return buf.getvalue()
+
+
+def pcm_headers(sample_rate: int) -> dict:
+    return {
+        "Content-Type": "application/octet-stream",
+        "X-Sample-Rate": str(int(sample_rate)),
+        "X-Channels": "1",
+        "X-Sample-Format": "pcm16",
+    }
+
+
+def audio_request(x: np.ndarray, sample_rate: int, wav: bool = False) -> dict:
+    """Keyword arguments for a /predict POST (shared by the sync and async clients)."""
+    if wav:
+        return {"files": {"file": ("window.wav", encode_wav(x, sample_rate), "audio/wav")}}
+    return {"content": float_to_int16(x).tobytes(), "headers": pcm_headers(sample_rate)}
+
+
+class EmotionClient:
+    """Blocking client on a keep-alive ``requests.Session``.
+
+    The session's pool holds up to ``pool_size`` connections and is safe to
+    share between threads, so one client can serve a whole ``Pipeline``.
+    ``retries`` covers connection failures only, never a request the server
+    has already started on.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 10.0, pool_size: int = 4, retries: int = 1,
+                 wav: bool = False, observer=None):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.url = base_url(url)
+        self.timeout = timeout
+        self.wav = wav
+        self.observer = observer
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, route: str, **kwargs):
+        if "content" in kwargs:
+            kwargs["data"] = kwargs.pop("content")  # requests' name for a raw body
+        t0 = time.perf_counter()
+        try:
+            r = self.session.post(self.url + route, timeout=self.timeout, **kwargs)
+        except Exception:
+            if self.observer is not None:
+                self.observer.observe(time.perf_counter() - t0)
+            raise
+        if self.observer is not None:
+            self.observer.observe(time.perf_counter() - t0, r.status_code, r.headers)
+        r.raise_for_status()
+        return r.json()
+
+    def predict(self, x: np.ndarray, sample_rate: int = 16000) -> dict:
+        """Emotion for one mono float32 window: {label, score, probs, response}."""
+        return self._post("/predict", **audio_request(x, sample_rate, self.wav))
+
+    def predict_text(self, text: str) -> dict:
+        return self._post("/predict-text", json={"text": text})
+
+    def predict_texts(self, texts) -> list:
+        """One /predict-text/batch round trip; items are {index, result, error}."""
+        return self._post("/predict-text/batch", json={"texts": list(texts)})["results"]
+
+    def health(self) -> dict:
+        r = self.session.get(self.url + "/health", timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncEmotionClient:
+    """``EmotionClient`` for asyncio code, on a pooled ``httpx.AsyncClient``."""
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 10.0, pool_size: int = 4, retries: int = 1,
+                 wav: bool = False, observer=None):
+        import httpx
+
+        self.url = base_url(url)
+        self.wav = wav
+        self.observer = observer
+        self.client = httpx.AsyncClient(
+            base_url=self.url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max(1, pool_size), max_keepalive_connections=max(1, pool_size)),
+            transport=httpx.AsyncHTTPTransport(retries=retries),
+        )
+
+    async def _post(self, route: str, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.post(route, **kwargs)
+        except Exception:
+            if self.observer is not None:
+                self.observer.observe(time.perf_counter() - t0)
+            raise
+        if self.observer is not None:
+            self.observer.observe(time.perf_counter() - t0, r.status_code, r.headers)
+        r.raise_for_status()
+        return r.json()
+
+    async def predict(self, x: np.ndarray, sample_rate: int = 16000) -> dict:
+        return await self._post("/predict", **audio_request(x, sample_rate, self.wav))
+
+    async def predict_text(self, text: str) -> dict:
+        return await self._post("/predict-text", json={"text": text})
+
+    async def predict_texts(self, texts) -> list:
+        return (await self._post("/predict-text/batch", json={"texts": list(texts)}))["results"]
+
+    async def health(self) -> dict:
+        r = await self.client.get("/health")
+        r.raise_for_status()
+        return r.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+__all__ = ["DEFAULT_URL", "base_url", "float_to_int16", "encode_wav", "pcm_headers", "audio_request",
+           "EmotionClient", "AsyncEmotionClient"]
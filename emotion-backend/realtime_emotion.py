@@ -3,121 +3,64 @@
 Real-time Emotion Detection from Microphone
 Captures audio in real-time and sends to backend for emotion detection
 """
-import pyaudio
-import numpy as np
-import requests
 import threading
 import time
-from collections import deque
-import json
 from datetime import datetime
 
+from emotion_client import AdaptiveScheduler, EmotionClient, Pipeline, WindowedCapture, emotion_emoji, emotion_name, list_input_devices
+
 # Configuration
 API_URL = "http://localhost:8000/predict"
 CHUNK_SIZE = 2048
 SAMPLE_RATE = 16000
 CHANNELS = 1
-BUFFER_DURATION = 2  # Process every 2 seconds
-BUFFER_SIZE = int(SAMPLE_RATE * BUFFER_DURATION)
+BUFFER_DURATION = 2  # Seconds of audio per prediction
+HOP_DURATION = 0.5   # Fastest pace; stretched when the backend slows down
+MAX_IN_FLIGHT = 2
 
 class RealtimeEmotionDetector:
-    def __init__(self):
-        self.audio_buffer = deque(maxlen=BUFFER_SIZE)
-        self.is_recording = False
+    def __init__(self, backend="pyaudio", chunk_size=CHUNK_SIZE):
+        self.backend = backend
         self.latest_emotion = None
         self.latest_confidence = 0.0
         self.lock = threading.Lock()
-        
-    def audio_callback(self, in_data, frame_count, time_info, status):
-        """PyAudio callback for audio input"""
-        if status:
-            print(f"Audio Status: {status}")
-        
-        # Convert byte data to numpy array
-        audio_data = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
-        
+        self.scheduler = AdaptiveScheduler(HOP_DURATION, max_in_flight=MAX_IN_FLIGHT)
+        self.client = EmotionClient(API_URL, pool_size=MAX_IN_FLIGHT, observer=self.scheduler)
+        self.pipeline = Pipeline(self.client.predict, max_in_flight=MAX_IN_FLIGHT, scheduler=self.scheduler,
+                                 on_result=self.show_result, on_error=self.show_error)
+        self.capture = WindowedCapture(self.on_window, sample_rate=SAMPLE_RATE, window_s=BUFFER_DURATION,
+                                       hop_s=HOP_DURATION, block_s=chunk_size / SAMPLE_RATE, backend=backend,
+                                       on_status=lambda s: print(f"Audio Status: {s}"))
+
+    def on_window(self, audio_chunk):
+        """Called every hop from the capture thread; never blocks on the network"""
+        if self.pipeline.submit(audio_chunk, SAMPLE_RATE, meta=time.time()):
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Processing {len(audio_chunk)/SAMPLE_RATE:.1f}s of audio...")
+
+    def show_error(self, e, sent_at):
+        print(f"Error sending audio: {e}")
+
+    def show_result(self, result, sent_at):
+        label = result['label']
+        confidence = result['score']
         with self.lock:
-            self.audio_buffer.extend(audio_data)
-        
-        return (in_data, pyaudio.paContinue)
-    
-    def send_audio_chunk(self, audio_chunk):
-        """Send audio chunk to backend for emotion detection"""
-        try:
-            # Convert numpy array to WAV format in memory
-            import io
-            import soundfile as sf
-            
-            buffer = io.BytesIO()
-            sf.write(buffer, audio_chunk, SAMPLE_RATE, format='WAV')
-            buffer.seek(0)
-            
-            # Send to API
-            files = {'file': ('audio.wav', buffer, 'audio/wav')}
-            response = requests.post(API_URL, files=files, timeout=10)
-            
-            if response.status_code == 200:
-                result = response.json()
-                with self.lock:
-                    self.latest_emotion = result['label']
-                    self.latest_confidence = result['score']
-                
-                return result
-            else:
-                print(f"API Error: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            print(f"Error sending audio: {e}")
-            return None
-    
-    def processing_thread(self):
-        """Background thread to process audio chunks"""
-        print("Processing thread started...")
-        
-        while self.is_recording:
-            with self.lock:
-                if len(self.audio_buffer) >= BUFFER_SIZE:
-                    # Convert deque to numpy array
-                    audio_chunk = np.array(list(self.audio_buffer), dtype=np.float32)
-                else:
-                    time.sleep(0.1)
-                    continue
-            
-            if len(audio_chunk) > 0:
-                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Processing {len(audio_chunk)/SAMPLE_RATE:.1f}s of audio...")
-                result = self.send_audio_chunk(audio_chunk)
-                
-                if result:
-                    emotion_map = {
-                        'ang': 'ANGRY 😠',
-                        'hap': 'HAPPY 😊',
-                        'sad': 'SAD 😢',
-                        'neu': 'NEUTRAL 😐',
-                        'fear': 'FEAR 😨',
-                        'dis': 'DISGUST 🤢',
-                        'sur': 'SURPRISE 😲'
-                    }
-                    
-                    label = result['label']
-                    emotion_display = emotion_map.get(label, label.upper())
-                    confidence = result['score']
-                    
-                    print(f"╔════════════════════════════════════════╗")
-                    print(f"║  DETECTED EMOTION: {emotion_display:<19}║")
-                    print(f"║  Confidence: {confidence*100:>6.2f}%{' '*21}║")
-                    print(f"║  Response: {result['response']:<24}║")
-                    print(f"╚════════════════════════════════════════╝")
-                    
-                    # Show all emotion probabilities
-                    print("  Probabilities:")
-                    for emotion, prob in sorted(result['probs'].items(), key=lambda x: x[1], reverse=True):
-                        bar_length = int(prob * 30)
-                        bar = "█" * bar_length + "░" * (30 - bar_length)
-                        print(f"    {emotion.upper():>4}: [{bar}] {prob*100:>6.2f}%")
-            
-            time.sleep(0.5)
-    
+            self.latest_emotion = label
+            self.latest_confidence = confidence
+            emotion_display = f"{emotion_name(label)} {emotion_emoji(label, '')}".strip()
+
+            print(f"╔════════════════════════════════════════╗")
+            print(f"║  DETECTED EMOTION: {emotion_display:<19}║")
+            print(f"║  Confidence: {confidence*100:>6.2f}%{' '*21}║")
+            print(f"║  Response: {result['response']:<24}║")
+            print(f"╚════════════════════════════════════════╝")
+
+            # Show all emotion probabilities
+            print(f"  Probabilities ({(time.time() - sent_at)*1000:.0f} ms):")
+            for emotion, prob in sorted(result['probs'].items(), key=lambda x: x[1], reverse=True):
+                bar_length = int(prob * 30)
+                bar = "█" * bar_length + "░" * (30 - bar_length)
+                print(f"    {emotion.upper():>4}: [{bar}] {prob*100:>6.2f}%")
+
     def start(self):
         """Start real-time emotion detection"""
         print("\n" + "="*50)
@@ -125,61 +68,43 @@ class RealtimeEmotionDetector:
         print("="*50)
         print(f"Sample Rate: {SAMPLE_RATE} Hz")
         print(f"Channels: {CHANNELS}")
-        print(f"Buffer Duration: {BUFFER_DURATION}s")
+        print(f"Buffer Duration: {BUFFER_DURATION}s (every {HOP_DURATION}s)")
         print(f"API URL: {API_URL}")
         print("="*50)
         print("\nInitializing microphone...\n")
-        
-        self.is_recording = True
-        
-        # Start processing thread
-        processor = threading.Thread(target=self.processing_thread, daemon=True)
-        processor.start()
-        
-        # Initialize PyAudio
+
         try:
-            p = pyaudio.PyAudio()
-            
             # List available devices
             print("Available Audio Devices:")
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                if info['max_input_channels'] > 0:
-                    print(f"  [{i}] {info['name']} (Input channels: {info['max_input_channels']})")
+            for i, name, channels, default in list_input_devices(self.backend):
+                default_marker = " [DEFAULT]" if default else ""
+                print(f"  [{i}] {name} (Input channels: {channels}){default_marker}")
             print()
-            
-            # Open audio stream
-            stream = p.open(
-                format=pyaudio.paFloat32,
-                channels=CHANNELS,
-                rate=SAMPLE_RATE,
-                input=True,
-                frames_per_buffer=CHUNK_SIZE,
-                stream_callback=self.audio_callback
-            )
-            
-            stream.start_stream()
-            print("🎤 Microphone active! Speak into your microphone...")
-            print("Press Ctrl+C to stop.\n")
-            
-            # Keep running
-            try:
-                while self.is_recording:
-                    time.sleep(0.1)
-            except KeyboardInterrupt:
-                print("\n\nStopping...")
-            
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-            self.is_recording = False
-            print("✓ Microphone closed. Goodbye!")
-            
+
+            self.capture.start()
         except Exception as e:
             print(f"Error initializing microphone: {e}")
-            print("\nMake sure PyAudio is installed:")
-            print("  pip install pyaudio")
-            self.is_recording = False
+            if self.backend == "pyaudio":
+                print("\nMake sure PyAudio is installed:")
+                print("  pip install pyaudio")
+            return
+
+        print("🎤 Microphone active! Speak into your microphone...")
+        print("Press Ctrl+C to stop.\n")
+
+        # Keep running
+        try:
+            while True:
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            print("\n\nStopping...")
+
+        self.capture.stop()
+        self.pipeline.close()
+        self.client.close()
+        stats = self.pipeline.stats
+        print(f"Windows: {stats.submitted} sent, {stats.dropped} skipped to stay current")
+        print("✓ Microphone closed. Goodbye!")
 
 if __name__ == "__main__":
     detector = RealtimeEmotionDetector()
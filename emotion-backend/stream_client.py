@@ -2,7 +2,8 @@
 """
 Real-time mic → backend API streaming client for Speech Emotion Recognition.
 - Captures a 2.5s window every 0.7s from the default microphone.
-- Sends WAV (16-bit PCM) to FastAPI /predict endpoint.
+- Sends raw 16-bit PCM (application/octet-stream) to FastAPI /predict endpoint
+  (--wav sends a WAV file upload instead, for older servers).
 - Smooths predictions with EMA and (optionally) speaks a mapped reply.
 
 Run:
@@ -10,13 +11,13 @@ Run:
 """
 
 import argparse
-import io
+import queue
 import sys
+import threading
 import time
-import queue
 import numpy as np
-import sounddevice as sd
-import requests
+
+from emotion_client import AdaptiveScheduler, EmotionClient, Pipeline, WindowedCapture
 
 # Optional offline TTS (server-side voice on your machine)
 try:
@@ -30,21 +31,6 @@ def ema_update(prev, new, alpha=0.65):
         return new
     return alpha * new + (1 - alpha) * prev
 
-def float_to_int16(x: np.ndarray) -> np.ndarray:
-    x = np.clip(x, -1.0, 1.0)
-    return (x * 32767.0).astype(np.int16)
-
-def encode_wav_int16(int16_mono: np.ndarray, sr: int) -> bytes:
-    """Create a mono 16-bit PCM WAV in-memory (no external deps)."""
-    import wave, struct
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as w:
-        w.setnchannels(1)
-        w.setsampwidth(2)  # 16-bit
-        w.setframerate(sr)
-        w.writeframes(struct.pack("<" + "h"*len(int16_mono), *int16_mono))
-    return buf.getvalue()
-
 def energy_vad(y: np.ndarray, threshold: float = 0.005) -> bool:
     """
     Simple energy-based voice gate. Returns True if voiced.
@@ -54,6 +40,28 @@ def energy_vad(y: np.ndarray, threshold: float = 0.005) -> bool:
     rms = np.sqrt(np.mean(y**2) + 1e-12)
     return bool(rms >= threshold)
 
+def start_speaker(tts):
+    """Speak replies on their own thread so a long utterance never holds up results."""
+    lines = queue.Queue(maxsize=1)
+
+    def run():
+        while True:
+            text = lines.get()
+            try:
+                tts.say(text)
+                tts.runAndWait()
+            except Exception as e:
+                print(f"\n[TTS error] {e}")
+
+    threading.Thread(target=run, name="tts", daemon=True).start()
+
+    def speak(text):
+        try:
+            lines.put_nowait(text)
+        except queue.Full:
+            pass  # still speaking; the next confident change will be spoken instead
+    return speak
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--api", type=str, default="http://localhost:8000/predict",
@@ -65,119 +73,105 @@ def main():
     parser.add_argument("--vad_threshold", type=float, default=0.005,
                         help="Energy VAD threshold; set 0 to disable gate")
     parser.add_argument("--mute", action="store_true", help="Disable local TTS replies")
+    parser.add_argument("--wav", action="store_true", help="Upload WAV files instead of raw PCM")
+    parser.add_argument("--in_flight", type=int, default=2,
+                        help="Max concurrent requests; while all are busy only the newest window waits")
     args = parser.parse_args()
 
     SR = args.sr
-    WINDOW_SAMPLES = int(SR * args.window)
-    HOP_SAMPLES = int(SR * args.hop)
-    BLOCKSIZE = HOP_SAMPLES  # mic callback block ~ hop seconds
 
     # Init optional TTS
-    tts = None
+    speak = None
     if not args.mute and HAVE_TTS:
         try:
             tts = pyttsx3.init()
             tts.setProperty('rate', 175)
+            speak = start_speaker(tts)
         except Exception:
-            tts = None
+            speak = None
 
     # For speaking less frequently
     speak_cooldown = 2.5  # seconds
-    last_spoken_label = None
-    last_speak_ts = 0.0
-
-    # Ring buffer and queue
-    buf = np.zeros(0, dtype=np.float32)
-    q = queue.Queue()
-
-    # Smoothing
-    ema_probs = None
-    labels_order = None
-
-    def audio_callback(indata, frames, time_info, status):
-        if status:
-            print(status, file=sys.stderr)
-        # Take mono float32
-        q.put(indata.copy().reshape(-1))
+    state = {"ema_probs": None, "labels_order": None, "last_spoken_label": None, "last_speak_ts": 0.0}
+
+    def on_result(data, sent_at):
+        # data: {label, score, probs: {lbl: prob, ...}, response}
+        if state["labels_order"] is None:
+            state["labels_order"] = list(data["probs"].keys())
+        labels_order = state["labels_order"]
+
+        # Build vector in fixed order
+        probs_vec = np.array([data["probs"].get(lbl, 0.0) for lbl in labels_order], dtype=np.float32)
+        # Smooth
+        ema_probs = state["ema_probs"] = ema_update(state["ema_probs"], probs_vec, alpha=args.ema)
+        top_idx = int(np.argmax(ema_probs))
+        top_label = labels_order[top_idx]
+        conf = float(ema_probs[top_idx])
+
+        # Print top-3
+        top3 = np.argsort(-ema_probs)[:3]
+        msg = " | ".join([f"{labels_order[i]}:{ema_probs[i]:.2f}" for i in top3])
+        latency_ms = (time.time() - sent_at) * 1000
+        print(f"\r👉 {top_label.upper():<10} [{msg}]  {latency_ms:>4.0f} ms  hop {scheduler.hop_s:.1f}s  ",
+              end="", flush=True)
+
+        # Speak (optional): only if confident & changed & cooldown elapsed
+        now = time.time()
+        if speak and (conf >= 0.58) and (top_label != state["last_spoken_label"]) \
+                and (now - state["last_speak_ts"] >= speak_cooldown):
+            state["last_spoken_label"] = top_label
+            state["last_speak_ts"] = now
+            speak(data.get("response", f"{top_label}"))
+
+    # --hop is the fastest pace; it stretches when round trips grow or the server asks to back off
+    scheduler = AdaptiveScheduler(args.hop, max_in_flight=args.in_flight)
+    client = EmotionClient(args.api, timeout=30, pool_size=args.in_flight, wav=args.wav, observer=scheduler)
+    # One in-flight result callback at a time keeps the EMA update ordered
+    deliver = threading.Lock()
+
+    def on_result_locked(data, sent_at):
+        with deliver:
+            on_result(data, sent_at)
+
+    pipeline = Pipeline(client.predict, max_in_flight=args.in_flight, on_result=on_result_locked, scheduler=scheduler,
+                        on_error=lambda e, _: print(f"\n[HTTP error] {e}"))
+
+    def on_window(y):
+        # y is a view into the capture ring: gate on it in place, copy only what gets sent
+        # Simple VAD gate (skip silence / very low energy)
+        if args.vad_threshold > 0 and not energy_vad(y, args.vad_threshold):
+            print("\r…", end="", flush=True)
+            return
+        # Send to backend as raw PCM16 (or a WAV upload with --wav), without waiting for the reply
+        pipeline.submit(y.copy(), SR, meta=time.time())
 
     print(f"🎙️ Opening microphone at {SR} Hz …")
-    with sd.InputStream(channels=1, samplerate=SR, dtype="float32",
-                        blocksize=BLOCKSIZE, callback=audio_callback):
+    # Mic callback block ~ hop seconds
+    capture = WindowedCapture(on_window, sample_rate=SR, window_s=args.window, hop_s=args.hop, block_s=args.hop,
+                              copy=False, on_status=lambda status: print(status, file=sys.stderr))
+    with capture:
         print(f"Listening… Window={args.window:.1f}s  Hop={args.hop:.1f}s")
-        print(f"Sending to: {args.api}")
+        print(f"Sending to: {args.api}  (up to {args.in_flight} requests in flight)")
         if args.vad_threshold > 0:
             print(f"Energy VAD: ON (threshold={args.vad_threshold})")
         else:
             print(f"Energy VAD: OFF")
-        if tts:
+        if speak:
             print("TTS: ON")
         else:
             print("TTS: OFF")
 
-        last_step = 0.0
         try:
             while True:
-                try:
-                    chunk = q.get(timeout=1.0)
-                except queue.Empty:
-                    continue
-
-                # Append new audio to buffer
-                buf = np.concatenate([buf, chunk])
-                # Keep only last window
-                if len(buf) > WINDOW_SAMPLES:
-                    buf = buf[-WINDOW_SAMPLES:]
-
-                now = time.time()
-                if len(buf) >= WINDOW_SAMPLES and (now - last_step) >= args.hop:
-                    last_step = now
-                    y = buf.copy()
-
-                    # Simple VAD gate (skip silence / very low energy)
-                    if args.vad_threshold > 0 and not energy_vad(y, args.vad_threshold):
-                        print("\r…", end="", flush=True)
-                        continue
-
-                    # Encode to PCM16 WAV in-memory
-                    wav_bytes = encode_wav_int16(float_to_int16(y), SR)
-
-                    # Send to backend
-                    files = {"file": ("window.wav", wav_bytes, "audio/wav")}
-                    try:
-                        r = requests.post(args.api, files=files, timeout=30)
-                        r.raise_for_status()
-                    except Exception as e:
-                        print(f"\n[HTTP error] {e}")
-                        continue
-
-                    data = r.json()
-                    # data: {label, score, probs: {lbl: prob, ...}, response}
-                    if labels_order is None:
-                        labels_order = list(data["probs"].keys())
-
-                    # Build vector in fixed order
-                    probs_vec = np.array([data["probs"].get(lbl, 0.0) for lbl in labels_order], dtype=np.float32)
-                    # Smooth
-                    ema_probs = ema_update(ema_probs, probs_vec, alpha=args.ema)
-                    top_idx = int(np.argmax(ema_probs))
-                    top_label = labels_order[top_idx]
-                    conf = float(ema_probs[top_idx])
-
-                    # Print top-3
-                    top3 = np.argsort(-ema_probs)[:3]
-                    msg = " | ".join([f"{labels_order[i]}:{ema_probs[i]:.2f}" for i in top3])
-                    print(f"\r👉 {top_label.upper():<10} [{msg}]  ", end="", flush=True)
-
-                    # Speak (optional): only if confident & changed & cooldown elapsed
-                    if tts and (conf >= 0.58) and (top_label != last_spoken_label) and (now - last_speak_ts >= speak_cooldown):
-                        last_spoken_label = top_label
-                        last_speak_ts = now
-                        try:
-                            tts.stop()
-                            tts.say(data.get("response", f"{top_label}"))
-                            tts.runAndWait()
-                        except Exception as e:
-                            print(f"\n[TTS error] {e}")
-
+                time.sleep(0.5)
         except KeyboardInterrupt:
-            print("\nStopping… bye!")
\ No newline at end of file
+            print("\nStopping… bye!")
+
+    pipeline.close(wait=False)
+    client.close()
+    stats = pipeline.stats
+    print(f"Windows sent: {stats.submitted}  superseded: {stats.superseded}  throttled: {stats.throttled}  "
+          f"stale: {stats.stale}  errors: {stats.failed}")
+
+if __name__ == "__main__":
+    main()
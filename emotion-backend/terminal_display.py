@@ -3,26 +3,35 @@
 Terminal-based real-time emotion display
 Captures microphone and shows beautiful emotion visualization in terminal
 """
-import sounddevice as sd
-import numpy as np
-import requests
+import threading
 import time
 from datetime import datetime
 from collections import deque
 
+from emotion_client import AdaptiveScheduler, EmotionClient, Pipeline, WindowedCapture, emotion_emoji, emotion_name, list_input_devices
+
 # Configuration
 API_URL = "http://localhost:8000/predict"
 SAMPLE_RATE = 16000
-CHANNELS = 1
 BUFFER_DURATION = 2
 BUFFER_SIZE = int(SAMPLE_RATE * BUFFER_DURATION)
 CHUNK_DURATION = 0.5
+REFRESH_INTERVAL = 0.5  # Screen redraw; also the fastest pace windows are sent at
+MAX_IN_FLIGHT = 2
 
 class TerminalEmotionDisplay:
     def __init__(self):
-        self.audio_buffer = deque(maxlen=BUFFER_SIZE)
-        self.is_recording = False
         self.history = deque(maxlen=5)  # Keep last 5 emotions
+        self.current_emotion = None
+        self.connected = True
+        self.lock = threading.Lock()
+        self.scheduler = AdaptiveScheduler(REFRESH_INTERVAL, max_in_flight=MAX_IN_FLIGHT)
+        self.client = EmotionClient(API_URL, pool_size=MAX_IN_FLIGHT, observer=self.scheduler)
+        self.pipeline = Pipeline(self.client.predict, max_in_flight=MAX_IN_FLIGHT, scheduler=self.scheduler,
+                                 on_result=self.on_result, on_error=self.on_error)
+        self.capture = WindowedCapture(self.on_window, sample_rate=SAMPLE_RATE, window_s=BUFFER_DURATION,
+                                       hop_s=REFRESH_INTERVAL, block_s=CHUNK_DURATION,
+                                       on_status=lambda s: print(f"⚠️  Audio status: {s}"))
         
     def clear_screen(self):
         """Clear terminal screen"""
@@ -50,28 +59,8 @@ class TerminalEmotionDisplay:
         response = emotion_data['response']
         probs = emotion_data['probs']
         
-        emoji_map = {
-            'ang': '😠',
-            'hap': '😊',
-            'sad': '😢',
-            'neu': '😐',
-            'fear': '😨',
-            'dis': '🤢',
-            'sur': '😲'
-        }
-        
-        name_map = {
-            'ang': 'ANGRY',
-            'hap': 'HAPPY',
-            'sad': 'SAD',
-            'neu': 'NEUTRAL',
-            'fear': 'FEAR',
-            'dis': 'DISGUST',
-            'sur': 'SURPRISE'
-        }
-        
-        emoji = emoji_map.get(label, '🎤')
-        name = name_map.get(label, label.upper())
+        emoji = emotion_emoji(label)
+        name = emotion_name(label)
         confidence = int(score * 100)
         
         # Main emotion box
@@ -101,8 +90,8 @@ class TerminalEmotionDisplay:
             percentage = int(prob * 100)
             bar_filled = int(20 * prob)
             bar = "█" * bar_filled + "░" * (20 - bar_filled)
-            emotion_name = name_map.get(emotion, emotion.upper()).ljust(8)
-            print("│  " + f"{emotion_name} [{bar}] {percentage:>3}%".ljust(66) + "│")
+            display_name = emotion_name(emotion).ljust(8)
+            print("│  " + f"{display_name} [{bar}] {percentage:>3}%".ljust(66) + "│")
         
         print("└" + "─" * 68 + "┘")
     
@@ -112,98 +101,54 @@ class TerminalEmotionDisplay:
         connection_text = "Connected" if connected else "Disconnected"
         
         print("\n" + "╔" + "═" * 68 + "╗")
-        print("║" + f"  Status: {status_icon} {connection_text} | Buffer: {buffer_size}/{BUFFER_SIZE}".ljust(68) + "║")
+        print("║" + f"  Status: {status_icon} {connection_text} | Buffer: {buffer_size}/{BUFFER_SIZE}"
+              f" | Update every {self.scheduler.hop_s:.1f}s".ljust(68) + "║")
         print("║" + f"  Time: {datetime.now().strftime('%H:%M:%S')}".ljust(68) + "║")
         print("║" + "  Press Ctrl+C to stop".ljust(68) + "║")
         print("╚" + "═" * 68 + "╝\n")
     
-    def audio_callback(self, indata, frames, time_info, status):
-        """Audio callback to capture microphone data"""
-        if status:
-            print(f"⚠️  Audio status: {status}")
-        
-        audio_data = indata[:, 0].astype(np.float32)
-        self.audio_buffer.extend(audio_data)
-    
-    def send_audio_chunk(self, audio_chunk):
-        """Send audio to backend and get emotion"""
-        try:
-            import io
-            import soundfile as sf
-            
-            buffer = io.BytesIO()
-            sf.write(buffer, audio_chunk, SAMPLE_RATE, format='WAV')
-            buffer.seek(0)
-            
-            files = {'file': ('audio.wav', buffer, 'audio/wav')}
-            response = requests.post(API_URL, files=files, timeout=10)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"❌ API Error: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return None
-    
+    def on_window(self, audio_chunk):
+        """Called every REFRESH_INTERVAL from the capture thread; the scheduler may hold it back"""
+        self.pipeline.submit(audio_chunk, SAMPLE_RATE)
+
+    def on_result(self, emotion_data, _):
+        with self.lock:
+            self.connected = True
+            self.current_emotion = emotion_data
+            self.history.append(emotion_data)
+
+    def on_error(self, e, _):
+        with self.lock:
+            self.connected = False
+
     def run(self):
         """Start the terminal display"""
-        self.is_recording = True
-        
         try:
             self.print_header()
             print("\n🎙️  Initializing microphone...\n")
             
             # List devices
             print("Available audio devices:")
-            devices = sd.query_devices()
-            for i, device in enumerate(devices):
-                if device['max_input_channels'] > 0:
-                    default = "[DEFAULT]" if i == sd.default.device[0] else ""
-                    print(f"  [{i}] {device['name']} {default}")
+            for i, name, _, is_default in list_input_devices():
+                default = "[DEFAULT]" if is_default else ""
+                print(f"  [{i}] {name} {default}")
             print()
-            
-            with sd.InputStream(
-                channels=CHANNELS,
-                samplerate=SAMPLE_RATE,
-                callback=self.audio_callback,
-                blocksize=int(SAMPLE_RATE * CHUNK_DURATION)
-            ):
+
+            with self.capture:
                 print("✅ Microphone active!\n")
                 self.print_status(connected=True)
-                
-                current_emotion = None
-                last_update = time.time()
-                
-                while self.is_recording:
-                    # Process audio every 2 seconds
-                    if len(self.audio_buffer) >= BUFFER_SIZE:
-                        audio_chunk = np.array(list(self.audio_buffer), dtype=np.float32)
-                        
-                        # Clear screen and display
-                        self.clear_screen()
-                        self.print_header()
-                        
-                        # Send to backend
-                        print("\n⏳ Processing audio...\n")
-                        emotion_data = self.send_audio_chunk(audio_chunk)
-                        
-                        if emotion_data:
-                            current_emotion = emotion_data
-                            self.history.append(emotion_data)
-                        
-                        last_update = time.time()
-                    
-                    # Display current emotion
+
+                # Requests run in the background; this loop only redraws
+                while True:
+                    with self.lock:
+                        current_emotion, connected = self.current_emotion, self.connected
                     self.clear_screen()
                     self.print_header()
                     self.print_emotion_box(current_emotion)
-                    self.print_status(connected=True, buffer_size=len(self.audio_buffer))
-                    
-                    time.sleep(0.5)
-        
+                    self.print_status(connected=connected, buffer_size=self.capture.buffered)
+
+                    time.sleep(REFRESH_INTERVAL)
+
         except KeyboardInterrupt:
             print("\n\n" + "█" * 70)
             print("║" + "  👋 Thanks for using Emotion Detection!".center(68) + "║")
@@ -214,7 +159,8 @@ class TerminalEmotionDisplay:
             print(f"Make sure the backend API is running on port 8000")
         
         finally:
-            self.is_recording = False
+            self.pipeline.close(wait=False)
+            self.client.close()
 
 if __name__ == "__main__":
     display = TerminalEmotionDisplay()
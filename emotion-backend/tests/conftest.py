@@ -0,0 +1,108 @@
+"""Fake model pipelines so the API can be exercised without model weights."""
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
+from fastapi.testclient import TestClient
+
+AUDIO_LABELS = ["neu", "hap", "ang", "sad"]
+TEXT_LABELS = ["anger", "joy", "neutral", "sadness"]
+
+
+class FakeTextPipeline:
+    """Keyword classifier; any batch containing "boom" raises, like a bad input would."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        texts = list(texts)
+        self.calls.append(texts)
+        if any("boom" in t for t in texts):
+            raise ValueError("boom")
+        return [self.scores(t) for t in texts]
+
+    @staticmethod
+    def scores(text):
+        top = ("joy" if "happy" in text else "anger" if "angry" in text
+               else "sadness" if "sad" in text else "neutral")
+        return [{"label": label, "score": 0.7 if label == top else 0.1} for label in TEXT_LABELS]
+
+
+class FakeAudioPipeline:
+    """Always 'hap'; any batch holding a clip that peaks at full scale raises."""
+
+    id2label = dict(enumerate(AUDIO_LABELS))
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, batch_size=None):
+        inputs = list(inputs)
+        self.calls.append([len(x["array"]) for x in inputs])
+        if any(np.max(np.abs(x["array"])) > 0.99 for x in inputs):
+            raise ValueError("clipped")
+        return [[{"label": label, "score": 0.7 if label == "hap" else 0.1} for label in AUDIO_LABELS]
+                for _ in inputs]
+
+
+def tone(seconds=1.0, sr=16000, amplitude=0.3, freq=220.0):
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    return (amplitude * np.sin(2 * np.pi * freq * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)) / 1.5).astype(np.float32)
+
+
+def wav_bytes(wave, sr=16000):
+    buf = io.BytesIO()
+    sf.write(buf, wave, sr, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """``app.server`` with fake models installed, marked ready and with an empty text cache."""
+    from app import server as srv
+    from app.cache import MemoryCache
+
+    text, audio = FakeTextPipeline(), FakeAudioPipeline()
+    monkeypatch.setattr(srv, "text_clf", text)
+    monkeypatch.setattr(srv, "clf", audio)
+    monkeypatch.setattr(srv, "_no_speech", None)
+    monkeypatch.setattr(srv, "text_cache", MemoryCache())
+    monkeypatch.setattr(srv.startup, "status", "ready")
+    # The pool is module-level and outlives each TestClient's startup/shutdown
+    monkeypatch.setattr(srv.inference, "shutdown", lambda wait=True: None)
+    return SimpleNamespace(module=srv, text=text, audio=audio)
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.module.app) as c:
+        yield c
+
+
+def tiny_wav2vec2(seed=0, feat_extract_norm="layer", do_normalize=False):
+    """Randomly initialised wav2vec2 classifier small enough to build in a test; nothing is downloaded."""
+    import torch
+    from transformers import Wav2Vec2Config, Wav2Vec2FeatureExtractor, Wav2Vec2ForSequenceClassification
+
+    torch.manual_seed(seed)
+    config = Wav2Vec2Config(
+        hidden_size=32, num_hidden_layers=1, num_attention_heads=2, intermediate_size=37,
+        conv_dim=(16,) * 7, feat_extract_norm=feat_extract_norm, classifier_proj_size=8,
+        num_conv_pos_embeddings=16, num_conv_pos_embedding_groups=2,
+        id2label=dict(enumerate(AUDIO_LABELS)), label2id={l: i for i, l in enumerate(AUDIO_LABELS)},
+    )
+    return Wav2Vec2ForSequenceClassification(config).eval(), Wav2Vec2FeatureExtractor(do_normalize=do_normalize)
+
+
+@pytest.fixture(scope="session")
+def tiny_audio_model_dir(tmp_path_factory):
+    """``tiny_wav2vec2`` saved like a hub checkpoint, for loaders that take a model id."""
+    pytest.importorskip("transformers")
+    model, extractor = tiny_wav2vec2()
+    path = tmp_path_factory.mktemp("tiny-audio-model")
+    model.save_pretrained(path)
+    extractor.save_pretrained(path)
+    return str(path)
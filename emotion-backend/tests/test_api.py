@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.batching import BucketedBatcher
+from app.config import AUDIO_BATCH_MAX_SIZE, TEXT_BATCH_MAX_SIZE
+from conftest import tiny_wav2vec2, tone, wav_bytes
+
+
+def test_text_batch_keeps_good_items_next_to_a_failing_one(client, server):
+    r = client.post("/predict-text/batch", json={"texts": ["so happy", "boom", "so sad", "  "]})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert results[0]["result"]["label"] == "joy" and results[0]["error"] is None
+    assert results[1]["result"] is None and "boom" in results[1]["error"]
+    assert results[2]["result"]["label"] == "sadness"
+    assert results[3]["error"] == "Empty text"
+
+
+def test_text_batch_is_split_into_batcher_sized_chunks(client, server):
+    texts = [f"text number {i}" for i in range(2 * TEXT_BATCH_MAX_SIZE + 3)]
+    r = client.post("/predict-text/batch", json={"texts": texts})
+    assert r.status_code == 200 and all(item["result"] for item in r.json()["results"])
+    assert max(len(call) for call in server.text.calls) <= TEXT_BATCH_MAX_SIZE
+    assert sum(len(call) for call in server.text.calls) == len(texts)
+
+
+def test_text_batch_rejects_empty_and_oversized(client, server):
+    assert client.post("/predict-text/batch", json={"texts": []}).status_code == 400
+    too_many = ["hi"] * (server.module.BATCH_MAX_ITEMS + 1)
+    assert client.post("/predict-text/batch", json={"texts": too_many}).status_code == 413
+
+
+def test_audio_batch_keeps_good_clips_next_to_failing_ones(client, server):
+    good = wav_bytes(tone(1.0))
+    clipped = wav_bytes(tone(1.0, amplitude=1.5).clip(-1, 1))
+    files = [("files", ("a.wav", good)), ("files", ("b.wav", clipped)),
+             ("files", ("c.wav", good)), ("files", ("d.wav", b"not audio"))]
+    r = client.post("/predict/batch", files=files)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [item["name"] for item in results] == ["a.wav", "b.wav", "c.wav", "d.wav"]
+    assert results[0]["result"]["label"] == "hap" and results[2]["result"]["label"] == "hap"
+    assert "clipped" in results[1]["error"]
+    assert results[3]["result"] is None and results[3]["error"]
+
+
+def test_audio_batch_is_split_into_batcher_sized_chunks(client, server):
+    n = AUDIO_BATCH_MAX_SIZE + 2
+    files = [("files", (f"{i}.wav", wav_bytes(tone(1.0)))) for i in range(n)]
+    r = client.post("/predict/batch", files=files)
+    assert r.status_code == 200 and all(item["result"] for item in r.json()["results"])
+    assert max(len(call) for call in server.audio.calls) <= AUDIO_BATCH_MAX_SIZE
+
+
+def test_predict_wav_upload(client, server):
+    r = client.post("/predict", files={"file": ("clip.wav", wav_bytes(tone(1.0, sr=8000), sr=8000))})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["label"] == "hap" and abs(sum(body["probs"].values()) - 1) < 1e-3
+    assert server.audio.calls == [[16000]]  # resampled to SAMPLE_RATE before the model
+
+
+def test_concurrent_clips_batch_by_length(client, server, monkeypatch):
+    # A wide batching window so requests from the client threads reliably meet
+    batcher = BucketedBatcher(server.module.classify_waveforms, boundaries=[1, 5],
+                              length_fn=lambda w: len(w) / 16000, max_batch_size=8, max_wait_ms=300,
+                              name="audio", executor=server.module.inference)
+    monkeypatch.setattr(server.module, "audio_batcher", batcher)
+    clips = [wav_bytes(tone(0.8))] * 3 + [wav_bytes(tone(4.0))] * 3
+    with ThreadPoolExecutor(len(clips)) as pool:
+        responses = list(pool.map(lambda c: client.post("/predict", files={"file": ("c.wav", c)}), clips))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert sorted(sum(server.audio.calls, [])) == [12800] * 3 + [64000] * 3
+    assert all(len(set(call)) == 1 for call in server.audio.calls)  # short and long never share a pass
+    assert len(server.audio.calls) < len(clips)
+
+
+def raw_post(client, body, **headers):
+    headers = {"Content-Type": "application/octet-stream", **headers}
+    return client.post("/predict", content=body, headers=headers)
+
+
+def test_predict_raw_pcm(client, server):
+    stereo = np.repeat(tone(1.0, sr=8000)[:, None], 2, axis=1)
+    body = (stereo * 32767).astype("<i2").tobytes()
+    r = raw_post(client, body, **{"X-Sample-Rate": "8000", "X-Channels": "2"})
+    assert r.status_code == 200 and r.json()["label"] == "hap"
+    assert server.audio.calls == [[16000]]
+
+
+def test_predict_raw_float32_defaults_to_sample_rate(client, server):
+    r = raw_post(client, tone(0.5).astype("<f4").tobytes(), **{"X-Sample-Format": "float32"})
+    assert r.status_code == 200
+    assert server.audio.calls == [[8000]]
+
+
+def test_predict_raw_pcm_rejects_bad_input(client, server):
+    pcm = (tone(0.5) * 32767).astype("<i2").tobytes()
+    assert raw_post(client, b"").status_code == 400
+    assert raw_post(client, pcm[:-1]).status_code == 400  # half a sample
+    assert raw_post(client, pcm, **{"X-Sample-Format": "mulaw"}).status_code == 400
+    assert raw_post(client, pcm, **{"X-Sample-Rate": "fast"}).status_code == 400
+    assert raw_post(client, pcm, **{"X-Channels": "0"}).status_code == 400
+    assert server.audio.calls == []
+
+
+def test_batched_audio_matches_solo_for_mixed_lengths(server, monkeypatch):
+    pytest.importorskip("transformers")
+    from transformers import pipeline
+
+    net, extractor = tiny_wav2vec2()
+    monkeypatch.setattr(server.module, "clf", pipeline("audio-classification", model=net,
+                                                       feature_extractor=extractor, top_k=None))
+    rng = np.random.default_rng(0)
+    waves = [(0.1 * rng.standard_normal(n)).astype(np.float32) for n in (16000, 32000, 16000, 24000)]
+
+    def scores(result):
+        return {r["label"]: r["score"] for r in result}
+
+    batched = server.module.classify_waveforms(waves)
+    for wave, result in zip(waves, batched):
+        solo = scores(server.module.classify_waveforms([wave])[0])
+        assert all(abs(scores(result)[k] - solo[k]) < 1e-5 for k in solo)
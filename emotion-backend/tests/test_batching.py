@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from app.batching import BucketedBatcher, MicroBatcher
+
+
+def double_all(items):
+    return [2 * x for x in items]
+
+
+def test_concurrent_submits_coalesce_into_one_batch():
+    async def main():
+        batcher = MicroBatcher(double_all, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.close()
+        return results, batcher.stats.snapshot()
+
+    results, stats = asyncio.run(main())
+    assert results == [0, 2, 4, 6, 8]
+    assert stats["batches"] == 1 and stats["batch_sizes"] == {"5": 1}
+
+
+def test_batch_flushes_at_max_size():
+    async def main():
+        batcher = MicroBatcher(double_all, max_batch_size=2, max_wait_ms=1000)
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), 5)
+        await batcher.close()
+        return results, batcher.stats.snapshot()
+
+    results, stats = asyncio.run(main())
+    assert results == [0, 2, 4, 6]
+    assert stats["batch_sizes"] == {"2": 2}
+
+
+def test_bad_item_only_fails_its_own_caller():
+    calls = []
+
+    def fragile(items):
+        calls.append(list(items))
+        if "bad" in items:
+            raise ValueError("boom")
+        return [x.upper() for x in items]
+
+    async def main():
+        batcher = MicroBatcher(fragile, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(x) for x in ["a", "bad", "c"]), return_exceptions=True)
+        await batcher.close()
+        return results, batcher.stats.snapshot()
+
+    results, stats = asyncio.run(main())
+    assert results[0] == "A" and results[2] == "C"
+    assert isinstance(results[1], ValueError) and str(results[1]) == "boom"
+    assert calls[0] == ["a", "bad", "c"] and calls[1:] == [["a"], ["bad"], ["c"]]
+    assert stats["split_batches"] == 1
+
+
+def test_result_count_mismatch_fails_each_item_alone():
+    async def main():
+        batcher = MicroBatcher(lambda items: items[:1], max_batch_size=4, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        await batcher.close()
+        return results
+
+    # Run one at a time, a single-item batch returns one result each
+    assert asyncio.run(main()) == [0, 1, 2]
+
+
+def test_bucketed_batcher_groups_by_length():
+    seen = []
+    lock = threading.Lock()
+
+    def record(items):
+        with lock:
+            seen.append(sorted(items))
+        return [len(x) for x in items]
+
+    async def main():
+        batcher = BucketedBatcher(record, boundaries=[2, 4], max_batch_size=8, max_wait_ms=50)
+        items = ["a", "bb", "ccc", "dddd", "eeeeeeee"]
+        assert [batcher.bucket_for(x) for x in items] == [0, 0, 1, 1, 2]
+        results = await asyncio.gather(*(batcher.submit(x) for x in items))
+        await batcher.close()
+        return results
+
+    assert asyncio.run(main()) == [1, 2, 3, 4, 8]
+    assert sorted(seen) == [["a", "bb"], ["ccc", "dddd"], ["eeeeeeee"]]
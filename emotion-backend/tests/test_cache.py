@@ -0,0 +1,89 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+from app.cache import MemoryCache, RedisCache, build_cache, cache_key, normalize_text
+
+
+def test_normalize_collapses_whitespace_but_keeps_case():
+    assert normalize_text("  hello \n  there\t") == "hello there"
+    assert cache_key("m", "hello  there ") == cache_key("m", "hello there")
+    assert len({cache_key("m", t) for t in ["HELLO", "Hello", "hello "]}) == 3
+    assert cache_key("m1", "hi") != cache_key("m2", "hi")
+    assert cache_key("m", "hi", "torch") != cache_key("m", "hi", "onnx-int8")
+
+
+def test_memory_cache_lru_eviction_by_entries():
+    async def main():
+        cache = MemoryCache(max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # a is now most recent
+        await cache.set("c", 3)
+        return cache, [await cache.get(k) for k in "abc"]
+
+    cache, values = asyncio.run(main())
+    assert values == [1, None, 3]
+    assert cache.stats.evictions == 1 and cache.stats.hits == 3 and cache.stats.misses == 1
+
+
+def test_memory_cache_byte_limit_and_ttl():
+    async def main():
+        cache = MemoryCache(max_entries=100, max_bytes=40)
+        await cache.set("big", "x" * 100)  # larger than the whole cache: not stored
+        await cache.set("k1", "v" * 10)
+        await cache.set("k2", "v" * 10)
+        await cache.set("k3", "v" * 10)  # pushes the total past 40 bytes
+        sizes = cache.snapshot()
+        expiring = MemoryCache(ttl_s=0.01)
+        await expiring.set("k", 1)
+        await asyncio.sleep(0.02)
+        return sizes, await cache.get("big"), await cache.get("k1"), await expiring.get("k"), expiring
+
+    sizes, big, first, expired, expiring = asyncio.run(main())
+    assert big is None and first is None
+    assert sizes["bytes"] <= 40 and sizes["entries"] == 2
+    assert expired is None and expiring.stats.expired == 1
+
+
+def test_build_cache():
+    assert build_cache("off", 1, 1, 0) is None
+    assert isinstance(build_cache("memory", 10, 1000, 0), MemoryCache)
+    with pytest.raises(ValueError):
+        build_cache("nope", 1, 1, 0)
+
+
+def test_predict_text_cache_is_case_sensitive(client, server):
+    for text in ["HELLO", "Hello", "hello ", "Hello"]:
+        assert client.post("/predict-text", json={"text": text}).status_code == 200
+    snapshot = server.module.text_cache.snapshot()
+    # "hello " is stripped before lookup, so only the repeated "Hello" hits
+    assert snapshot["hits"] == 1 and snapshot["misses"] == 3
+    assert sum(len(call) for call in server.text.calls) == 3
+
+
+class FakeRedis:
+    def __init__(self):
+        self.sets = []
+
+    async def set(self, key, value, px=None):
+        self.sets.append((key, px))
+
+
+@pytest.mark.parametrize("ttl_s,px", [(0, None), (0.25, 250), (0.0001, 1), (30, 30000)])
+def test_redis_cache_ttl_in_milliseconds(monkeypatch, ttl_s, px):
+    client = FakeRedis()
+    redis_asyncio = types.SimpleNamespace(from_url=lambda url: client)
+    monkeypatch.setitem(sys.modules, "redis", types.SimpleNamespace(asyncio=redis_asyncio))
+    monkeypatch.setitem(sys.modules, "redis.asyncio", redis_asyncio)
+    asyncio.run(RedisCache(ttl_s=ttl_s).set("k", {"label": "joy"}))
+    assert client.sets == [("emotion:text:k", px)]
+
+
+def test_backend_switch_does_not_reuse_cached_results(client, server, monkeypatch):
+    client.post("/predict-text", json={"text": "so happy"})
+    monkeypatch.setattr(server.module, "INFERENCE_BACKEND", "onnx-int8")
+    client.post("/predict-text", json={"text": "so happy"})
+    assert server.module.text_cache.stats.hits == 0 and len(server.text.calls) == 2
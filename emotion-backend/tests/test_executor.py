@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.executor import InferenceExecutor, QueueFullError
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_slot_rejects_beyond_max_pending():
+    async def main():
+        executor = InferenceExecutor(max_workers=1, max_pending=2)
+        async with executor.slot(), executor.slot():
+            assert executor.pending == 2
+            with pytest.raises(QueueFullError):
+                async with executor.slot():
+                    pass
+        async with executor.slot():
+            pass
+        executor.shutdown()
+        return executor.snapshot()
+
+    snapshot = asyncio.run(main())
+    assert snapshot["pending"] == 0 and snapshot["rejected"] == 1
+
+
+def test_run_uses_the_pool_and_carries_context():
+    async def main():
+        executor = InferenceExecutor(max_workers=1)
+        request_id.set("abc")
+        seen = await executor.run(lambda: (threading.current_thread().name, request_id.get()))
+        executor.shutdown()
+        return seen
+
+    thread, rid = asyncio.run(main())
+    assert thread.startswith("inference") and rid == "abc"
+
+
+def test_full_queue_answers_429_with_retry_after(client, server, monkeypatch):
+    monkeypatch.setattr(server.module.inference, "max_pending", 0)
+    r = client.post("/predict-text", json={"text": "so happy"})
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "1"
+    assert r.headers["x-queue-limit"] == "0"
+
+
+def test_responses_carry_queue_depth(client, server):
+    r = client.get("/live")
+    assert r.headers["x-queue-depth"] == "0"
+    assert r.headers["x-queue-limit"] == str(server.module.inference.max_pending)
+
+
+def test_event_loop_keeps_serving_while_a_model_runs(client, server, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    text = server.text
+
+    def slow_model(texts, batch_size=None):
+        started.set()
+        release.wait(5)
+        return text(texts, batch_size)
+
+    monkeypatch.setattr(server.module, "text_clf", slow_model)
+    with ThreadPoolExecutor(1) as pool:
+        pending = pool.submit(client.post, "/predict-text", json={"text": "so angry"})
+        assert started.wait(5)
+        live = client.get("/live")  # answered while inference is still running
+        depth = live.headers["x-queue-depth"]
+        release.set()
+        r = pending.result(5)
+    assert live.status_code == 200 and depth == "1"
+    assert r.json()["label"] == "anger"
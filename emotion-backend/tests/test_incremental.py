@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from app.incremental import IncrementalWav2Vec2, conv_geometry, supports_incremental  # noqa: E402
+from conftest import FakeAudioPipeline, tiny_wav2vec2, tone  # noqa: E402
+from starlette.websockets import WebSocketDisconnect  # noqa: E402
+
+WINDOW = 16000
+
+
+@pytest.fixture(scope="module")
+def model():
+    return tiny_wav2vec2()
+
+
+def full_window_scores(model, wave):
+    with torch.inference_mode():
+        probs = torch.softmax(model(torch.from_numpy(wave)[None]).logits[0], dim=-1).numpy()
+    return {model.config.id2label[i]: float(p) for i, p in enumerate(probs)}
+
+
+def covered_window(encoder, wave):
+    """The samples under the encoder's cached frames, ending at the last full frame."""
+    n_frames = (len(wave) - encoder.receptive) // encoder.stride + 1
+    start = (n_frames - encoder.window_frames) * encoder.stride
+    return wave[start:start + encoder.receptive + encoder.stride * (encoder.window_frames - 1)]
+
+
+def test_conv_geometry(model):
+    assert conv_geometry(model[0].config) == (400, 320)
+
+
+@pytest.mark.parametrize("chunk", [320, 5000, 11200])
+def test_matches_full_window_inference(model, chunk):
+    net, extractor = model
+    wave = (0.1 * np.random.default_rng(0).standard_normal(3 * WINDOW)).astype(np.float32)
+    encoder = IncrementalWav2Vec2(net, extractor, WINDOW)
+    for start in range(0, len(wave), chunk):
+        encoder.push(wave[start:start + chunk])
+
+    got = {r["label"]: r["score"] for r in encoder.classify()}
+    want = full_window_scores(net, covered_window(encoder, wave))
+    assert got.keys() == want.keys()
+    assert all(abs(got[k] - want[k]) < 1e-5 for k in want)
+
+
+def test_ready_once_a_window_is_encoded(model):
+    encoder = IncrementalWav2Vec2(*model, WINDOW)
+    assert encoder.push(np.zeros(399, dtype=np.float32)) == 0  # under one receptive field
+    assert not encoder.ready
+    encoder.push(np.zeros(WINDOW, dtype=np.float32))
+    assert encoder.ready
+    encoder.reset()
+    assert not encoder.ready
+    with pytest.raises(RuntimeError):
+        encoder.classify()
+
+
+def test_rejects_windows_shorter_than_the_receptive_field(model):
+    with pytest.raises(ValueError):
+        IncrementalWav2Vec2(*model, 399)
+
+
+def test_supports_incremental(model):
+    assert supports_incremental(*model)
+    assert not supports_incremental(FakeAudioPipeline())
+    # GroupNorm and input normalization see the whole window, so chunks don't add up
+    assert not supports_incremental(*tiny_wav2vec2(feat_extract_norm="group"))
+    assert not supports_incremental(*tiny_wav2vec2(do_normalize=True))
+
+
+def stream_pipeline(monkeypatch, server, **kwargs):
+    """Install a real transformers pipeline over ``tiny_wav2vec2(**kwargs)`` and count encoders built."""
+    from transformers import pipeline
+
+    srv = server.module
+    net, extractor = tiny_wav2vec2(**kwargs)
+    monkeypatch.setattr(srv, "clf", pipeline("audio-classification", model=net, feature_extractor=extractor,
+                                             top_k=None))
+    built = []
+
+    def counting(*args):
+        built.append(args)
+        return IncrementalWav2Vec2(*args)
+
+    monkeypatch.setattr(srv, "IncrementalWav2Vec2", counting)
+    return built
+
+
+@pytest.mark.parametrize("norm,incremental", [("layer", True), ("group", False)])
+def test_ws_stream_uses_incremental_only_when_exact(client, server, monkeypatch, norm, incremental):
+    built = stream_pipeline(monkeypatch, server, feat_extract_norm=norm)
+    with client.websocket_connect("/ws/stream?window=1&hop=1") as ws:
+        ws.send_bytes((tone(1.0) * 32767).astype("<i2").tobytes())
+        msg = ws.receive_json()
+    assert msg["type"] == "emotion"
+    assert bool(built) == incremental
+
+
+def test_ws_stream_reports_windows_below_the_receptive_field(client, server, monkeypatch):
+    monkeypatch.setattr(server.module, "MIN_WINDOW_S", 0.0)
+    stream_pipeline(monkeypatch, server)
+    with client.websocket_connect("/ws/stream?window=0.02") as ws:  # 320 samples < 400
+        msg = ws.receive_json()
+        assert msg["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1003
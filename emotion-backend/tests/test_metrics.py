@@ -0,0 +1,80 @@
+import re
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import Registry, ServerTimingMiddleware, stage
+
+
+def sample(text, name, **labels):
+    """Value of one series in Prometheus text output, or None."""
+    want = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = rf"^{re.escape(name)}{re.escape('{' + want + '}') if want else ''} (\S+)$"
+    m = re.search(pattern, text, re.M)
+    return float(m.group(1)) if m else None
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    h = registry.histogram("latency_seconds", "test", ["route"], buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 5.0):
+        h.observe(v, route="/x")
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert sample(text, "latency_seconds_bucket", route="/x", le="0.1") == 1
+    assert sample(text, "latency_seconds_bucket", route="/x", le="1.0") == 3
+    assert sample(text, "latency_seconds_bucket", route="/x", le="+Inf") == 4
+    assert sample(text, "latency_seconds_count", route="/x") == 4
+    assert sample(text, "latency_seconds_sum", route="/x") == 6.05
+
+
+def test_counter_gauge_and_callback():
+    registry = Registry()
+    c = registry.counter("hits_total", "test", ["kind"])
+    c.inc(kind="a")
+    c.inc(2, kind="a")
+    g = registry.gauge("in_progress", "test")
+    g.inc()
+    g.dec()
+    registry.callback("depth", "test", lambda: {("q",): 7}, ["queue"])
+    registry.callback("broken", "test", lambda: 1 / 0)
+    text = registry.render()
+    assert sample(text, "hits_total", kind="a") == 3
+    assert sample(text, "in_progress") == 0
+    assert sample(text, "depth", queue="q") == 7
+    assert "broken" not in text  # a failing callback is left out, not fatal
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter("odd_total", "test", ["v"]).inc(v='a"b\nc')
+    assert 'odd_total{v="a\\"b\\nc"} 1' in registry.render()
+
+
+def test_server_timing_header_lists_stages():
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        with stage("decode"):
+            pass
+        with stage("inference"):
+            pass
+        return {}
+
+    app.add_middleware(ServerTimingMiddleware, server_timing=True)
+    header = TestClient(app).get("/work").headers["server-timing"]
+    assert [part.split(";")[0] for part in header.split(", ")] == ["decode", "inference", "total"]
+
+
+def test_metrics_endpoint_counts_requests_and_stages(client, server):
+    client.post("/predict-text", json={"text": "so happy"})
+    client.get("/no-such-route")
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert sample(text, "emotion_requests_total", route="/predict-text", status="200") >= 1
+    assert sample(text, "emotion_requests_total", route="other", status="404") >= 1
+    assert sample(text, "emotion_stage_seconds_count", stage="inference") >= 1
+    assert sample(text, "emotion_ready") == 1
+    assert sample(text, "emotion_text_cache_misses_total") == 1
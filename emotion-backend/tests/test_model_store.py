@@ -0,0 +1,84 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("safetensors")
+
+from app import model_store  # noqa: E402
+from app.model_store import WEIGHTS_FILE, is_pinned, load_model, load_pipeline, mmap_state_dict, pin, verify  # noqa: E402
+from conftest import tiny_wav2vec2  # noqa: E402
+
+TASK = "audio-classification"
+
+
+@pytest.fixture
+def source(tiny_audio_model_dir, tmp_path, monkeypatch):
+    """A private copy of the tiny model and an empty store, so tests can delete and tamper."""
+    monkeypatch.setattr(model_store, "MODEL_STORE_DIR", str(tmp_path / "store"))
+    return str(shutil.copytree(tiny_audio_model_dir, tmp_path / "source"))
+
+
+def logits(model, wave):
+    with torch.inference_mode():
+        return model(torch.from_numpy(wave)[None]).logits[0].numpy()
+
+
+def test_pin_then_load_offline_from_the_mapping(source):
+    assert not is_pinned(source)
+    out = pin(TASK, source)
+    assert is_pinned(source) and verify(source) == []
+    shutil.rmtree(source)  # the pinned copy is all that is needed from here on
+
+    model = load_model(TASK, source)
+    wave = (0.1 * np.random.default_rng(0).standard_normal(16000)).astype(np.float32)
+    np.testing.assert_allclose(logits(model, wave), logits(tiny_wav2vec2()[0], wave), atol=1e-5)
+
+    # Parameters are views into the shared read-only mapping, not private copies
+    spans = [(a, a + len(mm)) for mm in model_store._mappings
+             for a in [np.frombuffer(mm, dtype=np.uint8).ctypes.data]]
+    params = [p for p in model.parameters() if p.numel()]
+    assert all(any(lo <= p.data_ptr() < hi for lo, hi in spans) for p in params)
+
+
+def test_mmap_state_dict_matches_safetensors(source):
+    from safetensors.torch import load_file
+
+    path = os.path.join(pin(TASK, source), WEIGHTS_FILE)
+    mapped, loaded = mmap_state_dict(path), load_file(path)
+    assert mapped.keys() == loaded.keys()
+    assert all(torch.equal(mapped[k], loaded[k]) for k in loaded)
+
+
+def test_load_pipeline_from_the_store(source):
+    pin(TASK, source)
+    clf = load_pipeline(TASK, source, top_k=None)
+    result = clf({"array": np.zeros(16000, dtype=np.float32), "sampling_rate": 16000})
+    assert sorted(r["label"] for r in result) == ["ang", "hap", "neu", "sad"]
+
+
+def test_load_without_mmap(source, monkeypatch):
+    pin(TASK, source)
+    monkeypatch.setattr(model_store, "MODEL_STORE_MMAP", False)
+    wave = np.zeros(8000, dtype=np.float32)
+    np.testing.assert_allclose(logits(load_model(TASK, source), wave), logits(tiny_wav2vec2()[0], wave), atol=1e-5)
+
+
+def test_verify_reports_changed_files(source):
+    out = pin(TASK, source)
+    with open(os.path.join(out, "config.json"), "a") as fh:
+        fh.write(" ")
+    os.remove(os.path.join(out, "preprocessor_config.json"))
+    assert sorted(verify(source)) == ["config.json", "preprocessor_config.json"]
+
+
+def test_pin_is_idempotent_unless_forced(source):
+    out = pin(TASK, source)
+    weights = os.path.join(out, WEIGHTS_FILE)
+    stamp = os.stat(weights).st_mtime_ns
+    pin(TASK, source)
+    assert os.stat(weights).st_mtime_ns == stamp
+    pin(TASK, source, force=True)
+    assert verify(source) == []
@@ -0,0 +1,78 @@
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from app import onnx_backend  # noqa: E402
+from app.onnx_backend import INT8_FILE, MODEL_FILE, OnnxAudioClassifier, export  # noqa: E402
+from conftest import tiny_wav2vec2  # noqa: E402
+
+TASK = "audio-classification"
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(onnx_backend, "ONNX_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_export_matches_torch_and_leaves_no_staging(cache_dir, tiny_audio_model_dir):
+    out = export(TASK, tiny_audio_model_dir, quantize=True)
+    assert os.path.exists(os.path.join(out, MODEL_FILE)) and os.path.exists(os.path.join(out, INT8_FILE))
+    assert not [f for f in os.listdir(out) if f.startswith(".export-") or "noshapes" in f]
+
+    wave = (0.1 * np.random.default_rng(1).standard_normal(16000)).astype(np.float32)
+    got = OnnxAudioClassifier(out)({"array": wave, "sampling_rate": 16000})
+    net, _ = tiny_wav2vec2()
+    with torch.inference_mode():
+        want = torch.softmax(net(torch.from_numpy(wave)[None]).logits[0], dim=-1).numpy()
+    for r in got:
+        assert abs(r["score"] - want[net.config.label2id[r["label"]]]) < 1e-4
+    assert len(OnnxAudioClassifier(out, quantized=True)({"array": wave, "sampling_rate": 16000})) == 4
+
+
+def test_interrupted_export_is_redone(cache_dir, tiny_audio_model_dir, monkeypatch):
+    real_export = torch.onnx.export
+
+    def killed(model, args, path, **kwargs):
+        with open(path, "wb") as fh:
+            fh.write(b"truncated")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(torch.onnx, "export", killed)
+    with pytest.raises(KeyboardInterrupt):
+        export(TASK, tiny_audio_model_dir)
+    out = onnx_backend.export_dir(tiny_audio_model_dir)
+    assert not os.path.exists(os.path.join(out, MODEL_FILE))
+
+    monkeypatch.setattr(torch.onnx, "export", real_export)
+    export(TASK, tiny_audio_model_dir)
+    OnnxAudioClassifier(out)  # loads: the graph is complete
+
+
+def test_exports_run_one_at_a_time(cache_dir, tiny_audio_model_dir, tmp_path, monkeypatch):
+    active, overlap = [0], []
+
+    def tracked(model, args, path, **kwargs):
+        active[0] += 1
+        overlap.append(active[0])
+        time.sleep(0.2)
+        with open(path, "wb") as fh:
+            fh.write(b"graph")
+        active[0] -= 1
+
+    monkeypatch.setattr(torch.onnx, "export", tracked)
+    models = [tiny_audio_model_dir, shutil.copytree(tiny_audio_model_dir, tmp_path / "second")]
+    threads = [threading.Thread(target=export, args=(TASK, str(m))) for m in models]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert overlap == [1, 1]
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+from emotion_client import AsyncPipeline, Pipeline
+
+
+def test_raising_callback_does_not_stall_the_pipeline():
+    gate = threading.Event()
+    seen = []
+
+    def fn(i):
+        if i == 0:
+            gate.wait(2)
+        return i
+
+    def on_result(result, _):
+        seen.append(result)
+        raise RuntimeError("display crashed")
+
+    pipeline = Pipeline(fn, max_in_flight=1, on_result=on_result)
+    pipeline.submit(0)
+    pipeline.submit(1)  # waits for the slot held by 0
+    gate.set()
+    for i in range(2, 6):
+        deadline = time.monotonic() + 2
+        while pipeline.in_flight and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert pipeline.in_flight == 0, "a raising callback leaked an in-flight slot"
+        pipeline.submit(i)
+    pipeline.close()
+    assert seen == [0, 1, 2, 3, 4, 5]
+    assert pipeline.in_flight == 0 and pipeline.stats.callback_errors == 6
+
+
+def test_raising_error_callback_is_counted():
+    def fn(_):
+        raise ValueError("server down")
+
+    def on_error(exc, _):
+        raise RuntimeError("handler bug")
+
+    pipeline = Pipeline(fn, max_in_flight=2, on_error=on_error)
+    for i in range(3):
+        pipeline.submit(i)
+    pipeline.close()
+    assert pipeline.stats.failed == pipeline.stats.callback_errors == pipeline.stats.submitted
+    assert pipeline.in_flight == 0
+
+
+def test_async_pipeline_survives_raising_callbacks():
+    seen = []
+
+    async def fn(i):
+        await asyncio.sleep(0.01)
+        return i
+
+    async def on_result(result, _):
+        seen.append(result)
+        raise RuntimeError("display crashed")
+
+    async def main():
+        pipeline = AsyncPipeline(fn, max_in_flight=1, on_result=on_result)
+        for i in range(3):
+            pipeline.submit(i)  # 0 runs, 1 is superseded by 2
+        await pipeline.drain()
+        pipeline.submit(3)
+        await pipeline.drain()
+        return pipeline
+
+    pipeline = asyncio.run(main())
+    assert seen == [0, 2, 3] and pipeline.stats.callback_errors == 3 and pipeline.in_flight == 0
@@ -0,0 +1,74 @@
+import gc
+import os
+import signal
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.prefork import memory_report, process_memory
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+
+
+def test_process_memory_of_this_process():
+    mem = process_memory(os.getpid())
+    assert mem["pid"] == os.getpid()
+    assert mem["rss_mib"] > 0
+    assert mem["pss_mib"] <= mem["rss_mib"]
+
+
+def test_memory_report_totals_and_vanished_pids():
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)  # gone: reports zeros instead of failing
+    report = memory_report([os.getpid(), pid])
+    assert report["processes"][1]["rss_mib"] == 0
+    assert report["total_rss_mib"] == report["processes"][0]["rss_mib"]
+    assert report["total_pss_mib"] == report["processes"][0]["pss_mib"]
+
+
+
+def test_worker_forked_after_warm_up_can_still_infer():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from transformers import pipeline
+
+    from app.executor import configure_torch_threads
+    from app.prefork import _prepare_master
+    from conftest import tiny_wav2vec2, tone
+
+    net, extractor = tiny_wav2vec2()
+    clf = pipeline("audio-classification", model=net, feature_extractor=extractor, top_k=None)
+    server = SimpleNamespace(TORCH_INTRA_OP_THREADS=4,
+                             load_and_warm_up=lambda: clf({"array": tone(1.0), "sampling_rate": 16000}))
+    threads = torch.get_num_threads()
+    try:
+        configure_torch_threads(max(2, threads))  # torch's default on any multi-core box
+        _prepare_master(server)
+        assert server.TORCH_INTRA_OP_THREADS == 1 and torch.get_num_threads() == 1
+        pid = os.fork()
+        if pid == 0:
+            ok = False
+            try:
+                configure_torch_threads(2)  # workers still get their own multi-threaded pool
+                ok = len(clf({"array": tone(1.0), "sampling_rate": 16000})) == 4
+            finally:
+                os._exit(0 if ok else 1)
+    finally:
+        gc.unfreeze()
+        configure_torch_threads(threads)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        time.sleep(0.05)
+    else:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        pytest.fail("forked worker hung in inference")
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.resample import ResamplePlan, StreamingResampler, plan, resample
+
+RATES = [(8000, 16000), (48000, 16000), (44100, 16000), (22050, 16000), (16000, 8000)]
+
+
+def noise(n, seed=0):
+    return np.random.default_rng(seed).standard_normal(n).astype(np.float32) * 0.1
+
+
+@pytest.mark.parametrize("orig,target", RATES)
+def test_output_length(orig, target):
+    for n in (0, 1, orig // 3, orig):
+        assert resample(noise(n), orig, target).shape == (-(-n * target // orig),)
+
+
+@pytest.mark.parametrize("orig,target", RATES)
+def test_tone_survives_resampling(orig, target):
+    freq = 440.0
+    t_in = np.arange(orig) / orig
+    y = resample(np.sin(2 * np.pi * freq * t_in).astype(np.float32), orig, target)
+    t_out = np.arange(len(y)) / target
+    inner = slice(target // 10, -target // 10)  # away from the zero-padded edges
+    assert np.max(np.abs(y[inner] - np.sin(2 * np.pi * freq * t_out[inner]))) < 1e-2
+
+
+def test_content_above_the_new_nyquist_is_removed():
+    t = np.arange(48000) / 48000
+    y = resample(np.sin(2 * np.pi * 12000 * t).astype(np.float32), 48000, 16000)
+    assert np.sqrt(np.mean(y[1600:-1600] ** 2)) < 1e-3
+
+
+@pytest.mark.parametrize("orig,target", RATES)
+@pytest.mark.parametrize("chunk", [1, 160, 1023, 4800])
+def test_streaming_matches_one_shot(orig, target, chunk):
+    x = noise(orig // 2 + 37)
+    stream = StreamingResampler(orig, target)
+    parts = [stream.process(x[i:i + chunk]) for i in range(0, len(x), chunk)]
+    parts.append(stream.flush())
+    np.testing.assert_allclose(np.concatenate(parts), resample(x, orig, target), atol=1e-5)
+
+
+def test_streaming_channels_and_reset():
+    x = np.stack([noise(4410, seed=1), noise(4410, seed=2)])
+    stream = StreamingResampler(44100, 16000, channels=2)
+    first = np.concatenate([stream.process(x[:, :1000]), stream.process(x[:, 1000:]), stream.flush()], axis=-1)
+    np.testing.assert_allclose(first, resample(x, 44100, 16000), atol=1e-5)
+    stream.reset()
+    again = np.concatenate([stream.process(x), stream.flush()], axis=-1)
+    np.testing.assert_allclose(again, first, atol=1e-5)
+
+
+def test_batch_axes_match_rows():
+    x = np.stack([noise(3000, seed=s) for s in range(3)])
+    batched = resample(x, 48000, 16000)
+    for row, out in zip(x, batched):
+        np.testing.assert_allclose(out, resample(row, 48000, 16000), atol=1e-6)
+
+
+def test_same_rate_passes_through():
+    x = noise(100)
+    assert resample(x, 16000, 16000) is x
+    stream = StreamingResampler(16000, 16000)
+    assert stream.process(x) is x and stream.flush().size == 0
+
+
+def test_plans_are_cached_and_validated():
+    assert plan(44100, 16000) is plan(44100, 16000)
+    p = plan(44100, 16000)
+    assert (p.up, p.down) == (160, 441)
+    with pytest.raises(ValueError):
+        ResamplePlan(0, 16000)
@@ -0,0 +1,130 @@
+import threading
+
+import numpy as np
+import pytest
+
+from emotion_client import SampleRingBuffer, WindowCursor, WindowedCapture
+
+
+def ramp(start, n):
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+def test_write_wraps_and_latest_is_contiguous_view():
+    ring = SampleRingBuffer(10)
+    for i in range(0, 37, 3):
+        ring.write(ramp(i, 3))
+    assert ring.written == 39 and len(ring) == 10 and ring.oldest == 29
+    view = ring.latest(10)
+    np.testing.assert_array_equal(view, ramp(29, 10))
+    assert view.base is not None and not view.flags.writeable
+    with pytest.raises(ValueError):
+        view[0] = 1.0
+
+
+def test_write_longer_than_capacity_keeps_newest():
+    ring = SampleRingBuffer(8)
+    ring.write(ramp(0, 5))
+    assert ring.write(ramp(5, 20)) == 20
+    assert ring.written == 25
+    np.testing.assert_array_equal(ring.latest(8), ramp(17, 8))
+
+
+def test_view_bounds():
+    ring = SampleRingBuffer(8)
+    ring.write(ramp(0, 12))
+    np.testing.assert_array_equal(ring.view(4, 8), ramp(4, 8))
+    with pytest.raises(IndexError):
+        ring.view(3, 4)   # overwritten
+    with pytest.raises(IndexError):
+        ring.view(10, 4)  # not written yet
+
+
+def test_intact_detects_overwrite():
+    ring = SampleRingBuffer(8)
+    ring.write(ramp(0, 6))
+    assert ring.intact(2)
+    ring.write(ramp(6, 4))  # reaches sample 9 < 2 + 8
+    assert ring.intact(2)
+    ring.write(ramp(10, 1))  # sample 10 lands on 2's slot
+    assert not ring.intact(2)
+
+
+def test_cursor_every_hop():
+    ring = SampleRingBuffer(16)
+    cursor = WindowCursor(ring, window=6, hop=2)
+    starts = []
+    for block in range(0, 20, 1):
+        ring.write(ramp(block, 1))
+        w = cursor.next()
+        while w is not None:
+            start, view = w
+            np.testing.assert_array_equal(view, ramp(start, 6))
+            starts.append(start)
+            w = cursor.next()
+    assert starts == list(range(0, 15, 2))
+    assert cursor.skipped == 0
+
+
+def test_cursor_newest_skips_superseded_windows():
+    ring = SampleRingBuffer(32)
+    cursor = WindowCursor(ring, window=8, hop=4)
+    ring.write(ramp(0, 21))  # windows at 0, 4, 8, 12 complete
+    start, view = cursor.next(newest=True)
+    assert start == 12 and cursor.skipped == 3
+    np.testing.assert_array_equal(view, ramp(12, 8))
+    assert cursor.next() is None
+
+
+def test_cursor_recovers_after_being_lapped():
+    ring = SampleRingBuffer(10)
+    cursor = WindowCursor(ring, window=4, hop=2)
+    ring.write(ramp(0, 30))  # oldest held sample is 20
+    start, view = cursor.next()
+    assert start == 20
+    np.testing.assert_array_equal(view, ramp(20, 4))
+
+
+def test_cursor_rejects_window_larger_than_ring():
+    with pytest.raises(ValueError):
+        WindowCursor(SampleRingBuffer(4), window=8, hop=2)
+
+
+def test_single_producer_single_consumer_threads():
+    ring = SampleRingBuffer(4096)
+    cursor = WindowCursor(ring, window=1024, hop=256)
+    total, block = 200_000, 160
+    done = threading.Event()
+    bad = []
+
+    def producer():
+        for i in range(0, total, block):
+            ring.write(ramp(i, block))
+        done.set()
+
+    t = threading.Thread(target=producer)
+    t.start()
+    seen = 0
+    while not done.is_set() or cursor.due:
+        w = cursor.next()
+        if w is None:
+            continue
+        start, view = w
+        first, last = float(view[0]), float(view[-1])
+        if ring.intact(start) and (first != start or last != start + 1023):
+            bad.append(start)
+        seen += 1
+    t.join()
+    assert not bad
+    assert seen + cursor.skipped == (total - 1024) // 256 + 1
+
+
+def test_windowed_capture_feed_without_microphone():
+    got = []
+    capture = WindowedCapture(got.append, sample_rate=100, window_s=1.0, hop_s=0.25, block_s=0.1)
+    for i in range(0, 300, 10):
+        capture.feed(ramp(i, 10))
+    starts = [int(w[0]) for w in got]
+    assert starts == list(range(0, 201, 25))
+    assert all(len(w) == 100 and w.flags.writeable for w in got)
+    assert capture.buffered == 100
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from emotion_client import AdaptiveScheduler, Pipeline, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # already past
+
+
+def test_hop_tracks_round_trip_and_queue_pressure():
+    s = AdaptiveScheduler(0.5, max_in_flight=2, max_hop_s=10.0)
+    assert s.hop_s == 0.5
+    for _ in range(20):
+        s.observe(3.2, 200, {})
+    assert abs(s.hop_s - 3.2 / (2 * 0.8)) < 0.05
+    s.observe(3.2, 200, {"x-queue-depth": "32", "x-queue-limit": "64"})
+    assert s.hop_s > 2 * 3.2 / (2 * 0.8)
+    assert AdaptiveScheduler(0.5, max_hop_s=1.0).hop_s <= 1.0
+
+
+def test_retry_after_pauses_and_backoff_decays():
+    s = AdaptiveScheduler(0.1)
+    s.observe(0.01, 429, {"retry-after": "1"})
+    now = time.monotonic()
+    assert not s.admit(now)
+    assert s.reserve(now) >= 0.9
+    assert s.backoff == 2.0
+    for _ in range(10):
+        s.observe(0.01, 200, {})
+    assert s.backoff == 1.0
+
+
+def test_admit_spaces_sends_by_hop():
+    s = AdaptiveScheduler(1.0)
+    assert s.admit(100.0)
+    assert not s.admit(100.5)
+    assert s.admit(101.0)
+    assert s.throttled == 1
+
+
+def test_pipeline_sends_newest_window_when_a_slot_frees():
+    gate = threading.Event()
+    seen = []
+
+    def fn(i):
+        if i == 0:
+            gate.wait(2)
+        return i
+
+    done = threading.Event()
+    pipeline = Pipeline(fn, max_in_flight=1, on_result=lambda r, _: (seen.append(r), r == 3 and done.set()))
+    for i in range(4):
+        pipeline.submit(i)
+    gate.set()
+    assert done.wait(2)
+    pipeline.close()
+    assert seen == [0, 3]
+    assert pipeline.stats.superseded == 2 and pipeline.stats.submitted == 2
+
+
+def test_results_stay_current_under_a_slow_server():
+    # Windows every 10 ms, 50 ms server: sending all of them would queue without bound
+    ages = []
+    s = AdaptiveScheduler(0.01, max_in_flight=2)
+
+    def fn(sent):
+        time.sleep(0.05)
+        s.observe(0.05, 200, {})
+        return sent
+
+    pipeline = Pipeline(fn, max_in_flight=2, scheduler=s, on_result=lambda sent, _: ages.append(time.monotonic() - sent))
+    for _ in range(60):
+        pipeline.submit(time.monotonic())
+        time.sleep(0.01)
+    pipeline.close()
+    assert ages and max(ages[-5:]) < 0.2
+    assert s.hop_s > 0.01
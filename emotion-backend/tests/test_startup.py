@@ -0,0 +1,86 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.startup import StartupState, warm_start
+
+
+def slow(seconds, log=None, name=None):
+    def fn():
+        time.sleep(seconds)
+        if log is not None:
+            log.append(name)
+    return fn
+
+
+def test_warm_start_loads_models_in_parallel():
+    state, log = StartupState(), []
+    models = {"text": (slow(0.2), slow(0, log, "text")), "audio": (slow(0.2), slow(0, log, "audio"))}
+    started = time.perf_counter()
+    warm_start(state, lambda: None, models, parallel=True)
+    assert time.perf_counter() - started < 0.35
+    assert state.ready and sorted(log) == ["audio", "text"]
+    assert {"import_backend", "load_text", "load_audio", "warmup_text", "warmup_audio", "total",
+            "ready_after_start"} <= set(state.timings)
+
+
+def test_warm_start_without_warmup():
+    state, log = StartupState(), []
+    warm_start(state, lambda: None, {"text": (lambda: None, slow(0, log, "text"))}, warmup=False)
+    assert state.ready and log == [] and "warmup_text" not in state.timings
+
+
+def test_warm_start_failure_marks_failed():
+    state = StartupState()
+
+    def broken():
+        raise OSError("no weights")
+
+    with pytest.raises(OSError):
+        warm_start(state, lambda: None, {"audio": (broken, lambda: None)}, parallel=False)
+    assert state.status == "failed" and state.error == "OSError: no weights"
+    assert state.snapshot()["status"] == "failed"
+
+
+def test_live_answers_at_once_and_ready_waits_for_models(server, monkeypatch):
+    srv = server.module
+    release = threading.Event()
+
+    def load_and_warm_up():
+        release.wait(5)
+        srv.startup.mark_ready()
+
+    monkeypatch.setattr(srv.startup, "status", "starting")
+    monkeypatch.setattr(srv, "load_and_warm_up", load_and_warm_up)
+    with TestClient(srv.app) as client:
+        assert client.get("/live").status_code == 200
+        r = client.get("/ready")
+        assert r.status_code == 503 and r.json()["status"] == "starting"
+        assert client.get("/health").json()["status"] == "starting"
+        with ThreadPoolExecutor(1) as pool:
+            held = pool.submit(client.post, "/predict-text", json={"text": "so happy"})
+            time.sleep(0.1)
+            assert not held.done()  # held until the models are warm, not failed
+            release.set()
+            assert held.result(5).json()["label"] == "joy"
+        assert client.get("/ready").status_code == 200
+
+
+def test_requests_fail_fast_after_a_failed_load(server, monkeypatch):
+    srv = server.module
+
+    def load_and_warm_up():
+        srv.startup.mark_failed(OSError("no weights"))
+        raise OSError("no weights")
+
+    monkeypatch.setattr(srv.startup, "status", "starting")
+    monkeypatch.setattr(srv.startup, "error", None)
+    monkeypatch.setattr(srv, "load_and_warm_up", load_and_warm_up)
+    with TestClient(srv.app) as client:
+        r = client.post("/predict-text", json={"text": "so happy"})
+        assert r.status_code == 503 and "no weights" in r.json()["detail"]
+        assert client.get("/ready").status_code == 503
+        assert client.get("/live").status_code == 200
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.streaming import AudioRingBuffer, StreamSession, decode_pcm
+from conftest import tone
+
+
+def pcm16(wave):
+    return (np.clip(wave, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def test_decode_pcm16_and_float32():
+    samples = np.array([0, 16384, -32768, 32767], dtype="<i2")
+    assert list(decode_pcm(samples.tobytes())) == [0.0, 0.5, -1.0, 32767 / 32768]
+    floats = np.array([0.25, -0.5], dtype="<f4")
+    assert list(decode_pcm(floats.tobytes(), "float32")) == [0.25, -0.5]
+
+
+def test_decode_pcm_downmixes_interleaved_channels():
+    stereo = np.array([[0.5, -0.5], [1.0, 0.0]], dtype="<f4")
+    assert list(decode_pcm(stereo.tobytes(), "float32", channels=2)) == [0.0, 0.5]
+
+
+def test_decode_pcm_rejects_partial_frames_and_unknown_formats():
+    with pytest.raises(ValueError):
+        decode_pcm(b"\x00\x00\x00", "pcm16")
+    with pytest.raises(ValueError):
+        decode_pcm(np.zeros(3, dtype="<i2").tobytes(), "pcm16", channels=2)
+    with pytest.raises(ValueError):
+        decode_pcm(b"\x00\x00", "mulaw")
+
+
+def test_ring_buffer_keeps_the_latest_samples_contiguous():
+    ring = AudioRingBuffer(5)
+    ring.write(np.arange(3))
+    ring.write(np.arange(3, 7))
+    assert list(ring.latest(5)) == [2, 3, 4, 5, 6]
+    assert list(ring.latest(2)) == [5, 6]
+    ring.write(np.arange(10, 20))
+    assert list(ring.latest(5)) == [15, 16, 17, 18, 19]
+    assert ring.total == 17
+    assert not ring.latest(1).flags.writeable
+
+
+def test_session_reports_a_window_every_hop():
+    session = StreamSession(sample_rate=1000, window_s=1.0, hop_s=0.5)
+    frame = pcm16(np.full(250, 0.5))
+    due = [session.feed(frame) for _ in range(8)]
+    # Nothing until the first full window, then once per 500 samples
+    assert due == [False, False, False, True, False, True, False, True]
+    assert len(session.window()) == 1000 and session.seconds == 2.0
+
+
+def test_session_take_new_flags_overwritten_audio():
+    session = StreamSession(sample_rate=1000, window_s=0.5, hop_s=0.1, sample_format="float32")
+    session.feed(np.ones(300, dtype="<f4").tobytes())
+    new, contiguous = session.take_new()
+    assert len(new) == 300 and contiguous
+    session.feed(np.ones(800, dtype="<f4").tobytes())
+    new, contiguous = session.take_new()
+    assert len(new) == 500 and not contiguous
+
+
+def test_session_resamples_to_target_rate():
+    session = StreamSession(sample_rate=8000, window_s=1.0, hop_s=0.5, target_rate=16000)
+    for _ in range(4):
+        session.feed(pcm16(tone(0.5, sr=8000)))
+    assert session.window_samples == 16000
+    assert len(session.window()) == 16000
+
+
+def test_session_validates_parameters():
+    with pytest.raises(ValueError):
+        StreamSession(16000, 1.0, 0.5, sample_format="mp3")
+    with pytest.raises(ValueError):
+        StreamSession(16000, 1.0, 0)
+    with pytest.raises(ValueError):
+        StreamSession(0, 1.0, 0.5)
+
+
+def test_ws_stream_sends_one_result_per_hop(client, server):
+    with client.websocket_connect("/ws/stream?sample_rate=16000&window=1&hop=0.5") as ws:
+        ws.send_bytes(pcm16(tone(1.0)))
+        first = ws.receive_json()
+        ws.send_bytes(pcm16(tone(0.5)))
+        second = ws.receive_json()
+    assert first["type"] == second["type"] == "emotion"
+    assert (first["t"], second["t"]) == (1.0, 1.5)
+    assert first["label"] == "hap" and first["speech"] is True
+    assert server.audio.calls == [[16000], [16000]]
+
+
+def test_ws_stream_skips_the_model_on_silence(client, server):
+    with client.websocket_connect("/ws/stream?window=1&hop=1") as ws:
+        ws.send_bytes(pcm16(np.zeros(16000)))
+        msg = ws.receive_json()
+    assert msg["speech"] is False and msg["label"] == "neu"
+    assert server.audio.calls == []
+
+
+def test_ws_stream_reports_bad_frames_and_parameters(client, server):
+    with client.websocket_connect("/ws/stream") as ws:
+        ws.send_text("hello")
+        assert ws.receive_json()["type"] == "error"
+        ws.send_bytes(b"\x00\x01\x02")  # not a whole pcm16 frame
+        assert "frames" in ws.receive_json()["detail"]
+    with client.websocket_connect("/ws/stream?format=mp3") as ws:
+        assert ws.receive_json()["type"] == "error"
+
+
+@pytest.mark.parametrize("window", ["0", "0.01", "-1", "11"])
+def test_ws_stream_rejects_windows_out_of_range(client, server, window):
+    with client.websocket_connect(f"/ws/stream?window={window}") as ws:
+        msg = ws.receive_json()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert msg["type"] == "error" and "window" in msg["detail"]
+    assert closed.value.code == 1003
@@ -0,0 +1,75 @@
+import io
+import json
+
+import numpy as np
+
+from app.timeline import MIN_WINDOW_S, TimelineSummary, WindowSegmenter, encode_event, read_blocks
+from conftest import tone, wav_bytes
+
+
+def test_segmenter_windows_match_one_shot_slicing_for_any_block_size():
+    x = np.random.default_rng(0).standard_normal(16000 * 7).astype(np.float32)
+    for block in (123, 4000, 16000 * 7):
+        seg = WindowSegmenter(16000, 16000, window_s=2.0, hop_s=1.5)
+        for i in range(0, len(x), block):
+            seg.push(x[i:i + block])
+        seg.finish()
+        windows = seg.take(100)
+        assert [w.start for w in windows] == [0.0, 1.5, 3.0, 4.5, 6.0]
+        for w in windows[:-1]:
+            i = int(w.start * 16000)
+            np.testing.assert_array_equal(w.wave, x[i:i + 32000])
+        assert windows[-1].end == 7.0  # trailing partial window
+
+
+def test_segmenter_resamples_and_keeps_one_short_window():
+    seg = WindowSegmenter(8000, 16000, window_s=3.0, hop_s=3.0)
+    seg.push(np.zeros(8000, dtype=np.float32))
+    seg.finish()
+    (only,) = seg.take(10)
+    assert abs(len(only.wave) - 16000) <= 16 and seg.seconds == 1.0
+
+
+def test_read_blocks_raw_pcm_and_summary():
+    pcm = (tone(1.0) * 32767).astype("<i2").tobytes()
+    sr, blocks = read_blocks(io.BytesIO(pcm), 0.25, raw=(16000, "pcm16", 1))
+    assert sr == 16000 and sum(len(b) for b in blocks) == 16000
+
+    summary = TimelineSummary()
+    seg = WindowSegmenter(16000, 16000, 1.0, 1.0)
+    seg.push(np.zeros(48000, dtype=np.float32))
+    a, b, c = seg.take(3)
+    summary.add(a, "hap")
+    summary.add(b, "hap")
+    summary.add(c)
+    event = summary.event(3.0)
+    assert event["label"] == "hap" and event["skipped"] == 1 and event["label_share"] == {"hap": 1.0}
+    assert encode_event({"type": "summary"}, sse=True).startswith(b"event: summary\ndata: ")
+
+
+def events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_timeline_streams_segments_and_summary(client, server):
+    audio = np.concatenate([tone(3.0), np.zeros(3 * 16000, dtype=np.float32), tone(3.0)])
+    r = client.post("/predict/timeline?window=3&hop=3", files={"file": ("call.wav", wav_bytes(audio))})
+    assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+    out = events(r)
+    assert [e["type"] for e in out] == ["segment", "silence", "segment", "summary"]
+    assert out[0]["label"] == "hap" and out[-1]["skipped"] == 1 and out[-1]["duration"] == 9.0
+
+
+def test_timeline_default_hop_comes_from_config(client, server, monkeypatch):
+    monkeypatch.setattr(server.module, "TIMELINE_HOP_S", 1.5)
+    r = client.post("/predict/timeline?window=2&vad=false", files={"file": ("call.wav", wav_bytes(tone(5.0)))})
+    starts = [e["start"] for e in events(r) if e["type"] == "segment"]
+    assert starts[:3] == [0.0, 1.5, 3.0]
+
+
+def test_timeline_rejects_windows_below_minimum(client, server):
+    body = {"file": ("call.wav", wav_bytes(tone(2.0)))}
+    assert client.post(f"/predict/timeline?window={MIN_WINDOW_S / 5}", files=body).status_code == 400
+    assert client.post("/predict/timeline?window=1&hop=0", files=body).status_code == 400
+    assert client.post(f"/predict/timeline?window={MIN_WINDOW_S}", files=body).status_code == 200
+    assert client.post("/predict/timeline?format=xml", files=body).status_code == 400
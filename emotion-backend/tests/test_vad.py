@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.vad import SpeechGate, VoiceActivityDetector, frame_features, hangover
+from conftest import tone, wav_bytes
+
+SR = 16000
+
+
+def noise(seconds, rms, seed=0):
+    return (rms * np.random.default_rng(seed).standard_normal(int(seconds * SR))).astype(np.float32)
+
+
+def test_frame_features():
+    energy_db, zcr = frame_features(np.tile([0.5, -0.5], 160).astype(np.float32), 320)
+    assert len(energy_db) == 1
+    assert abs(energy_db[0] - 10 * np.log10(0.25)) < 0.01
+    assert zcr[0] == 1.0
+    assert frame_features(np.zeros(10), 320)[0].size == 0
+
+
+def test_hangover_extends_each_speech_frame():
+    flags = np.array([0, 1, 0, 0, 0, 0, 1, 0], dtype=bool)
+    assert hangover(flags, 2).astype(int).tolist() == [0, 1, 1, 1, 0, 0, 1, 1]
+    assert hangover(flags, 0) is flags
+
+
+def test_detector_separates_speech_from_silence_and_hiss():
+    vad = VoiceActivityDetector(SR)
+    assert vad.detect(tone(1.0)).speech
+    assert not vad.detect(np.zeros(SR, dtype=np.float32)).speech
+    assert not vad.detect(noise(1.0, rms=0.001)).speech  # below the energy threshold
+    assert not vad.detect(noise(1.0, rms=0.01)).speech   # audible, but broadband hiss
+    assert vad.detect(noise(1.0, rms=0.1)).speech        # loud enough to count anyway
+
+
+def test_short_bursts_are_not_speech():
+    vad = VoiceActivityDetector(SR, hangover_ms=0, min_speech_ms=100)
+    clip = np.zeros(SR, dtype=np.float32)
+    clip[:800] = tone(0.05)  # 50 ms
+    assert not vad.detect(clip).speech
+    clip[:3200] = tone(0.2)
+    result = vad.detect(clip)
+    assert result.speech and abs(result.speech_seconds - 0.2) < 0.03
+
+
+def test_clips_shorter_than_a_frame_go_to_the_model():
+    assert VoiceActivityDetector(SR).detect(np.zeros(100, dtype=np.float32)).speech
+
+
+def test_gate_counts_skips_and_estimates_saved_time():
+    gate = SpeechGate(VoiceActivityDetector(SR))
+    gate.observe_inference(audio_s=2.0, seconds=0.5)
+    keep = gate.check([tone(1.0), np.zeros(2 * SR, dtype=np.float32)], "test")
+    assert keep == [True, False]
+    snap = gate.snapshot()
+    assert (snap["windows"], snap["skipped"], snap["skipped_audio_s"]) == (2, 1, 2.0)
+    assert snap["saved_inference_s"] == 0.5
+    assert gate.check([np.zeros(SR, dtype=np.float32)], "test", enabled=False) == [True]
+    assert SpeechGate(VoiceActivityDetector(SR), enabled=False).check([np.zeros(SR)], "test") == [True]
+
+
+def test_predict_skips_the_model_on_silence(client, server):
+    r = client.post("/predict", files={"file": ("quiet.wav", wav_bytes(np.zeros(SR, dtype=np.float32)))})
+    assert r.status_code == 200
+    assert r.headers["x-speech"] == "0"
+    assert r.json()["label"] == "neu" and r.json()["probs"]["neu"] == 1.0
+    assert server.audio.calls == []
+
+    r = client.post("/predict", files={"file": ("voice.wav", wav_bytes(tone(1.0)))})
+    assert "x-speech" not in r.headers and r.json()["label"] == "hap"
+
+
+def test_speech_header_is_readable_cross_origin(client, server):
+    r = client.post("/predict", files={"file": ("quiet.wav", wav_bytes(np.zeros(SR, dtype=np.float32)))},
+                    headers={"Origin": "https://dashboard.example"})
+    assert "x-speech" in r.headers["access-control-expose-headers"].lower()
@@ -2,7 +2,8 @@ import logging
 import os
 import json
 import asyncio
-import httpx
+import threading
+import time
 from dotenv import load_dotenv
 
 from livekit import agents, api
@@ -17,6 +18,11 @@ from livekit.plugins import (
 from livekit.agents import llm
 from typing import Annotated, Optional
 
+from call_timing import CallSetupTimer
+from emotion_tap import EmotionTap
+from http_pool import close_shared_client, shared_client
+from worker_load import LOAD_THRESHOLD, WorkerLoad
+
 # Load environment variables
 load_dotenv(".env")
 
@@ -26,9 +32,8 @@ logger = logging.getLogger("outbound-agent")
 
 # Backboard API for memory
 BACKBOARD_URL = os.getenv("BACKBOARD_URL", "http://localhost:3000")
-
-# Emotion detection API
-EMOTION_TEXT_API_URL = os.getenv("EMOTION_TEXT_API_URL", "http://localhost:8000/predict-text")
+# After the callee answers, how long the greeting may still wait for Backboard data
+BACKBOARD_GRACE_S = float(os.getenv("BACKBOARD_GRACE_S", "1.5"))
 
 
 # TRUNK ID - This needs to be set after you create your trunk
@@ -36,6 +41,16 @@ EMOTION_TEXT_API_URL = os.getenv("EMOTION_TEXT_API_URL", "http://localhost:8000/
 OUTBOUND_TRUNK_ID = os.getenv("OUTBOUND_TRUNK_ID")
 SIP_DOMAIN = os.getenv("VOBIZ_SIP_DOMAIN") 
 
+# How calls share worker processes: "process" (one call per prewarmed process)
+# or "thread" (calls run as threads of one process and share its VAD model)
+AGENT_JOB_EXECUTOR = os.getenv("AGENT_JOB_EXECUTOR", "process").lower()
+# Prewarmed processes kept ready for the next dispatch (unset: LiveKit's default)
+AGENT_NUM_IDLE_PROCESSES = os.getenv("AGENT_NUM_IDLE_PROCESSES")
+# Load reporting: the worker takes no new calls once any of these is reached
+AGENT_MAX_CONCURRENT_CALLS = int(os.getenv("AGENT_MAX_CONCURRENT_CALLS", "8"))
+AGENT_CPU_BUDGET = float(os.getenv("AGENT_CPU_BUDGET", "0.75"))
+AGENT_LOOP_LAG_BUDGET_MS = float(os.getenv("AGENT_LOOP_LAG_BUDGET_MS", "200"))
+
 
 def _build_tts():
     """Configure the Text-to-Speech provider based on env vars."""
@@ -61,6 +76,32 @@ def _build_tts():
     )
 
 
+_vad = None
+_vad_lock = threading.Lock()
+
+
+def shared_vad():
+    """The silero VAD model, loaded once per process and shared by every call it runs."""
+    global _vad
+    with _vad_lock:
+        if _vad is None:
+            t0 = time.perf_counter()
+            _vad = silero.VAD.load()
+            logger.info(f"🔥 Loaded silero VAD in {time.perf_counter() - t0:.2f}s")
+        return _vad
+
+
+def _build_plugins() -> dict:
+    """Construct the VAD, STT/LLM/TTS and noise cancellation plugins (blocking; run off the event loop)."""
+    return {
+        "vad": shared_vad(),
+        "stt": deepgram.STT(model="nova-3", language="multi"),
+        "llm": google.LLM(model="gemini-2.5-flash"),
+        "tts": _build_tts(),
+        "noise_cancellation": noise_cancellation.BVCTelephony(),
+    }
+
+
 
 class TransferFunctions(llm.ToolContext):
     def __init__(self, ctx: agents.JobContext, phone_number: str = None):
@@ -126,14 +167,7 @@ class TransferFunctions(llm.ToolContext):
             return f"Error executing transfer: {e}"
 
 
-class OutboundAssistant(Agent):
-
-    """
-    An AI agent tailored for outbound calls.
-    Personalized based on user profile and emotion-aware.
-    """
-    def __init__(self, user_context: str = "") -> None:
-        base_instructions = """
+BASE_INSTRUCTIONS = """
             You are a warm, empathetic voice assistant from MindfulVoice, providing personalized mental wellness support over the phone.
             
             CORE BEHAVIORS:
@@ -156,103 +190,91 @@ class OutboundAssistant(Agent):
             - If the user wants to end the call, say goodbye warmly.
             - If transfer is requested, use the transfer_call tool immediately.
             """
-        
-        # Add user context if available
-        if user_context:
-            full_instructions = f"{base_instructions}\n\nUSER CONTEXT:\n{user_context}"
-        else:
-            full_instructions = base_instructions
-            
-        super().__init__(instructions=full_instructions)
+
+
+def _compose_instructions(user_context: str = "") -> str:
+    # Add user context if available
+    if user_context:
+        return f"{BASE_INSTRUCTIONS}\n\nUSER CONTEXT:\n{user_context}"
+    return BASE_INSTRUCTIONS
+
+
+class OutboundAssistant(Agent):
+
+    """
+    An AI agent tailored for outbound calls.
+    Personalized based on user profile and emotion-aware.
+    """
+    def __init__(self, user_context: str = "", emotion_tap: Optional[EmotionTap] = None) -> None:
+        self.emotion_tap = emotion_tap
+        self.has_user_context = bool(user_context)
+        super().__init__(instructions=_compose_instructions(user_context))
+
+    async def apply_user_context(self, user_context: str) -> None:
+        """Merge memory that arrived after the session started; used from the next reply on."""
+        if not user_context or self.has_user_context:
+            return
+        self.has_user_context = True
+        await self.update_instructions(_compose_instructions(user_context))
+
+    async def on_user_turn_completed(self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage) -> None:
+        """Add the caller's latest transcript emotion to this turn's context (bounded wait)."""
+        if self.emotion_tap is None:
+            return
+        reading = await self.emotion_tap.for_turn()
+        if reading is not None:
+            turn_ctx.add_message(role="system", content=reading.context_note())
 
 
 async def fetch_user_memory() -> dict:
     """Fetch user profile and memory from Backboard."""
     result = {"memory": "", "reminders": [], "name": ""}
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{BACKBOARD_URL}/recall-memory",
-                json={},
-                timeout=10.0,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                result["memory"] = data.get("memory", "")
-                result["reminders"] = data.get("reminders", [])
-                result["name"] = data.get("name", "")
-                logger.info(f"✅ Loaded user data from Backboard")
+        resp = await shared_client().post(
+            f"{BACKBOARD_URL}/recall-memory",
+            json={},
+            timeout=10.0,
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            result["memory"] = data.get("memory", "")
+            result["reminders"] = data.get("reminders", [])
+            result["name"] = data.get("name", "")
+            logger.info(f"✅ Loaded user data from Backboard")
     except Exception as e:
         logger.warning(f"Could not fetch user memory: {e}")
     return result
 
 
+# Default wellness reminders if none from backend
+DEFAULT_REMINDERS = [
+    "Remember to take a few deep breaths today",
+    "Don't forget to drink water and stay hydrated",
+    "A short walk can do wonders for your mood",
+]
+
+
 async def fetch_reminders() -> list:
     """Fetch reminders/tips for the user."""
-    # Default wellness reminders if none from backend
-    default_reminders = [
-        "Remember to take a few deep breaths today",
-        "Don't forget to drink water and stay hydrated",
-        "A short walk can do wonders for your mood",
-    ]
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{BACKBOARD_URL}/api/reminders",
-                timeout=5.0,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                reminders = data.get("reminders", [])
-                if reminders:
-                    logger.info(f"✅ Loaded {len(reminders)} reminders")
-                    return reminders
+        resp = await shared_client().get(
+            f"{BACKBOARD_URL}/api/reminders",
+            timeout=5.0,
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            reminders = data.get("reminders", [])
+            if reminders:
+                logger.info(f"✅ Loaded {len(reminders)} reminders")
+                return reminders
     except Exception as e:
         logger.warning(f"Could not fetch reminders: {e}")
-    return default_reminders
-
+    return DEFAULT_REMINDERS
 
-async def analyze_text_emotion(text: str) -> str:
-    """Analyze text for emotion."""
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                EMOTION_TEXT_API_URL,
-                json={"text": text},
-                timeout=5.0,
-            )
-            if resp.status_code == 200:
-                result = resp.json()
-                label = result.get("label", "neutral")
-                score = result.get("score", 0)
-                logger.info(f"🎭 Emotion detected: {label} ({score:.0%})")
-                return label
-    except Exception as e:
-        logger.warning(f"Emotion detection failed: {e}")
-    return "neutral"
 
-
-async def entrypoint(ctx: agents.JobContext):
-    """
-    Main entrypoint for the agent.
-    
-    For outbound calls:
-    1. Fetches user profile/memory from Backboard
-    2. Checks for 'phone_number' in the job metadata.
-    3. Connects to the room.
-    4. Initiates the SIP call to the phone number.
-    5. Waits for answer before speaking with personalized greeting.
-    """
-    logger.info(f"Connecting to room: {ctx.room.name}")
-    
-    # Fetch user memory/profile and reminders from Backboard
-    logger.info("🧠 Fetching user data from Backboard...")
-    user_data = await fetch_user_memory()
-    reminders = await fetch_reminders()
-    
+def _user_name(user_data: dict) -> str:
     user_context = user_data.get("memory", "")
     user_name = user_data.get("name", "")
-    
     # Try to extract name from memory if not directly available
     if not user_name and user_context:
         if "name is" in user_context.lower():
@@ -261,55 +283,170 @@ async def entrypoint(ctx: agents.JobContext):
                 user_name = name_part.capitalize()
             except:
                 pass
+    return user_name
+
+
+def prewarm(proc: agents.JobProcess):
+    """Runs in each job process before it is given a call.
+
+    Loads the VAD model (once per process) and builds the plugins for the
+    call this process will take, so none of it is on the call-setup path.
+    """
+    t0 = time.perf_counter()
+    proc.userdata["plugins"] = _build_plugins()
+    logger.info(f"🔥 Prewarmed job process in {time.perf_counter() - t0:.2f}s")
+
+
+def _result_or(task: asyncio.Task, default):
+    """A finished task's result, or ``default`` if it is still running."""
+    return task.result() if task.done() and not task.cancelled() else default
+
+
+async def entrypoint(ctx: agents.JobContext):
+    """
+    Main entrypoint for the agent.
+    
+    Call setup runs concurrently, so the slowest step sets the time to first
+    word instead of the sum of all of them:
+    1. Reads 'phone_number' (and the dispatch time) from the job metadata.
+    2. At once: fetches user profile/memory and reminders from Backboard,
+       builds the STT/LLM/TTS plugins and, for outbound calls, dials the number.
+    3. Starts the session as soon as the plugins are ready; memory that
+       arrives later is merged into the agent's instructions.
+    4. On answer, gives Backboard at most BACKBOARD_GRACE_S more, then
+       speaks the personalized greeting.
+    """
+    logger.info(f"Connecting to room: {ctx.room.name}")
     
     # parse the phone number from the metadata sent by the dispatch script
     phone_number = None
+    dispatched_at = None
     try:
         if ctx.job.metadata:
             data = json.loads(ctx.job.metadata)
             phone_number = data.get("phone_number")
+            dispatched_at = data.get("dispatched_at")
     except Exception:
         logger.warning("No valid JSON metadata found. This might be an inbound call.")
 
+    timer = CallSetupTimer(dispatched_at=dispatched_at)
+
+    def timed(coro, stage: str) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        task.add_done_callback(lambda _: timer.mark(stage))
+        return task
+
+    # Kick off every independent setup step before waiting on any of them
+    logger.info("🧠 Fetching user data from Backboard...")
+    memory_task = timed(fetch_user_memory(), "memory_ready")
+    reminders_task = timed(fetch_reminders(), "reminders_ready")
+    # A prewarmed process already built this call's plugins
+    plugins = ctx.proc.userdata.pop("plugins", None)
+    plugins_task = None if plugins is not None else asyncio.create_task(asyncio.to_thread(_build_plugins))
+    dial_task = None
+    if phone_number:
+        logger.info(f"Initiating outbound SIP call to {phone_number}...")
+        # Create a SIP participant to dial out
+        # This effectively "calls" the phone number and brings them into this room
+        dial_task = asyncio.create_task(ctx.api.sip.create_sip_participant(
+            api.CreateSIPParticipantRequest(
+                room_name=ctx.room.name,
+                sip_trunk_id=OUTBOUND_TRUNK_ID,
+                sip_call_to=phone_number,
+                participant_identity=f"sip_{phone_number}", # Unique ID for the SIP user
+                wait_until_answered=True, # Important: Wait for pickup before continuing
+            )
+        ))
+
     # Initialize function context
     fnc_ctx = TransferFunctions(ctx, phone_number)
 
+    if plugins_task is not None:
+        try:
+            plugins = await plugins_task
+        except Exception:
+            if dial_task is not None:
+                dial_task.cancel()
+            raise
+    timer.mark("plugins_ready")  # also marks prewarmed plugins, which have no task
+
     # Initialize the Agent Session with plugins
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3", language="multi"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=_build_tts(),
+        vad=plugins["vad"],
+        stt=plugins["stt"],
+        llm=plugins["llm"],
+        tts=plugins["tts"],
         tools=fnc_ctx._tools,
     )
 
-    # Start the session with personalized agent
+    # Classify final transcripts in the background; each turn waits at most the tap's budget
+    emotion_tap = EmotionTap()
+    emotion_tap.attach(session)
+
+    @session.on("agent_state_changed")
+    def _on_agent_state(ev):
+        # The agent enters "speaking" when its first TTS audio is played out
+        if ev.new_state == "speaking" and "first_tts_audio" not in timer.marks:
+            timer.mark("first_tts_audio")
+            timer.log()
+
+    async def report_emotion_tap():
+        await emotion_tap.aclose()
+        stats = emotion_tap.summary()
+        if stats["turns"] or stats["requests"]:
+            logger.info(f"🎭 Emotion tap: {stats['turns']} turns, added latency p50 {stats['added_ms_p50']} ms / "
+                        f"p95 {stats['added_ms_p95']} ms / max {stats['added_ms_max']} ms, "
+                        f"{stats['over_budget']} over budget, {stats['failures']} failures, "
+                        f"breaker opened {stats['breaker_opens']}x")
+        logger.info(f"emotion_tap_stats {json.dumps(stats)}")
+
+    async def report_call_setup():
+        # Calls that never reached the first word still log how far they got
+        timer.log()
+
+    ctx.add_shutdown_callback(report_emotion_tap)
+    ctx.add_shutdown_callback(report_call_setup)
+    ctx.add_shutdown_callback(close_shared_client)
+
+    # Start the session with personalized agent (or generic, until Backboard answers)
+    user_data = _result_or(memory_task, {})
+    agent = OutboundAssistant(user_context=user_data.get("memory", ""), emotion_tap=emotion_tap)
     await session.start(
         room=ctx.room,
-        agent=OutboundAssistant(user_context=user_context),
+        agent=agent,
         room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVCTelephony(),
+            noise_cancellation=plugins["noise_cancellation"],
             close_on_disconnect=True,
         ),
     )
+    timer.mark("session_started")
+
+    async def inject_late_memory():
+        user_data = await memory_task
+        if user_data.get("memory") and not agent.has_user_context:
+            logger.info("🧠 User memory arrived after session start, updating instructions")
+            await agent.apply_user_context(user_data["memory"])
+
+    memory_injection = asyncio.create_task(inject_late_memory())
 
     if phone_number:
-        logger.info(f"Initiating outbound SIP call to {phone_number}...")
         try:
-            # Create a SIP participant to dial out
-            # This effectively "calls" the phone number and brings them into this room
-            await ctx.api.sip.create_sip_participant(
-                api.CreateSIPParticipantRequest(
-                    room_name=ctx.room.name,
-                    sip_trunk_id=OUTBOUND_TRUNK_ID,
-                    sip_call_to=phone_number,
-                    participant_identity=f"sip_{phone_number}", # Unique ID for the SIP user
-                    wait_until_answered=True, # Important: Wait for pickup before continuing
-                )
-            )
+            await dial_task
+            timer.mark("answered")
             logger.info("Call answered! Speaking now...")
             
-            # Small delay to ensure audio path is established
-            await asyncio.sleep(0.5)
+            # Small delay to ensure audio path is established; Backboard gets the same
+            # window plus the rest of its grace (it has been running since dispatch)
+            await asyncio.gather(
+                asyncio.sleep(0.5),
+                asyncio.wait({memory_task, reminders_task}, timeout=BACKBOARD_GRACE_S),
+            )
+            if not (memory_task.done() and reminders_task.done()):
+                logger.warning(f"Backboard not ready {BACKBOARD_GRACE_S:.1f}s after answer, greeting without it")
+            user_name = _user_name(_result_or(memory_task, {}))
+            reminders = _result_or(reminders_task, DEFAULT_REMINDERS)
+            if memory_task.done():
+                await memory_injection
             
             # Build personalized one-way message with reminders
             reminder_text = ""
@@ -340,6 +477,7 @@ async def entrypoint(ctx: agents.JobContext):
             
             # Deliver the one-way message
             logger.info(f"📢 Delivering reminder message (user: {user_name or 'unknown'})...")
+            timer.mark("greeting_sent")
             await session.generate_reply(instructions=message)
             logger.info("✅ Message delivered!")
             
@@ -366,14 +504,28 @@ async def entrypoint(ctx: agents.JobContext):
     else:
         # Fallback for inbound calls
         logger.info("No phone number in metadata. Treating as inbound/web call.")
+        timer.mark("greeting_sent")
         await session.generate_reply(instructions="Greet the user and let them know this is a wellness check-in call.")
 
 
 if __name__ == "__main__":
     # The agent name "outbound-caller" is used by the dispatch script to find this worker
+    # Report calls, CPU and event-loop lag so LiveKit sends new calls to the least busy worker
+    worker_load = WorkerLoad(max_calls=AGENT_MAX_CONCURRENT_CALLS, cpu_budget=AGENT_CPU_BUDGET,
+                             lag_budget_ms=AGENT_LOOP_LAG_BUDGET_MS)
+    worker_options = {}
+    if AGENT_NUM_IDLE_PROCESSES:
+        worker_options["num_idle_processes"] = int(AGENT_NUM_IDLE_PROCESSES)
     agents.cli.run_app(
         agents.WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            request_fnc=worker_load.request_fnc,
+            load_fnc=worker_load,
+            load_threshold=LOAD_THRESHOLD,
             agent_name="outbound-caller", 
+            job_executor_type=(agents.JobExecutorType.THREAD if AGENT_JOB_EXECUTOR == "thread"
+                               else agents.JobExecutorType.PROCESS),
+            **worker_options,
         )
     )
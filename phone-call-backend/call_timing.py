@@ -0,0 +1,58 @@
+"""
+Call-setup timing for the phone agent.
+
+``CallSetupTimer`` is created when the job starts and records each setup
+stage once, as seconds since the job started. ``make_call.py`` puts the
+dispatch wall-clock time in the job metadata, so the report also covers the
+time LiveKit took to hand the job to a worker. The headline number is
+``first_word_s``: dispatch (or job start) to the first agent audio.
+"""
+import json
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger("outbound-agent")
+
+# Stages in the order they usually happen; the report keeps this order
+STAGES = ("plugins_ready", "memory_ready", "reminders_ready", "session_started",
+          "answered", "greeting_sent", "first_tts_audio")
+
+
+class CallSetupTimer:
+    def __init__(self, dispatched_at: Optional[float] = None):
+        self.started = time.monotonic()
+        # Wall clock is only used against the dispatcher's timestamp
+        self.dispatch_to_job_s = max(0.0, time.time() - dispatched_at) if dispatched_at else None
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, stage: str) -> float:
+        """Record ``stage`` now (first call wins); returns seconds since job start."""
+        if stage not in self.marks:
+            self.marks[stage] = time.monotonic() - self.started
+        return self.marks[stage]
+
+    def report(self) -> dict:
+        ordered = sorted(self.marks, key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES), s))
+        report = {"dispatch_to_job_s": round(self.dispatch_to_job_s, 3) if self.dispatch_to_job_s is not None else None}
+        report.update({f"{stage}_s": round(self.marks[stage], 3) for stage in ordered})
+        offset = self.dispatch_to_job_s or 0.0
+        if "first_tts_audio" in self.marks:
+            report["first_word_s"] = round(offset + self.marks["first_tts_audio"], 3)
+            if "answered" in self.marks:
+                report["answer_to_first_word_s"] = round(self.marks["first_tts_audio"] - self.marks["answered"], 3)
+        return report
+
+    def log(self):
+        """Log the setup timeline once per call."""
+        if self.reported:
+            return
+        self.reported = True
+        report = self.report()
+        parts = [f"{key[:-2]} {value:.2f}s" for key, value in report.items() if value is not None]
+        logger.info(f"⏱️ Call setup: {', '.join(parts)}")
+        logger.info(f"call_setup_timing {json.dumps(report)}")
+
+
+__all__ = ["STAGES", "CallSetupTimer"]
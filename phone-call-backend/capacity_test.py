@@ -0,0 +1,140 @@
+"""
+How many concurrent calls one agent worker process sustains.
+
+For each level in --levels, runs that many fake calls at once and reports
+per-call latency. A fake call does the agent's in-process, per-call work in
+real time for --seconds: a silero VAD stream (the worker's shared model from
+agent.shared_vad()) fed one 20 ms frame every 20 ms, plus a probe of its
+event loop's lag. STT/LLM/TTS run remotely and BVC noise cancellation needs
+a LiveKit Cloud room, so neither is modelled here.
+
+    --mode thread   calls run as threads of this process, each on its own
+                    loop, like AGENT_JOB_EXECUTOR=thread
+    --mode process  one process per call (the default executor), i.e. how
+                    many call processes this machine sustains
+
+A level is sustained while p95 VAD delay (how far behind real time results
+arrive) and p95 loop lag stay under --max-delay-ms.
+
+Run from phone-call-backend/:
+    python capacity_test.py --levels 1 2 4 8 16 32
+    python capacity_test.py --mode process --seconds 20 --out capacity.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+
+
+def synthetic_call_audio(seconds: float, seed: int) -> np.ndarray:
+    """int16 mono: roughly 2 s of voiced tone, 2 s of near-silence, repeated."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    talking = np.sin(2 * np.pi * 0.25 * t + rng.uniform(0, 2 * np.pi)) > 0
+    voiced = 0.3 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    audio = talking * voiced + 0.01 * rng.standard_normal(len(t))
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+async def fake_call(seconds: float, seed: int) -> dict:
+    from livekit import rtc
+    from livekit.agents import vad as agents_vad
+
+    from agent import shared_vad
+
+    stream = shared_vad().stream()
+    audio = synthetic_call_audio(seconds, seed)
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    delays, lags = [], []
+
+    async def push():
+        for i in range(0, len(audio) - frame + 1, frame):
+            await asyncio.sleep(max(0.0, t0 + i / SAMPLE_RATE - loop.time()))
+            stream.push_frame(rtc.AudioFrame(audio[i:i + frame].tobytes(), SAMPLE_RATE, 1, frame))
+        stream.end_input()
+
+    async def probe():
+        while True:
+            at = loop.time()
+            await asyncio.sleep(0.05)
+            lags.append(1000 * max(0.0, loop.time() - at - 0.05))
+
+    pusher = asyncio.create_task(push())
+    prober = asyncio.create_task(probe())
+    async for ev in stream:
+        if ev.type == agents_vad.VADEventType.INFERENCE_DONE:
+            # Real time at which the last sample this result covers was captured
+            delays.append(1000 * max(0.0, loop.time() - (t0 + ev.samples_index / SAMPLE_RATE)))
+    await pusher
+    prober.cancel()
+    await stream.aclose()
+    return {"delays_ms": delays, "lags_ms": lags}
+
+
+def run_call(seconds: float, seed: int) -> dict:
+    return asyncio.run(fake_call(seconds, seed))
+
+
+def run_level(calls: int, mode: str, seconds: float) -> dict:
+    if mode == "thread":
+        pool = ThreadPoolExecutor(max_workers=calls)
+    else:
+        pool = ProcessPoolExecutor(max_workers=calls, mp_context=multiprocessing.get_context("spawn"))
+    with pool:
+        results = list(pool.map(run_call, [seconds] * calls, range(calls)))
+    delays = np.concatenate([r["delays_ms"] for r in results] + [[0.0]])
+    lags = np.concatenate([r["lags_ms"] for r in results] + [[0.0]])
+    return {
+        "calls": calls,
+        "vad_delay_p50_ms": round(float(np.percentile(delays, 50)), 1),
+        "vad_delay_p95_ms": round(float(np.percentile(delays, 95)), 1),
+        "vad_delay_max_ms": round(float(delays.max()), 1),
+        "loop_lag_p95_ms": round(float(np.percentile(lags, 95)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=15.0, help="Length of each fake call")
+    parser.add_argument("--max-delay-ms", type=float, default=100.0,
+                        help="p95 VAD delay / loop lag above which a level counts as degraded")
+    parser.add_argument("--all", action="store_true", help="Keep going past the first degraded level")
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    levels, sustained, degraded = [], 0, False
+    for calls in sorted(set(args.levels)):
+        r = run_level(calls, args.mode, args.seconds)
+        r["sustained"] = max(r["vad_delay_p95_ms"], r["loop_lag_p95_ms"]) <= args.max_delay_ms
+        levels.append(r)
+        print(f"▶ {calls:3d} calls: VAD delay p50 {r['vad_delay_p50_ms']} ms / p95 {r['vad_delay_p95_ms']} ms / "
+              f"max {r['vad_delay_max_ms']} ms, loop lag p95 {r['loop_lag_p95_ms']} ms"
+              f"{'' if r['sustained'] else '  (degraded)'}")
+        if not r["sustained"]:
+            degraded = True
+            if not args.all:
+                break
+        elif not degraded:
+            sustained = calls
+    print(f"▶ one {args.mode}-mode worker sustains {sustained} concurrent calls "
+          f"(p95 under {args.max_delay_ms:.0f} ms)")
+
+    text = json.dumps({"mode": args.mode, "seconds": args.seconds, "max_delay_ms": args.max_delay_ms,
+                       "sustained_calls": sustained, "levels": levels}, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Transcript emotion tap for the phone agent.
+
+Every final STT transcript is sent to the emotion backend's /predict-text as
+soon as it arrives, in the background, while the session is still deciding
+whether the user's turn is over. When the turn completes the agent waits at
+most ``budget_ms`` for whatever is still in flight and then adds the latest
+reading to the LLM context for that turn. A reading that misses the budget
+still lands and is used on the next turn.
+
+A circuit breaker stops sending after ``failures`` consecutive errors or
+timeouts and lets one probe through every ``cooldown_s``, so a down backend
+costs nothing per turn instead of a timeout per turn.
+
+Taps send through the pooled client from ``http_pool``.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+import httpx
+
+from http_pool import shared_client
+
+logger = logging.getLogger("outbound-agent")
+
+EMOTION_TEXT_API_URL = os.getenv("EMOTION_TEXT_API_URL", "http://localhost:8000/predict-text")
+# Longest a user turn may wait for classification before the LLM runs without it
+EMOTION_TAP_BUDGET_MS = float(os.getenv("EMOTION_TAP_BUDGET_MS", "150"))
+# Per-request timeout; a late answer is still used for the following turn
+EMOTION_TAP_TIMEOUT_S = float(os.getenv("EMOTION_TAP_TIMEOUT_S", "2.0"))
+EMOTION_TAP_BREAKER_FAILURES = int(os.getenv("EMOTION_TAP_BREAKER_FAILURES", "3"))
+EMOTION_TAP_BREAKER_COOLDOWN_S = float(os.getenv("EMOTION_TAP_BREAKER_COOLDOWN_S", "30"))
+
+class CircuitBreaker:
+    """closed -> open after ``failures`` consecutive failures -> half-open probe after ``cooldown_s``."""
+
+    def __init__(self, failures: int = EMOTION_TAP_BREAKER_FAILURES, cooldown_s: float = EMOTION_TAP_BREAKER_COOLDOWN_S):
+        self.failures = max(1, failures)
+        self.cooldown_s = cooldown_s
+        self.consecutive = 0
+        self.opened_at = None
+        self.opens = 0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown_s else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.consecutive += 1
+        if self._probing or (self.opened_at is None and self.consecutive >= self.failures):
+            if self.opened_at is None:
+                self.opens += 1
+                logger.warning(f"🎭 Emotion tap breaker open for {self.cooldown_s:.0f}s")
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def record_cancelled(self):
+        """A request was abandoned before it finished; a half-open probe may be retried."""
+        self._probing = False
+
+
+class EmotionReading:
+    __slots__ = ("label", "score", "at")
+
+    def __init__(self, label: str, score: float):
+        self.label = label
+        self.score = score
+        self.at = time.monotonic()
+
+    def context_note(self) -> str:
+        return (f"(Private note, do not mention: from their words the caller currently sounds "
+                f"{self.label} ({self.score:.0%} confidence). Let it shape your tone.)")
+
+
+class EmotionTap:
+    """Background emotion classification of final transcripts, bounded per turn.
+
+    Call ``attach(session)`` once, ``await for_turn()`` from
+    ``Agent.on_user_turn_completed`` and ``await aclose()`` at shutdown.
+    """
+
+    def __init__(self, url: str = EMOTION_TEXT_API_URL, budget_ms: float = EMOTION_TAP_BUDGET_MS,
+                 client: Optional[httpx.AsyncClient] = None, breaker: Optional[CircuitBreaker] = None):
+        self.url = url
+        self.budget_s = budget_ms / 1000
+        self.client = client
+        self.breaker = breaker or CircuitBreaker()
+        self.latest: Optional[EmotionReading] = None
+        self._pending = set()
+        # Per-call accounting
+        self.requests = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.request_ms = []
+        self.turn_wait_ms = []
+        self.over_budget = 0
+
+    def attach(self, session):
+        session.on("user_input_transcribed", self._on_transcript)
+
+    def _on_transcript(self, ev):
+        if ev.is_final and ev.transcript.strip():
+            self.submit(ev.transcript)
+
+    def submit(self, text: str):
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            return
+        task = asyncio.create_task(self._classify(text))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _classify(self, text: str):
+        client = self.client or shared_client()
+        self.requests += 1
+        t0 = time.perf_counter()
+        try:
+            resp = await client.post(self.url, json={"text": text}, timeout=EMOTION_TAP_TIMEOUT_S)
+            resp.raise_for_status()
+            result = resp.json()
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            logger.warning(f"Emotion detection failed: {e!r}")
+            return
+        self.request_ms.append(1000 * (time.perf_counter() - t0))
+        self.breaker.record_success()
+        self.latest = EmotionReading(result.get("label", "neutral"), float(result.get("score", 0.0)))
+        logger.info(f"🎭 Emotion detected: {self.latest.label} ({self.latest.score:.0%})")
+
+    async def for_turn(self) -> Optional[EmotionReading]:
+        """Latest reading for the turn that just ended, waiting at most the budget for in-flight requests."""
+        t0 = time.perf_counter()
+        if self._pending:
+            _, still_pending = await asyncio.wait(set(self._pending), timeout=self.budget_s)
+            if still_pending:
+                self.over_budget += 1
+        self.turn_wait_ms.append(1000 * (time.perf_counter() - t0))
+        return self.latest
+
+    async def aclose(self):
+        for task in list(self._pending):
+            task.cancel()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def summary(self) -> dict:
+        def pct(values, q):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+        return {
+            "turns": len(self.turn_wait_ms),
+            "added_ms_p50": pct(self.turn_wait_ms, 0.5),
+            "added_ms_p95": pct(self.turn_wait_ms, 0.95),
+            "added_ms_max": pct(self.turn_wait_ms, 1.0),
+            "over_budget": self.over_budget,
+            "requests": self.requests,
+            "request_ms_p50": pct(self.request_ms, 0.5),
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "breaker_opens": self.breaker.opens,
+        }
+
+
+__all__ = ["CircuitBreaker", "EmotionReading", "EmotionTap"]
@@ -0,0 +1,40 @@
+"""
+Pooled HTTP clients for the agent's backend calls (Backboard, emotion API).
+
+Every call site passes its own timeout; the pool only keeps connections warm
+so requests after the first don't pay DNS, TCP and TLS setup. httpx
+connections belong to the event loop that opened them, and each job runs its
+own loop (calls that share a worker process as threads included), so there
+is one client per running loop.
+"""
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_lock = threading.Lock()
+
+
+def shared_client() -> httpx.AsyncClient:
+    """The pooled client for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _clients[loop] = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60),
+            )
+        return client
+
+
+async def close_shared_client():
+    with _lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+__all__ = ["shared_client", "close_shared_client"]
@@ -0,0 +1,180 @@
+"""
+Local simulation of call dispatch across agent workers.
+
+Fakes calls arriving at a pool of workers in virtual time and replays how
+LiveKit balances them: every --poll seconds each worker reports its load
+(``load_fnc``), a worker at or above its threshold is skipped, and a new
+call is offered to the available worker that reported the lowest load,
+then to the next one if that worker's ``request_fnc`` rejects it. Loads go
+stale between polls, as they do for real.
+
+Each fake call costs a random share of a CPU core (BVC noise cancellation
+plus session work) for a random duration. A worker is overloaded when its
+cores are, or with --executor thread when the Python share of its calls
+(--gil-share) needs more than the one core the GIL gives a process. Its
+event loop lags more and more as it nears overload, and its polls arrive
+that much later, which is what ``WorkerLoad`` reads as loop lag. Policies:
+
+    none      no load reporting: calls go to a random worker
+    cpu       LiveKit's default, CPU only (threshold 0.75)
+    calls     active calls / --max-calls, with request_fnc enforcing it
+    combined  worker_load.WorkerLoad (calls, CPU and loop lag)
+
+Reported per policy: calls no worker took, share of call time spent on an
+overloaded worker (audio breaks up), p95 loop lag seen by calls, and the
+most calls each worker held.
+
+Run from phone-call-backend/:
+    python load_sim.py
+    python load_sim.py --executor thread --workers 4 4 8 8 --rate 0.4 --out sim.json
+"""
+import argparse
+import json
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from worker_load import LOAD_THRESHOLD, WorkerLoad
+
+POLICIES = ["none", "cpu", "calls", "combined"]
+
+
+class FakeWorker:
+    def __init__(self, name: str, cores: float, policy: str, args, rng: random.Random):
+        self.name = name
+        self.cores = cores
+        self.rng = rng
+        self.poll_s = args.poll
+        self.gil_share = args.gil_share if args.executor == "thread" else 0.0
+        self.calls = []  # (ends_at, cpu_cores)
+        self.worker = SimpleNamespace(active_jobs=self.calls)
+        self.now = 0.0
+        self.next_poll = rng.uniform(0, args.poll)
+        self.reported = 0.0
+        self.max_calls_seen = 0
+        self.accepts = lambda: True
+        if policy == "combined":
+            load = WorkerLoad(max_calls=args.max_calls, cpu_budget=args.cpu_budget,
+                              lag_budget_ms=args.lag_budget_ms,
+                              cpu_percent=self.cpu_percent, clock=lambda: self.now)
+            self.load_fnc, self.threshold, self.accepts = load, LOAD_THRESHOLD, load.accepts
+        elif policy == "calls":
+            self.load_fnc, self.threshold = (lambda worker: len(worker.active_jobs) / args.max_calls), 1.0
+            self.accepts = lambda: len(self.calls) < args.max_calls
+        elif policy == "cpu":
+            self.load_fnc, self.threshold = (lambda worker: self.cpu_percent() / 100), 0.75
+        else:
+            self.load_fnc, self.threshold = (lambda worker: 0.0), float("inf")
+
+    @property
+    def utilization(self) -> float:
+        """Busiest of the machine's cores and, in thread mode, the process's one GIL core."""
+        cpu = sum(cost for _, cost in self.calls)
+        return max(cpu / self.cores, cpu * self.gil_share)
+
+    def cpu_percent(self) -> float:
+        # Share of the whole machine, as psutil reports it, plus a little noise
+        machine = sum(cost for _, cost in self.calls) / self.cores
+        return min(100.0, max(0.0, 100 * machine + self.rng.gauss(0, 3)))
+
+    def loop_lag_ms(self) -> float:
+        # Negligible until nearly overloaded, then grows without bound
+        u = self.utilization
+        return 2.0 if u < 0.7 else min(5000.0, 2.0 + 60 * (u - 0.7) / max(0.02, 1.0 - u))
+
+    def available(self) -> bool:
+        return self.reported < self.threshold
+
+    def step(self, t: float):
+        self.calls[:] = [call for call in self.calls if call[0] > t]
+        if t >= self.next_poll:
+            lag_s = self.loop_lag_ms() / 1000
+            self.now = t + lag_s  # the poll itself runs late on a busy loop
+            self.reported = self.load_fnc(self.worker)
+            self.next_poll = self.now + self.poll_s
+
+    def assign(self, ends_at: float, cpu: float):
+        self.calls.append((ends_at, cpu))
+        self.max_calls_seen = max(self.max_calls_seen, len(self.calls))
+
+
+def simulate(policy: str, args) -> dict:
+    rng = random.Random(args.seed)
+    workers = [FakeWorker(f"w{i}", cores, policy, args, rng) for i, cores in enumerate(args.workers)]
+    dt = 0.1
+    next_arrival = rng.expovariate(args.rate)
+    offered = unplaced = 0
+    call_time = overloaded_time = 0.0
+    lags = []
+    t = 0.0
+    while t < args.minutes * 60:
+        for w in workers:
+            w.step(t)
+        while next_arrival <= t:
+            offered += 1
+            candidates = [w for w in workers if w.available()]
+            rng.shuffle(candidates)
+            if policy != "none":
+                candidates.sort(key=lambda w: w.reported)
+            target = next((w for w in candidates if w.accepts()), None)
+            if target is None:
+                unplaced += 1
+            else:
+                cpu = args.call_cpu * rng.lognormvariate(0, 0.35)
+                target.assign(t + rng.expovariate(1 / args.call_seconds), cpu)
+            next_arrival += rng.expovariate(args.rate)
+        for w in workers:
+            n = len(w.calls)
+            if n:
+                call_time += n * dt
+                if w.utilization > 1.0:
+                    overloaded_time += n * dt
+                lags.extend([w.loop_lag_ms()] * n)
+        t += dt
+    return {
+        "policy": policy,
+        "offered": offered,
+        "unplaced": unplaced,
+        "overloaded_call_time": round(overloaded_time / call_time, 4) if call_time else 0.0,
+        "loop_lag_p95_ms": round(float(np.percentile(lags, 95)), 1) if lags else 0.0,
+        "max_calls_per_worker": {w.name: w.max_calls_seen for w in workers},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=float, nargs="+", default=[2, 4, 4, 8],
+                        help="CPU cores of each worker")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    parser.add_argument("--gil-share", type=float, default=0.3,
+                        help="Share of a call's CPU that holds the GIL (thread executor)")
+    parser.add_argument("--policies", nargs="+", default=POLICIES, choices=POLICIES)
+    parser.add_argument("--rate", type=float, default=0.25, help="Calls per second")
+    parser.add_argument("--call-seconds", type=float, default=60.0, help="Mean call length")
+    parser.add_argument("--call-cpu", type=float, default=0.35, help="Median CPU cores per call")
+    parser.add_argument("--minutes", type=float, default=30.0, help="Simulated time")
+    parser.add_argument("--poll", type=float, default=2.5, help="Seconds between load reports")
+    parser.add_argument("--max-calls", type=int, default=8)
+    parser.add_argument("--cpu-budget", type=float, default=0.75)
+    parser.add_argument("--lag-budget-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default="", help="Write JSON results to this path")
+    args = parser.parse_args()
+
+    results = []
+    for policy in args.policies:
+        r = simulate(policy, args)
+        results.append(r)
+        print(f"▶ {policy:8s}: {r['unplaced']}/{r['offered']} unplaced, "
+              f"{r['overloaded_call_time']:.1%} of call time overloaded, loop lag p95 {r['loop_lag_p95_ms']} ms, "
+              f"max calls per worker {r['max_calls_per_worker']}")
+
+    text = json.dumps({"args": vars(args), "results": results}, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
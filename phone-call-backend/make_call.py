@@ -3,6 +3,7 @@ import asyncio
 import os
 import random
 import json
+import time
 from dotenv import load_dotenv
 from livekit import api
 
@@ -41,11 +42,12 @@ async def main():
     try:
         # 4. Dispatch the Agent
         # We explicitly tell LiveKit to send the 'outbound-caller' agent to this room.
-        # We pass the phone number in the 'metadata' field so the agent knows who to dial.
+        # We pass the phone number in the 'metadata' field so the agent knows who to dial,
+        # and the dispatch time so it can report dispatch-to-first-word latency.
         dispatch_request = api.CreateAgentDispatchRequest(
             agent_name="outbound-caller", # Must match agent.py
             room=room_name,
-            metadata=json.dumps({"phone_number": phone_number})
+            metadata=json.dumps({"phone_number": phone_number, "dispatched_at": time.time()})
         )
         
         dispatch = await lk_api.agent_dispatch.create_dispatch(dispatch_request)
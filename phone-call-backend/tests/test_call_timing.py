@@ -0,0 +1,77 @@
+import time
+
+import call_timing
+from call_timing import STAGES, CallSetupTimer
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.wall
+
+
+def make_timer(monkeypatch, dispatched_ago=None):
+    clock = FakeTime()
+    monkeypatch.setattr(call_timing, "time", clock)
+    dispatched_at = clock.wall - dispatched_ago if dispatched_ago is not None else None
+    return clock, CallSetupTimer(dispatched_at=dispatched_at)
+
+
+def test_report_lists_stages_in_setup_order(monkeypatch):
+    clock, timer = make_timer(monkeypatch)
+    # Marked out of order, as concurrent setup steps finish
+    for stage, t in (("session_started", 0.9), ("memory_ready", 0.4), ("custom_step", 0.5),
+                     ("plugins_ready", 0.6), ("reminders_ready", 0.3), ("first_tts_audio", 2.0),
+                     ("answered", 1.5), ("greeting_sent", 1.6)):
+        clock.now = 100.0 + t
+        timer.mark(stage)
+
+    assert list(timer.report()) == (["dispatch_to_job_s"] + [f"{s}_s" for s in STAGES]
+                                    + ["custom_step_s", "first_word_s", "answer_to_first_word_s"])
+
+
+def test_first_mark_wins(monkeypatch):
+    clock, timer = make_timer(monkeypatch)
+    clock.now = 100.5
+    assert timer.mark("plugins_ready") == 0.5
+    clock.now = 101.0
+    assert timer.mark("plugins_ready") == 0.5
+
+
+def test_first_word_includes_dispatch_delay(monkeypatch):
+    clock, timer = make_timer(monkeypatch, dispatched_ago=1.25)
+    clock.now = 101.5
+    timer.mark("answered")
+    clock.now = 102.0
+    timer.mark("first_tts_audio")
+
+    report = timer.report()
+    assert report["dispatch_to_job_s"] == 1.25
+    assert report["first_word_s"] == 3.25
+    assert report["answer_to_first_word_s"] == 0.5
+
+
+def test_report_without_dispatch_time(monkeypatch):
+    clock, timer = make_timer(monkeypatch)
+    clock.now = 101.0
+    timer.mark("first_tts_audio")
+
+    report = timer.report()
+    assert report["dispatch_to_job_s"] is None
+    assert report["first_word_s"] == 1.0
+    assert "answer_to_first_word_s" not in report
+
+
+def test_log_reports_once(caplog):
+    timer = CallSetupTimer(dispatched_at=time.time())
+    timer.mark("first_tts_audio")
+    with caplog.at_level("INFO", logger="outbound-agent"):
+        timer.log()
+        timer.log()
+    assert sum("call_setup_timing" in r.getMessage() for r in caplog.records) == 1
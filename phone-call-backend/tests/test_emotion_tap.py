@@ -0,0 +1,159 @@
+import asyncio
+
+import httpx
+
+from emotion_tap import CircuitBreaker, EmotionTap
+
+
+def make_tap(handler, budget_ms=150.0, breaker=None):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return EmotionTap(url="http://emotion/predict-text", budget_ms=budget_ms, client=client, breaker=breaker)
+
+
+def label(name, delay=0.0):
+    async def handler(request):
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, json={"label": name, "score": 0.9})
+    return handler
+
+
+def failing(request):
+    return httpx.Response(503, json={"detail": "Models are loading"})
+
+
+# ---------- CircuitBreaker ----------
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failures=3, cooldown_s=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.opens == 1
+
+
+def test_success_resets_the_failure_streak():
+    breaker = CircuitBreaker(failures=2, cooldown_s=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failures=1, cooldown_s=0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # probe still out
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_without_counting_a_new_open():
+    breaker = CircuitBreaker(failures=1, cooldown_s=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60  # cooldown elapsed
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opens == 1
+
+
+def test_cancelled_probe_can_be_retried():
+    breaker = CircuitBreaker(failures=1, cooldown_s=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.allow()
+
+
+# ---------- EmotionTap ----------
+def test_for_turn_returns_a_reading_that_lands_within_budget():
+    async def scenario():
+        tap = make_tap(label("joy"))
+        tap.submit("I am so happy")
+        reading = await tap.for_turn()
+        await tap.aclose()
+        return tap, reading
+
+    tap, reading = asyncio.run(scenario())
+    assert (reading.label, reading.score) == ("joy", 0.9)
+    assert tap.over_budget == 0
+    assert "joy" in reading.context_note()
+
+
+def test_for_turn_waits_at_most_the_budget():
+    async def scenario():
+        tap = make_tap(label("anger", delay=0.3), budget_ms=20)
+        tap.submit("this is ridiculous")
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        first = await tap.for_turn()
+        waited = loop.time() - t0
+        await asyncio.sleep(0.5)
+        second = await tap.for_turn()  # the late reading serves the next turn
+        await tap.aclose()
+        return tap, first, waited, second
+
+    tap, first, waited, second = asyncio.run(scenario())
+    assert first is None
+    assert waited < 0.2
+    assert second.label == "anger"
+    assert tap.over_budget == 1
+
+
+def test_open_breaker_skips_requests():
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return failing(request)
+
+    async def scenario():
+        tap = make_tap(handler, breaker=CircuitBreaker(failures=2, cooldown_s=60))
+        for text in ("one", "two", "three", "four"):
+            tap.submit(text)
+            await tap.for_turn()
+        await tap.aclose()
+        return tap
+
+    tap = asyncio.run(scenario())
+    assert len(sent) == 2
+    summary = tap.summary()
+    assert summary["requests"] == 2
+    assert summary["failures"] == 2
+    assert summary["short_circuited"] == 2
+    assert summary["breaker_opens"] == 1
+    assert summary["turns"] == 4
+
+
+def test_cancelled_probe_does_not_leave_the_breaker_open():
+    async def scenario():
+        breaker = CircuitBreaker(failures=1, cooldown_s=0)
+        breaker.record_failure()
+        tap = make_tap(label("joy", delay=5), breaker=breaker)
+        tap.submit("hello?")  # half-open probe
+        await asyncio.sleep(0.01)
+        await tap.aclose()  # call ended mid-request
+        return breaker
+
+    breaker = asyncio.run(scenario())
+    assert breaker.allow()
+
+
+def test_summary_percentiles():
+    tap = EmotionTap(client=object())
+    assert tap.summary()["added_ms_p50"] == 0.0
+    tap.turn_wait_ms = [float(v) for v in range(1, 101)]
+    tap.request_ms = [10.0, 30.0, 20.0]
+    summary = tap.summary()
+    assert summary["turns"] == 100
+    assert summary["added_ms_p50"] == 51.0
+    assert summary["added_ms_p95"] == 96.0
+    assert summary["added_ms_max"] == 100.0
+    assert summary["request_ms_p50"] == 20.0
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from worker_load import WorkerLoad
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRequest:
+    def __init__(self):
+        self.outcome = None
+
+    async def accept(self):
+        self.outcome = "accepted"
+
+    async def reject(self):
+        self.outcome = "rejected"
+
+
+def worker(calls):
+    return SimpleNamespace(active_jobs=[object()] * calls)
+
+
+def make_load(cpu=0.0, **kwargs):
+    readings = {"cpu": cpu}
+    clock = Clock()
+    load = WorkerLoad(cpu_percent=lambda: readings["cpu"], clock=clock, **kwargs)
+    return load, readings, clock
+
+
+def poll(load, clock, w, every=1.0):
+    clock.now += every
+    return load(w)
+
+
+def test_calls_scale_to_max_calls():
+    load, _, clock = make_load(max_calls=4)
+    assert poll(load, clock, worker(1)) == pytest.approx(0.25)
+    assert poll(load, clock, worker(2)) == pytest.approx(0.5)
+    assert poll(load, clock, worker(4)) == 1.0
+    assert load.full
+
+
+def test_cpu_scales_to_budget():
+    load, readings, clock = make_load(cpu=30.0, max_calls=100, cpu_budget=0.6)
+    assert poll(load, clock, worker(0)) == pytest.approx(0.5)
+    readings["cpu"] = 90.0
+    assert poll(load, clock, worker(0)) == 1.0  # capped
+
+
+def test_largest_signal_wins():
+    load, _, clock = make_load(cpu=45.0, max_calls=8, cpu_budget=0.9)
+    assert poll(load, clock, worker(2)) == pytest.approx(0.5)  # CPU 0.5 vs calls 0.25
+    assert poll(load, clock, worker(6)) == pytest.approx(0.75)
+
+
+def test_cpu_rises_at_once_and_falls_smoothly():
+    load, readings, clock = make_load(cpu=80.0, max_calls=100, cpu_budget=1.0, alpha=0.5)
+    poll(load, clock, worker(0))
+    assert load.cpu == pytest.approx(0.8)
+    readings["cpu"] = 0.0
+    poll(load, clock, worker(0))
+    assert load.cpu == pytest.approx(0.4)
+    poll(load, clock, worker(0))
+    assert load.cpu == pytest.approx(0.2)
+    readings["cpu"] = 90.0
+    poll(load, clock, worker(0))
+    assert load.cpu == pytest.approx(0.9)
+
+
+def test_late_poll_counts_as_loop_lag():
+    load, _, clock = make_load(max_calls=100, lag_budget_ms=200.0, alpha=0.5)
+    for _ in range(5):
+        poll(load, clock, worker(0), every=2.0)
+    assert load.lag_ms == 0.0
+    poll(load, clock, worker(0), every=2.1)  # loop blocked for 100 ms
+    assert load.lag_ms == pytest.approx(100.0)
+    assert load.load == pytest.approx(0.5)
+    poll(load, clock, worker(0), every=2.0)
+    assert load.lag_ms == pytest.approx(50.0)
+
+
+def test_full_flips_back_when_load_drops():
+    load, _, clock = make_load(max_calls=2)
+    poll(load, clock, worker(2))
+    assert load.full
+    poll(load, clock, worker(1))
+    assert not load.full
+    assert load.snapshot()["load"] == 0.5
+
+
+def test_request_fnc_rejects_at_max_calls():
+    load, _, clock = make_load(max_calls=2)
+    w = worker(1)
+    poll(load, clock, w)
+
+    first = FakeRequest()
+    asyncio.run(load.request_fnc(first))
+    assert first.outcome == "accepted"
+
+    # A call starts between load polls; the live job count is what matters
+    w.active_jobs.append(object())
+    second = FakeRequest()
+    asyncio.run(load.request_fnc(second))
+    assert second.outcome == "rejected"
+    assert load.rejected == 1
+
+
+def test_request_fnc_before_first_poll():
+    load, _, _ = make_load(max_calls=1)
+    req = FakeRequest()
+    asyncio.run(load.request_fnc(req))
+    assert req.outcome == "accepted"
@@ -0,0 +1,120 @@
+"""
+Load signal for the agent worker.
+
+LiveKit polls each worker's ``load_fnc`` every few seconds and stops sending
+it new calls while the load is at or above ``load_threshold``. Its default
+only looks at CPU. ``WorkerLoad`` combines three signals, each scaled so
+that 1.0 means full:
+
+- active calls / ``max_calls``;
+- CPU use / ``cpu_budget``;
+- event-loop lag / ``lag_budget_ms``. The worker polls the load
+  on a fixed interval from its event loop, so time between two polls beyond
+  the usual spacing is time the loop was blocked. Calls running as threads
+  of the worker (AGENT_JOB_EXECUTOR=thread) show up here; calls in their
+  own processes show up as CPU.
+
+CPU and lag rise immediately and fall back smoothly, so a brief dip
+doesn't flap the worker between full and available. The load is the
+largest of the three, so running out of any one of them marks the worker
+full (``LOAD_THRESHOLD``), and below that the least busy worker reports
+the lowest load.
+
+Load reports are seconds apart, so ``request_fnc`` also turns calls away
+once ``max_calls`` are active; LiveKit then offers the call to another
+worker.
+"""
+import logging
+import statistics
+import time
+from collections import deque
+
+import psutil
+
+logger = logging.getLogger("outbound-agent")
+
+# Load at which the worker stops taking calls; every signal is scaled to reach it when exhausted
+LOAD_THRESHOLD = 1.0
+
+
+class WorkerLoad:
+    """``load_fnc`` for ``agents.WorkerOptions``; call with the worker (anything with ``active_jobs``)."""
+
+    def __init__(self, max_calls: int = 8, cpu_budget: float = 0.75, lag_budget_ms: float = 200.0,
+                 alpha: float = 0.5, cpu_percent=None, clock=time.monotonic):
+        self.max_calls = max(1, int(max_calls))
+        self.cpu_budget = cpu_budget
+        self.lag_budget_ms = lag_budget_ms
+        self.alpha = alpha
+        self.cpu_percent = cpu_percent or (lambda: psutil.cpu_percent(interval=None))
+        self.clock = clock
+        self.active_calls = 0
+        self.cpu = 0.0         # 0..1 of the whole machine
+        self.lag_ms = 0.0
+        self.rejected = 0
+        self.load = 0.0
+        self.full = False
+        self._worker = None
+        self._last_poll = None
+        self._spacings = deque(maxlen=20)
+
+    def _loop_lag_ms(self, now: float) -> float:
+        last, self._last_poll = self._last_poll, now
+        if last is None:
+            return 0.0
+        spacing = now - last
+        self._spacings.append(spacing)
+        # The median spacing is the poll interval; a late poll is followed by an early
+        # catch-up one, so the minimum would understate it
+        return 1000 * max(0.0, spacing - statistics.median(self._spacings))
+
+    def _smooth(self, previous: float, current: float) -> float:
+        return current if current > previous else (1 - self.alpha) * previous + self.alpha * current
+
+    def __call__(self, worker) -> float:
+        self._worker = worker
+        self.active_calls = len(worker.active_jobs)
+        self.cpu = self._smooth(self.cpu, min(1.0, self.cpu_percent() / 100))
+        self.lag_ms = self._smooth(self.lag_ms, self._loop_lag_ms(self.clock()))
+        self.load = min(1.0, max(
+            self.active_calls / self.max_calls,
+            self.cpu / self.cpu_budget,
+            self.lag_ms / self.lag_budget_ms,
+        ))
+        full = self.load >= LOAD_THRESHOLD
+        if full != self.full:
+            self.full = full
+            logger.info(f"⚖️ Worker {'full' if full else 'available'}: {self.describe()}")
+        return self.load
+
+    def accepts(self) -> bool:
+        """Room for one more call right now (counts live jobs, not the last poll)."""
+        active = len(self._worker.active_jobs) if self._worker is not None else self.active_calls
+        return active < self.max_calls
+
+    async def request_fnc(self, req):
+        """``request_fnc`` for ``agents.WorkerOptions``: reject job requests beyond ``max_calls``."""
+        if not self.accepts():
+            self.rejected += 1
+            logger.info(f"⚖️ Rejecting call at {self.max_calls} active calls")
+            await req.reject()
+            return
+        await req.accept()
+
+    def describe(self) -> str:
+        return (f"load {self.load:.2f} ({self.active_calls}/{self.max_calls} calls, "
+                f"CPU {self.cpu:.0%} of {self.cpu_budget:.0%}, loop lag {self.lag_ms:.0f}/{self.lag_budget_ms:.0f} ms)")
+
+    def snapshot(self) -> dict:
+        return {
+            "load": round(self.load, 3),
+            "active_calls": self.active_calls,
+            "max_calls": self.max_calls,
+            "cpu": round(self.cpu, 3),
+            "loop_lag_ms": round(self.lag_ms, 1),
+            "full": self.full,
+            "rejected": self.rejected,
+        }
+
+
+__all__ = ["LOAD_THRESHOLD", "WorkerLoad"]